@@ -0,0 +1,817 @@
+import os
+import re
+import json
+import time
+import argparse
+import platform
+import py_compile
+import random
+import tempfile
+import subprocess
+import sys
+import logging
+import contextlib
+import threading
+import tracemalloc
+import concurrent.futures
+import xml.dom.minidom
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import py_chord_chart_generator as charts
+from py_chord_chart_generator import (COMPRESSION_LEVELS, ChordChartGenerator, ChordDiagram, ChordShapeStore, PackReader, VoicingSearch,
+                                      build_pack, pack_chords, chord_examples, gil_enabled, _compress)
+
+
+def _chords_per_second(parse: Callable[[str], object], chords: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for chord in chords:
+            parse(chord)
+    return repeat * len(chords) / (time.perf_counter() - start)
+
+
+@contextlib.contextmanager
+def _discarded_output(verbosity: str) -> Iterator[None]:
+    # Send the tutorial text and trace records somewhere real but cheap, so I/O cost is included but the terminal stays readable
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        handler = logging.StreamHandler(devnull)
+        logger = logging.getLogger('py_chord_chart_generator')
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG if verbosity == 'log' else logging.WARNING)
+        try:
+            yield
+        finally:
+            logger.removeHandler(handler)
+
+
+def benchmark_parse_verbosity(repeat: int = 200) -> Dict[str, float]:
+    chords = [chord for chord, _ in chord_examples]
+    results = {}
+    for verbosity in ('quiet', 'log', 'print'):
+        generator = ChordChartGenerator(verbosity=verbosity)
+        with _discarded_output(verbosity):
+            results[verbosity] = _chords_per_second(generator.parse_chord, chords, repeat if verbosity == 'quiet' else max(1, repeat // 20))
+    print("\n⏱  parse_chord throughput by verbosity")
+    for verbosity, rate in results.items():
+        print(f"   - {verbosity:<6} {rate:>12,.0f} chords/s  ({rate / results['print']:.1f}x print)")
+    return results
+
+
+ROOTS = ['A', 'A#', 'Bb', 'B', 'C', 'C#', 'Db', 'D', 'D#', 'Eb', 'E', 'F', 'F#', 'Gb', 'G', 'G#', 'Ab']
+
+
+def random_chord_symbols(generator: ChordChartGenerator, count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    # Qualities containing '/' (6/9, m6/9) only parse in special cases, so leave them out of the random mix
+    qualities = [quality for quality in generator.chord_shapes if '/' not in quality]
+    suffixes = ['', '', '', '#5', 'b9', '#11']
+    basses = [''] * 4 + ['/' + root for root in ROOTS]
+    return [rng.choice(ROOTS) + rng.choice(qualities) + rng.choice(suffixes) + rng.choice(basses) for _ in range(count)]
+
+
+def _legacy_split(chord_shapes: Dict[str, List[int]], chord_notation: str):
+    # The per-call regex selection and substring probing parse_chord used before ChordSymbolParser
+    if "/" in chord_notation:
+        if "m6/9" in chord_notation:
+            regex_pattern = r'^([A-G][b#]?)m6/9(?:/([A-G][b#]?))?$'
+        else:
+            regex_pattern = r'^([A-G][b#]?)([^\s/]+)?(?:/([A-G][b#]?))?$'
+    else:
+        regex_pattern = r'^([A-G][b#]?)([^\s/]*)?$'
+    match = re.match(regex_pattern, chord_notation)
+    root = match.group(1)
+    quality = match.group(2) or "major"
+    bass = match.group(3) if len(match.groups()) >= 3 else None
+    for length in range(len(quality), 0, -1):
+        if quality[:length] in chord_shapes:
+            return root, quality, bass, quality[:length], [quality[length:]] if length < len(quality) else []
+    raise ValueError(chord_notation)
+
+
+def benchmark_symbol_parser(count: int = 1_000_000) -> Dict[str, float]:
+    generator = ChordChartGenerator()
+    symbols = random_chord_symbols(generator, count)
+    chord_shapes = generator.chord_shapes
+    results = {
+        'legacy': _chords_per_second(lambda chord: _legacy_split(chord_shapes, chord), symbols, 1),
+        'compiled': _chords_per_second(generator.parser.split, symbols, 1),
+    }
+    print(f"\n⏱  Splitting {count:,} random chord symbols")
+    for name, rate in results.items():
+        print(f"   - {name:<8} {rate:>12,.0f} symbols/s  ({rate / results['legacy']:.2f}x legacy)")
+    return results
+
+
+def _build_example_trees(generator: ChordChartGenerator) -> List[ET.Element]:
+    trees = []
+    for chord, color_scheme in chord_examples:
+        trees.append(generator._build_guitar_svg(generator.diagram(chord), generator.palette(color_scheme), generator.font_mode))
+    return trees
+
+
+def benchmark_serializers() -> Dict[str, Dict[str, float]]:
+    generator = ChordChartGenerator()
+    trees = _build_example_trees(generator)
+
+    def minidom_round_trip(svg: ET.Element) -> int:
+        # The ET.tostring -> parseString -> toprettyxml path _svg_to_string used before
+        return len(xml.dom.minidom.parseString(ET.tostring(svg, encoding='unicode')).toprettyxml())
+
+    def stream(svg: ET.Element, devnull) -> int:
+        written = 0
+        for chunk in generator._iter_svg_chunks(svg, 'pretty'):
+            written += devnull.write(chunk)
+        return written
+
+    with open(os.devnull, 'w') as devnull:
+        modes = {
+            'minidom': minidom_round_trip,
+            'pretty': lambda svg: len(generator._svg_to_string(svg, 'pretty')),
+            'compact': lambda svg: len(generator._svg_to_string(svg, 'compact')),
+            'stream': lambda svg: stream(svg, devnull),
+        }
+        results = {}
+        for name, serialize in modes.items():
+            tracemalloc.start()
+            start = time.perf_counter()
+            output_bytes = sum(serialize(svg) for svg in trees)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name] = {'seconds': elapsed, 'peak_bytes': peak, 'output_bytes': output_bytes}
+
+    print(f"\n⏱  Serializing {len(trees)} guitar diagrams (embedded fonts)")
+    for name, result in results.items():
+        print(f"   - {name:<8} {result['seconds'] * 1000:>9.1f} ms   peak {result['peak_bytes'] / 1e6:>7.2f} MB   output {result['output_bytes'] / 1e6:>7.2f} MB")
+    return results
+
+
+def benchmark_voicing_table(count: int = 1_000_000) -> Dict[str, float]:
+    generator = ChordChartGenerator(parse_cache_size=0)
+    table = generator.voicing_table()
+    # Alterations that append a seventh position can't live in a fixed-width array; keep to symbols the table represents
+    symbols = [chord for chord in random_chord_symbols(generator, count) if len(generator.parse_chord(chord)[2]) == generator.strings]
+    cached = ChordChartGenerator()
+    results = {
+        'parse_chord': _chords_per_second(generator.parse_chord, symbols, 1),
+        'parse_cached': _chords_per_second(cached.parse_chord, symbols, 1),
+    }
+    table.resolve_many(symbols[:1000])
+    start = time.perf_counter()
+    table.resolve_many(symbols)
+    results['resolve_many'] = len(symbols) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    table.transpose_many(symbols, 2)
+    results['transpose_many'] = len(symbols) / (time.perf_counter() - start)
+    print(f"\n⏱  Resolving {len(symbols):,} random chord symbols to finger positions")
+    for name, rate in results.items():
+        print(f"   - {name:<14} {rate:>12,.0f} symbols/s  ({rate / results['parse_chord']:.1f}x parse_chord)")
+    return results
+
+
+def benchmark_chord_identifier(count: int = 20_000, seed: int = 0) -> Dict[str, float]:
+    rng = random.Random(seed)
+    fingerings = [[rng.choice([-1, -1, 0, 1, 2, 3, 4, 5, 7, 9]) for _ in range(6)] for _ in range(count)]
+    generator = ChordChartGenerator()
+    start = time.perf_counter()
+    identifier = generator.chord_identifier()
+    results = {'build_ms': (time.perf_counter() - start) * 1000}
+
+    # Cold: every lookup ranks from scratch, as for the first time a shape appears
+    latencies = []
+    for frets in fingerings[:2000]:
+        identifier._results.clear()
+        start = time.perf_counter()
+        identifier.identify(frets)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    results['cold_p50_us'] = latencies[len(latencies) // 2] * 1e6
+    results['cold_p99_us'] = latencies[int(len(latencies) * 0.99)] * 1e6
+
+    identifier.identify_many(fingerings)
+    start = time.perf_counter()
+    identifier.identify_many(fingerings)
+    results['warm_lookups_per_second'] = count / (time.perf_counter() - start)
+    print(f"\n⏱  Identifying chords from {count:,} random fingerings")
+    print(f"   - index build  {results['build_ms']:>10.2f} ms")
+    print(f"   - cold p50     {results['cold_p50_us']:>10.1f} µs   p99 {results['cold_p99_us']:.1f} µs")
+    print(f"   - memoized     {results['warm_lookups_per_second']:>10,.0f} lookups/s")
+    return results
+
+
+def benchmark_voicing_search(limit: int = 5) -> Dict[str, float]:
+    generator = ChordChartGenerator()
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, 'voicings.json')
+        search = VoicingSearch(generator, cache_path=cache_path)
+        start = time.perf_counter()
+        catalog = search.catalog(limit=limit)
+        results = {'catalog_seconds': time.perf_counter() - start, 'chords': len(catalog), 'searches': len(search._results)}
+
+        # A fresh process reading the same cache file, as the next run would
+        start = time.perf_counter()
+        VoicingSearch(generator, cache_path=cache_path).catalog(limit=limit)
+        results['cached_catalog_seconds'] = time.perf_counter() - start
+        results['cache_bytes'] = os.path.getsize(cache_path)
+
+    print(f"\n⏱  Searching voicings for {results['chords']:,} root x quality chords ({results['searches']} distinct tone sets, top {limit})")
+    print(f"   - cold          {results['catalog_seconds'] * 1000:>9.1f} ms   ({results['catalog_seconds'] / results['searches'] * 1e6:.0f} µs per search)")
+    print(f"   - from cache    {results['cached_catalog_seconds'] * 1000:>9.1f} ms   ({results['cache_bytes'] / 1e3:.0f} kB on disk)")
+    return results
+
+
+def _legacy_shape_dict(data: Dict[str, dict]) -> Dict[str, List[int]]:
+    # The dict of mutable lists _initialize_chord_shapes used to return, aliases sharing their quality's list
+    shapes = {quality: list(positions) for quality, positions in data['shapes'].items()}
+    for alias, quality in data['aliases'].items():
+        shapes[alias] = shapes[quality]
+    return shapes
+
+
+def benchmark_shape_store(count: int = 1_000_000, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    generator = ChordChartGenerator()
+    data = generator.chord_shapes.to_dict()
+    builders = {
+        'dict_of_lists': lambda: _legacy_shape_dict(data),
+        'store': lambda: ChordShapeStore(data['shapes'], data['aliases'], data['intervals']),
+    }
+    rng = random.Random(seed)
+    qualities = [rng.choice(list(generator.chord_shapes)) for _ in range(count)]
+    results = {}
+    for name, build in builders.items():
+        tracemalloc.start()
+        table = build()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # The shape sequences alone, each distinct object counted once, apart from the dicts indexing them
+        shape_bytes = sum(sys.getsizeof(shape) for shape in {id(shape): shape for shape in table.values()}.values())
+        start = time.perf_counter()
+        for quality in qualities:
+            table[quality]
+        results[name] = {'retained_bytes': retained, 'shape_bytes': shape_bytes, 'lookups_per_second': count / (time.perf_counter() - start)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'shapes.json')
+        generator.chord_shapes.save(path)
+        start = time.perf_counter()
+        ChordShapeStore.load(path)
+        results['store']['load_ms'] = (time.perf_counter() - start) * 1000
+
+    store = generator.chord_shapes
+    print(f"\n⏱  Chord shape table ({len(store.qualities())} qualities, {len(store.aliases)} aliases, {store.unique_shapes} distinct shapes)")
+    for name, result in results.items():
+        print(f"   - {name:<14} {result['retained_bytes'] / 1e3:>7.1f} kB total   {result['shape_bytes'] / 1e3:>5.1f} kB shapes   {result['lookups_per_second']:>12,.0f} lookups/s")
+    print(f"   - load from JSON {results['store']['load_ms']:>6.2f} ms")
+    return results
+
+
+def benchmark_diagram_model(repeat: int = 200) -> Dict[str, float]:
+    # What a client downloads per chord: the data model as JSON against the finished guitar SVG
+    generator = ChordChartGenerator()
+    chords = [chord for chord, _ in chord_examples]
+    payloads = [generator.diagram(chord).to_json().encode('utf-8') for chord in chords]
+    svgs = [generator.generate_svg(chord, color_scheme)[0].encode('utf-8') for chord, color_scheme in chord_examples]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        generator.diagrams_json(chords)
+    encode_rate = repeat * len(chords) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            ChordDiagram.from_json(payload)
+    decode_rate = repeat * len(chords) / (time.perf_counter() - start)
+    results = {
+        'json_bytes_mean': sum(map(len, payloads)) / len(payloads), 'json_bytes_max': max(map(len, payloads)),
+        'svg_bytes_mean': sum(map(len, svgs)) / len(svgs), 'encode_per_second': encode_rate, 'decode_per_second': decode_rate,
+    }
+    print(f"\n⏱  Diagram model ({len(chords)} example chords)")
+    print(f"   - JSON payload   {results['json_bytes_mean']:>8.0f} B mean, {results['json_bytes_max']} B max "
+          f"(guitar SVG {results['svg_bytes_mean']:,.0f} B mean)")
+    print(f"   - bulk encode    {encode_rate:>10,.0f} chords/s")
+    print(f"   - decode         {decode_rate:>10,.0f} chords/s")
+    return results
+
+
+def benchmark_startup(repeat: int = 5) -> Dict[str, float]:
+    # Fresh interpreters, so module import and the process-wide font cache both start cold
+    script = (
+        "import time; start = time.perf_counter()\n"
+        "import py_chord_chart_generator as m; imported = time.perf_counter()\n"
+        "g = m.ChordChartGenerator(); constructed = time.perf_counter()\n"
+        "g.parse_chord('Cmaj7'); parsed = time.perf_counter()\n"
+        "g.generate_svg('Cmaj7'); rendered = time.perf_counter()\n"
+        "print(imported - start, constructed - imported, parsed - constructed, rendered - parsed)"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-W', 'ignore', '-c', script], cwd=here, capture_output=True, text=True, check=True).stdout
+        samples.append([float(value) for value in output.split()])
+    names = ('import', 'construct', 'first_parse', 'first_render')
+    results = {name: min(sample[i] for sample in samples) for i, name in enumerate(names)}
+    print(f"\n⏱  Startup (best of {repeat} fresh interpreters)")
+    for name, seconds in results.items():
+        print(f"   - {name:<12} {seconds * 1000:>8.2f} ms")
+    return results
+
+
+def _percentiles_us(samples: List[float], fractions: Tuple[Tuple[str, float], ...] = (('p50', 0.5), ('p99', 0.99))) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {name: samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1e6 for name, fraction in fractions}
+
+
+def benchmark_pack(count: int = 20_000, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    # Per-request latency of a pack lookup against rendering the same SVG on demand (render cache missed), and the
+    # resident memory, in MB, of a fresh process that has served every packed SVG once either way
+    options = dict(font_mode='external', font_url='/fonts/', serializer='compact')
+    generator = ChordChartGenerator(**options, render_cache_size=1)
+    rng = random.Random(seed)
+    requests = [(rng.choice(pack_chords(generator)), rng.choice(list(generator.color_schemes))) for _ in range(count)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'chords.pack')
+        stats = build_pack(generator, path, executor='thread')
+        with PackReader(path) as pack:
+            samples = []
+            for chord, color_scheme in requests:
+                start = time.perf_counter()
+                view = pack.get(chord, color_scheme)
+                samples.append(time.perf_counter() - start)
+                view.release()
+        results['pack'] = _percentiles_us(samples)
+        samples = []
+        for chord, color_scheme in requests[:count // 10]:
+            start = time.perf_counter()
+            generator.generate_svg(chord, color_scheme, show_notation=False)
+            samples.append(time.perf_counter() - start)
+        results['render'] = _percentiles_us(samples)
+
+        script = (
+            "import sys, zlib, py_chord_chart_generator as m\n"
+            f"g = m.ChordChartGenerator(font_mode='external', font_url='/fonts/', serializer='compact')\n"
+            "if sys.argv[1] == 'pack':\n"
+            "    r = m.PackReader(sys.argv[2])\n"
+            "    for chord, scheme, notation in r.keys():\n"
+            "        view = r.get(chord, scheme, notation); zlib.crc32(view); view.release()\n"
+            "else:\n"
+            "    for chord in m.pack_chords(g):\n"
+            "        for scheme in g.color_schemes: g.generate_svg(chord, scheme)\n"
+            "print(open('/proc/self/status').read())"
+        )
+        here = os.path.dirname(os.path.abspath(__file__))
+        for mode in ('pack', 'render'):
+            output = subprocess.run([sys.executable, '-W', 'ignore', '-c', script, mode, path], cwd=here, capture_output=True, text=True, check=True).stdout
+            # Linux only. Not ru_maxrss, which a child inherits from this process across exec. Mapped pack pages count
+            # as RssFile: page cache that every worker process shares and the kernel can drop, unlike RssAnon.
+            status = dict(line.split(':', 1) for line in output.splitlines() if ':' in line)
+            for field in ('VmHWM', 'RssAnon', 'RssFile'):
+                results[mode][field] = int(status[field].split()[0]) / 1024
+
+    print(f"\n⏱  Pack file ({stats.entries:,} SVGs, {stats.bytes / 1e6:.1f} MB, built in {stats.seconds:.2f}s)")
+    for name, result in results.items():
+        print(f"   - {name:<7} p50 {result['p50']:>8.1f} µs   p99 {result['p99']:>8.1f} µs   "
+              f"peak RSS {result['VmHWM']:>5.1f} MB (anonymous {result['RssAnon']:.1f} MB, file-backed {result['RssFile']:.1f} MB)")
+    return results
+
+
+def benchmark_batch_scaling(count: int = 10_000, worker_counts: Tuple[int, ...] = (1, 2, 4, 8), executor: str = 'process') -> Dict[int, Dict[str, float]]:
+    # Throughput of the same count-chord batch, written to disk as the batch command does, at each worker count.
+    # Speedup is against the first count; more workers than os.cpu_count() can't add throughput.
+    generator = ChordChartGenerator(font_mode='external', font_url='../')
+    items = (chord_examples * (count // len(chord_examples) + 1))[:count]
+    results = {}
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            failed = sum(1 for result in generator.generate_batch(items, workers=workers, executor=executor, output_dir=directory) if result.error)
+            seconds = time.perf_counter() - start
+        results[workers] = {'chords_per_second': count / seconds, 'seconds': seconds, 'failed': failed}
+    for result in results.values():
+        result['speedup'] = result['chords_per_second'] / results[worker_counts[0]]['chords_per_second']
+
+    print(f"\n⏱  Batch of {count:,} chords ({executor} executor, {os.cpu_count()} CPUs)")
+    for workers, result in results.items():
+        print(f"   - {workers:>3} workers  {result['chords_per_second']:>10,.0f} chords/s  {result['speedup']:>5.2f}x")
+    return results
+
+
+def benchmark_compression(compressions: tuple = ('gzip', 'brotli')) -> Dict[str, Dict[str, Dict[int, Dict[str, float]]]]:
+    # Ratio and time per level over every chord_examples SVG (guitar and notation), for picking batch --compression-level.
+    # Embedded fonts are base64 TrueType and barely compress; external-font compact output is mostly markup.
+    results = {}
+    for label, options in (('embed/pretty', {}), ('external/compact', dict(font_mode='external', serializer='compact'))):
+        generator = ChordChartGenerator(**options)
+        svgs = [svg.encode('utf-8') for chord, color_scheme in chord_examples for svg in generator.generate_svg(chord, color_scheme)]
+        raw = sum(map(len, svgs))
+        results[label] = {}
+        print(f"\n⏱  Compressing {len(svgs)} SVGs, {label} ({raw / 1e6:.2f} MB)")
+        for compression in compressions:
+            try:
+                _compress(b'', compression, 0)
+            except ImportError as e:
+                print(f"   - {compression:<7} skipped: {e}")
+                continue
+            levels = results[label][compression] = {}
+            for level in range(COMPRESSION_LEVELS[compression][1] + 1):
+                start = time.perf_counter()
+                compressed = sum(len(_compress(svg, compression, level)) for svg in svgs)
+                seconds = time.perf_counter() - start
+                levels[level] = {'bytes': compressed, 'ratio': raw / compressed, 'ms_per_svg': seconds * 1000 / len(svgs), 'mb_per_second': raw / 1e6 / seconds}
+                print(f"   - {compression:<7} level {level:>2}  {compressed / 1e3:>9,.0f} kB  {raw / compressed:>6.2f}x  "
+                      f"{levels[level]['ms_per_svg']:>7.2f} ms/SVG  {levels[level]['mb_per_second']:>7.1f} MB/s")
+    return results
+
+
+def _thread_safety_jobs(generator: ChordChartGenerator) -> List[Tuple[str, Callable[[], object]]]:
+    # Everything one shared generator hands out: both diagrams per scheme and color mode, the data model, voicings,
+    # transposition and identification, so the lazily built helpers and every memo dict are raced for too
+    jobs = []
+    for chord, _ in chord_examples:
+        for color_scheme in generator.color_schemes:
+            for color_mode in ('fixed', 'themable'):
+                jobs.append((f"svg {chord} {color_scheme} {color_mode}", lambda chord=chord, color_scheme=color_scheme, color_mode=color_mode:
+                             generator.generate_svg(chord, color_scheme, color_mode=color_mode)))
+        jobs.append((f"diagram {chord}", lambda chord=chord: generator.diagram(chord).to_json()))
+        jobs.append((f"voicings {chord}", lambda chord=chord: generator.voicings(chord)))
+        if '/' not in chord and len(generator.parse_chord(chord)[2]) == generator.strings:
+            # Each new bass note grows the voicing table by a row
+            jobs.append((f"transpose {chord}", lambda chord=chord: [(name, positions.tolist()) for name, positions in
+                                                                        zip(*generator.transpose_many([chord, chord + '/E', chord + '/G'], 5))]))
+    jobs.append(("identify", lambda: [generator.identify(frets) for frets in ('x32010', '022100', 'x02210', '320003')]))
+    return jobs
+
+
+# Tiny caches keep entries being evicted and re-rendered under contention
+THREAD_SAFETY_OPTIONS = dict(font_mode='external', font_url='/fonts/', serializer='compact', parse_cache_size=16, render_cache_size=8)
+
+
+def render_from_threads(threads: int = 32, rounds: int = 3, seed: int = 0) -> Tuple[int, float, List[str]]:
+    # One generator shared by `threads` threads, each running every job `rounds` times in its own shuffled order,
+    # checked against a serial run: (calls, seconds, failures)
+    options = THREAD_SAFETY_OPTIONS
+    reference = {name: job() for name, job in _thread_safety_jobs(ChordChartGenerator(**options))}
+    generator = ChordChartGenerator(**options)
+    jobs = _thread_safety_jobs(generator)
+    barrier = threading.Barrier(threads)
+
+    def run(worker: int) -> Tuple[int, List[str]]:
+        order = [job for _ in range(rounds) for job in jobs]
+        random.Random(seed + worker).shuffle(order)
+        barrier.wait()  # Start together, so the cold caches and lazy helpers are raced for
+        failures = []
+        for name, job in order:
+            try:
+                if job() != reference[name]:
+                    failures.append(f"{name}: output differs")
+            except Exception as e:
+                failures.append(f"{name}: {type(e).__name__}: {e}")
+        return len(order), failures
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        outcomes = list(pool.map(run, range(threads)))
+    threaded_seconds = time.perf_counter() - start
+    calls = sum(count for count, _ in outcomes)
+    return calls, threaded_seconds, [failure for _, worker_failures in outcomes for failure in worker_failures]
+
+
+def benchmark_thread_safety(threads: int = 32, rounds: int = 3, seed: int = 0) -> Dict[str, float]:
+    # Raises AssertionError on any mismatch, so a benchmark run exits nonzero; tests/test_thread_safety.py runs the same check
+    calls, threaded_seconds, failures = render_from_threads(threads, rounds, seed)
+
+    # The same number of calls on one thread, for the speedup threads buy (none with the GIL on)
+    serial = ChordChartGenerator(**THREAD_SAFETY_OPTIONS)
+    serial_jobs = _thread_safety_jobs(serial)
+    start = time.perf_counter()
+    for _ in range(threads * rounds):
+        for _, job in serial_jobs:
+            job()
+    serial_seconds = time.perf_counter() - start
+
+    results = {'threads': threads, 'calls': calls, 'mismatches': len(failures), 'gil_enabled': gil_enabled(),
+               'threaded_per_second': calls / threaded_seconds, 'serial_per_second': calls / serial_seconds,
+               'speedup': serial_seconds / threaded_seconds}
+    print(f"\n⏱  {threads} threads sharing one generator ({calls:,} calls, GIL {'on' if results['gil_enabled'] else 'off'}, {os.cpu_count()} CPUs)")
+    print(f"   - mismatches     {len(failures):>10,} against the serial output")
+    for failure in failures[:10]:
+        print(f"       {failure}")
+    print(f"   - threaded       {results['threaded_per_second']:>10,.0f} calls/s  ({results['speedup']:.2f}x one thread)")
+    print(f"   - one thread     {results['serial_per_second']:>10,.0f} calls/s")
+    if failures:
+        raise AssertionError(f"{len(failures)} of {calls} threaded calls differ from the serial output, first: {failures[0]}")
+    return results
+
+
+# The regression suite: every case runs in a fresh interpreter, so caches start cold and peak memory is its own.
+# Results are compared against SUITE_BASELINE, which is regenerated with --update-baseline on the reference machine.
+SUITE_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+SUITE_BATCH_SIZES = (44, 1_000, 10_000, 100_000)
+SUITE_PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))
+# Metrics a run fails on, and whether a higher value is better. Raw ops/s and latency percentiles follow the machine's
+# speed of the moment, so they are recorded for reading; throughput is gated once normalized (see _reference_rate).
+SUITE_GATED_METRICS = (('normalized_ops_per_second', True), ('peak_rss_bytes', False), ('output_bytes', False))
+# Iterations per second of _reference_rate's loop on the machine normalized throughput is quoted for
+SUITE_REFERENCE_RATE = 3_000_000
+# What batch cases render with: the server's configuration, since embedded fonts make every result ~0.5 MB
+SUITE_BATCH_OPTIONS = dict(font_mode='external', font_url='/fonts/', serializer='compact')
+
+
+class SuiteMeasurement(NamedTuple):
+    ops: int
+    seconds: float  # For ops, in the best round
+    reference_rate: float  # _reference_rate() around that round
+    latencies: List[float]  # Seconds per operation, one per timed call or group of calls, over every round
+    output_bytes: Optional[int] = None  # Of one round
+
+
+def _reference_rate(iterations: int = 50_000, repeat: int = 3) -> float:
+    # A fixed pure-Python loop, timed next to each measurement. Dividing by it cancels out how fast the machine happened
+    # to be running at that moment: frequency scaling and noisy neighbours swing a shared runner by 1.5x within seconds.
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        table: Dict[str, int] = {}
+        for i in range(iterations):
+            key = str(i % 997)
+            table[key] = table.get(key, 0) + len(key)
+        best = min(best, time.perf_counter() - start)
+    return iterations / best
+
+
+def _time_calls(call: Callable[[Any], object], inputs: List[Any], group: int = 1, rounds: int = 5) -> SuiteMeasurement:
+    # Throughput is that of the best of `rounds` passes relative to the reference loop, which shrugs off a noisy
+    # neighbour far better than the mean. Calls far below the timer's resolution are timed in groups; each latency
+    # sample is then the group's mean.
+    latencies = []
+    best, best_seconds, best_rate = 0.0, 0.0, 0.0
+    for _ in range(rounds):
+        rate = _reference_rate()
+        output_bytes = 0
+        start = time.perf_counter()
+        for offset in range(0, len(inputs), group):
+            chunk = inputs[offset:offset + group]
+            chunk_start = time.perf_counter()
+            for item in chunk:
+                result = call(item)
+                if isinstance(result, str):
+                    output_bytes += len(result.encode('utf-8'))
+            latencies.append((time.perf_counter() - chunk_start) / len(chunk))
+        seconds = time.perf_counter() - start
+        if 1 / (seconds * rate) > best:
+            best, best_seconds, best_rate = 1 / (seconds * rate), seconds, rate
+    return SuiteMeasurement(len(inputs), best_seconds, best_rate, latencies, output_bytes or None)
+
+
+def _case_parse(verbosity: str, count: int) -> SuiteMeasurement:
+    # No parse cache, so every call parses
+    generator = ChordChartGenerator(verbosity=verbosity, parse_cache_size=0)
+    symbols = random_chord_symbols(generator, count)
+    with _discarded_output(verbosity):
+        _time_calls(generator.parse_chord, symbols[:100], rounds=1)
+        return _time_calls(generator.parse_chord, symbols, group=100 if verbosity == 'quiet' else 10)
+
+
+def _case_render(notation: bool, repeat: int = 4) -> SuiteMeasurement:
+    # The chord_examples diagrams with the default (embedded font, pretty) settings; guitar templates warm after the first pass
+    generator = ChordChartGenerator()
+    inputs = [(generator.diagram(chord), generator.palette(color_scheme)) for chord, color_scheme in chord_examples]
+    if notation:
+        render = lambda item: generator._generate_notation_svg(item[0], item[1])
+    else:
+        render = lambda item: generator._generate_guitar_svg(item[0], item[1], generator.font_mode, generator.serializer)
+    _time_calls(render, inputs, rounds=1)
+    measurement = _time_calls(render, inputs * repeat)
+    return measurement._replace(output_bytes=measurement.output_bytes // repeat)
+
+
+def _case_serialize(serializer: str, repeat: int = 2) -> SuiteMeasurement:
+    generator = ChordChartGenerator()
+    trees = _build_example_trees(generator)
+    serialize = lambda tree: generator._svg_to_string(tree, serializer)
+    _time_calls(serialize, trees, rounds=1)
+    measurement = _time_calls(serialize, trees * repeat)
+    return measurement._replace(output_bytes=measurement.output_bytes // repeat)
+
+
+def _case_main_loop() -> SuiteMeasurement:
+    # `python py_chord_chart_generator.py --force` in an empty directory, minus interpreter start-up: one run per process
+    with tempfile.TemporaryDirectory() as directory:
+        previous = os.getcwd()
+        os.chdir(directory)
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                rate = _reference_rate()
+                start = time.perf_counter()
+                charts.main(['--force'])
+                seconds = time.perf_counter() - start
+                rate = (rate + _reference_rate()) / 2
+        finally:
+            os.chdir(previous)
+        output_bytes = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+    return SuiteMeasurement(len(chord_examples), seconds, rate, [seconds], output_bytes)
+
+
+def _case_batch(size: int) -> SuiteMeasurement:
+    # generate_batch with its default executor; latency is the time from the start of the batch to each result
+    generator = ChordChartGenerator(**SUITE_BATCH_OPTIONS)
+    if size == len(chord_examples):
+        items = list(chord_examples)
+    else:
+        schemes = list(generator.color_schemes)
+        items = [(chord, schemes[i % len(schemes)]) for i, chord in enumerate(random_chord_symbols(generator, size))]
+    latencies = []
+    output_bytes = 0
+    rate = _reference_rate()
+    start = time.perf_counter()
+    for result in generator.generate_batch(items, show_notation=True):
+        if result.error:
+            raise RuntimeError(f"{result.chord}: {result.error}")
+        latencies.append(time.perf_counter() - start)
+        output_bytes += len(result.guitar_svg.encode('utf-8')) + len(result.notation_svg.encode('utf-8'))
+    seconds = time.perf_counter() - start
+    return SuiteMeasurement(size, seconds, (rate + _reference_rate()) / 2, latencies, output_bytes)
+
+
+# Case name -> (function, arguments, processes). Each process runs the case once; throughput is the best process's.
+SUITE_CASES: Dict[str, Tuple[Callable[..., SuiteMeasurement], tuple, int]] = {
+    'parse_chord.quiet': (_case_parse, ('quiet', 20_000), 1),
+    'parse_chord.print': (_case_parse, ('print', 1_000), 1),
+    'parse_chord.log': (_case_parse, ('log', 1_000), 1),
+    'guitar_svg': (_case_render, (False,), 1),
+    'notation_svg': (_case_render, (True,), 1),
+    'svg_to_string.pretty': (_case_serialize, ('pretty',), 1),
+    'svg_to_string.compact': (_case_serialize, ('compact',), 1),
+    'main_loop': (_case_main_loop, (), 5),
+    # Small batches are mostly pool start-up, so they get the most tries
+    **{f'batch.{size}': (_case_batch, (size,), 5 if size <= 1_000 else 1) for size in SUITE_BATCH_SIZES},
+}
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    # This process's high-water mark, or its largest finished child's (batch pool workers). None where neither is readable.
+    try:
+        import resource
+    except ImportError:
+        return None
+    unit = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    with contextlib.suppress(OSError), open('/proc/self/status') as status:
+        # Exact on Linux, where ru_maxrss may carry over from the parent across exec
+        own = next(int(line.split()[1]) * 1024 for line in status if line.startswith('VmHWM:'))
+    return max(own, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit)
+
+
+def _run_suite_case(name: str) -> Dict[str, Any]:
+    function, arguments, processes = SUITE_CASES[name]
+    here = os.path.dirname(os.path.abspath(__file__))
+    measurements, peaks = [], []
+    for _ in range(processes):
+        output = subprocess.run([sys.executable, '-W', 'ignore', os.path.abspath(__file__), 'suite', '--run-case', name],
+                                cwd=here, capture_output=True, text=True)
+        if output.returncode:
+            raise RuntimeError(f"Benchmark case {name} failed:\n{output.stderr}")
+        measurement, peak = json.loads(output.stdout.splitlines()[-1])
+        measurements.append(SuiteMeasurement(*measurement))
+        peaks.append(peak)
+    best = max(measurements, key=lambda measurement: measurement.ops / (measurement.seconds * measurement.reference_rate))
+    latencies = [latency for measurement in measurements for latency in measurement.latencies]
+    return {
+        'ops': best.ops, 'seconds': best.seconds, 'ops_per_second': best.ops / best.seconds, 'reference_rate': best.reference_rate,
+        'normalized_ops_per_second': best.ops / best.seconds * SUITE_REFERENCE_RATE / best.reference_rate,
+        'latency_us': _percentiles_us(latencies, SUITE_PERCENTILES),
+        'peak_rss_bytes': None if None in peaks else max(peaks),
+        'output_bytes': measurements[0].output_bytes,
+    }
+
+
+def run_suite(cases: Optional[List[str]] = None, max_batch: Optional[int] = None) -> Dict[str, Any]:
+    names = [name for name in (cases or SUITE_CASES)
+             if not (max_batch is not None and SUITE_CASES[name][0] is _case_batch and SUITE_CASES[name][1][0] > max_batch)]
+    results = {
+        'environment': {
+            'generator_version': charts.__version__, 'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'machine': platform.machine(), 'cpus': os.cpu_count(), 'gil_enabled': gil_enabled(),
+        },
+        'cases': {},
+    }
+    # Bytecode first, even with PYTHONDONTWRITEBYTECODE set: a case that recompiles the generator on import peaks ~9 MB higher
+    for module in (charts.__file__, os.path.abspath(__file__)):
+        py_compile.compile(module, doraise=True)
+    print(f"\n⏱  Benchmark suite ({len(names)} cases, each in a fresh interpreter)")
+    for name in names:
+        result = results['cases'][name] = _run_suite_case(name)
+        peak = f"{result['peak_rss_bytes'] / 1e6:>7.1f} MB" if result['peak_rss_bytes'] is not None else '      n/a'
+        output = f"{result['output_bytes'] / 1e6:>9.3f} MB" if result['output_bytes'] is not None else '          -'
+        print(f"   - {name:<22} {result['ops_per_second']:>12,.0f} ops/s ({result['normalized_ops_per_second']:>10,.0f} normalized)   p50 {result['latency_us']['p50']:>11,.1f} µs   "
+              f"p99 {result['latency_us']['p99']:>11,.1f} µs   peak {peak}   output {output}")
+    return results
+
+
+def _metric(case: Dict[str, Any], path: str) -> Optional[float]:
+    for part in path.split('.'):
+        case = case.get(part) if isinstance(case, dict) else None
+    return case
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    # Every gated metric more than `threshold` (a fraction) worse than the baseline's, as printable lines
+    regressions = []
+    for name, case in results['cases'].items():
+        reference = baseline['cases'].get(name)
+        if reference is None:
+            print(f"   - {name:<22} no baseline")
+            continue
+        for metric, higher_is_better in SUITE_GATED_METRICS:
+            current, previous = _metric(case, metric), _metric(reference, metric)
+            if current is None or not previous:
+                continue
+            change = current / previous - 1
+            worse = -change if higher_is_better else change
+            marker = '❌' if worse > threshold else '  '
+            line = f"{name:<22} {metric:<16} {previous:>16,.1f} -> {current:>16,.1f}  ({change:+.1%})"
+            print(f"   {marker} {line}")
+            if worse > threshold:
+                regressions.append(line)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks. With no command, runs the exploratory benchmarks and prints their results.")
+    commands = parser.add_subparsers(dest='command')
+    suite = commands.add_parser('suite', help="Run the regression suite and compare it against the committed baseline")
+    suite.add_argument('-o', '--output', default='benchmark_results.json', help="Where to write the results as JSON")
+    suite.add_argument('--baseline', default=SUITE_BASELINE)
+    suite.add_argument('--threshold', type=float, default=0.25, help="Fail when a gated metric is this fraction worse than the baseline")
+    suite.add_argument('--update-baseline', action='store_true', help="Write the results to the baseline instead of comparing")
+    suite.add_argument('--case', action='append', choices=list(SUITE_CASES), help="Run only this case (repeatable)")
+    suite.add_argument('--max-batch', type=int, default=None, help="Skip batch cases larger than this")
+    suite.add_argument('--run-case', choices=list(SUITE_CASES), help=argparse.SUPPRESS)
+    scaling = commands.add_parser('scaling', help="Time one batch at several worker counts")
+    scaling.add_argument('--chords', type=int, default=10_000)
+    scaling.add_argument('-j', '--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    scaling.add_argument('--executor', choices=('process', 'thread'), default='process')
+    scaling.add_argument('-o', '--output', default=None, help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        benchmark_parse_verbosity()
+        benchmark_symbol_parser()
+        benchmark_serializers()
+        benchmark_startup()
+        benchmark_voicing_table()
+        benchmark_chord_identifier()
+        benchmark_voicing_search()
+        benchmark_shape_store()
+        benchmark_diagram_model()
+        benchmark_pack()
+        benchmark_compression()
+        benchmark_thread_safety()
+        benchmark_batch_scaling()
+        return 0
+
+    if args.command == 'scaling':
+        results = benchmark_batch_scaling(args.chords, tuple(args.workers), args.executor)
+        if args.output:
+            charts._atomic_write(args.output, json.dumps({'cpu_count': os.cpu_count(), 'executor': args.executor, 'chords': args.chords,
+                                                          'workers': results}, indent=2) + '\n')
+        return 0
+
+    if args.run_case:
+        # Inside the fresh interpreter _run_suite_case starts: the measurement and peak RSS, as the last line of output
+        function, arguments, _ = SUITE_CASES[args.run_case]
+        measurement = function(*arguments)
+        print(json.dumps([list(measurement), _peak_rss_bytes()]))
+        return 0
+
+    results = run_suite(args.case, args.max_batch)
+    results['threshold'] = args.threshold
+    charts._atomic_write(args.output, json.dumps(results, indent=2) + '\n')
+    print(f"\n📄 Results written to {args.output}")
+    if args.update_baseline:
+        charts._atomic_write(args.baseline, json.dumps(results, indent=2) + '\n')
+        print(f"📌 Baseline updated: {args.baseline}")
+        return 0
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"🚫 No baseline at {args.baseline}; create one with --update-baseline.")
+        return 1
+    print(f"\n⏱  Against the baseline (threshold {args.threshold:.0%})")
+    differences = [key for key in ('python', 'implementation', 'machine', 'cpus', 'gil_enabled')
+                   if baseline['environment'].get(key) != results['environment'][key]]
+    if differences:
+        print(f"   ⚠️  The baseline was recorded on a different setup ({', '.join(differences)}); timings may not be comparable.")
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"   - {line}")
+        return 1
+    print("\n✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,27 +2,723 @@ import re
 import os
 import base64
 import time
-from typing import List, Tuple, Dict, Optional
+import logging
+import sys
+import html
+import zipfile
+import argparse
+import threading
+import functools
+import hashlib
+import heapq
+import gzip
+import json
+import mmap
+import itertools
+import struct
+import contextlib
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+import concurrent.futures  # The pool classes are resolved on first use, keeping module import cheap
+from typing import IO, Any, Hashable, List, Tuple, Dict, Optional, Iterable, Iterator, NamedTuple, Pattern, Sequence, TextIO, Union
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
+from io import BytesIO
+from types import MappingProxyType
+from urllib.parse import quote
 
-class ChordChartGenerator:
+__version__ = '1.0.0'
+
+FONT_FILES = {
+    'roboto': 'Roboto-Regular.ttf',
+    'noto_music': 'NotoMusic-Regular.ttf'
+}
+FONT_MODES = ('embed', 'external', 'subset')
+DEFAULT_FONT_DIR = os.path.dirname(os.path.abspath(__file__))
+VERBOSITY_LEVELS = ('quiet', 'print', 'log')
+PROFILE_CAPTURES = ('cprofile', 'tracemalloc')
+SERIALIZERS = ('pretty', 'compact')
+COLOR_MODES = ('fixed', 'themable')
+# Shades derived from a scheme's base colors: (palette key, base color, 'lighten' or 'darken', factor)
+DERIVED_COLORS = (
+    ('fretboard-shade', 'fretboard', 'darken', 0.2),
+    ('fret', 'fretboard', 'lighten', 0.3),
+    ('string', 'fretboard', 'lighten', 0.5),
+    ('finger-stroke', 'finger', 'darken', 0.2),
+    ('text-shadow', 'background', 'lighten', 0.2),
+)
+THEME_PROPERTY_PREFIX = '--chord-'
+THEME_STYLESHEET = 'chord_themes.css'
+# 'auto' is a thread pool where threads render in parallel (free-threaded CPython 3.13+ with the GIL off), else processes
+EXECUTORS = ('auto', 'process', 'thread', 'serial')
+COLOR_KEYS = ('background', 'fretboard', 'text', 'finger', 'open', 'muted')
+DEFAULT_COLOR_SCHEMES = {
+    'default': {'background': '#f5f5f5', 'fretboard': '#8a4b08', 'text': '#333', 'finger': '#4CAF50', 'open': '#1e88e5', 'muted': '#e53935'},
+    'neon': {'background': '#000000', 'fretboard': '#ffffff', 'text': '#ffffff', 'finger': '#00ff00', 'open': '#00ffff', 'muted': '#ff00ff'}
+}
+RASTER_FORMATS = ('png', 'webp')
+# svgz replaces each SVG with a gzip stream; gzip and brotli write a precompressed .svg.gz or .svg.br beside it
+COMPRESSIONS = ('svgz', 'gzip', 'brotli')
+# (default, highest) level per compression: the libraries' own defaults, since gzip 9 takes four times as long as 5 on
+# embedded-font diagrams for no smaller output (see benchmark_compression)
+COMPRESSION_LEVELS = {'svgz': (6, 9), 'gzip': (6, 9), 'brotli': (11, 11)}
+# Semitones above A for every root spelling parse_chord accepts
+ROOT_ADJUSTMENT = {
+    'A': 0, 'A#': 1, 'Bb': 1, 'B': 2, 'C': 3, 'C#': 4, 'Db': 4,
+    'D': 5, 'D#': 6, 'Eb': 6, 'E': 7, 'F': 8, 'F#': 9, 'Gb': 9,
+    'G': 10, 'G#': 11, 'Ab': 11
+}
+SHARP_ROOTS = ('A', 'A#', 'B', 'C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#')
+FLAT_ROOTS = ('A', 'Bb', 'B', 'C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab')
+STANDARD_TUNING = (7, 0, 5, 10, 2, 7)  # E A D G B E, low to high, in semitones above A like ROOT_ADJUSTMENT
+# Chord tones of every base quality in the shape table, in semitones above the root. The shape templates only
+# approximate these once shifted, so reverse lookup and voicing search work from the intervals instead.
+QUALITY_INTERVALS = {
+    'major': (0, 4, 7), 'minor': (0, 3, 7), '5': (0, 7), 'dim': (0, 3, 6), 'aug': (0, 4, 8),
+    'sus2': (0, 2, 7), 'sus4': (0, 5, 7), 'add9': (0, 4, 7, 2), '6': (0, 4, 7, 9), 'm6': (0, 3, 7, 9),
+    '6/9': (0, 4, 7, 9, 2), 'm6/9': (0, 3, 7, 9, 2),
+    '7': (0, 4, 7, 10), 'maj7': (0, 4, 7, 11), 'm7': (0, 3, 7, 10), 'dim7': (0, 3, 6, 9), 'm7b5': (0, 3, 6, 10),
+    'aug7': (0, 4, 8, 10), '7sus4': (0, 5, 7, 10),
+    '9': (0, 4, 7, 10, 2), 'maj9': (0, 4, 7, 11, 2), 'm9': (0, 3, 7, 10, 2), 'm9b5': (0, 3, 6, 10, 2), 'aug9': (0, 4, 8, 10, 2),
+    '11': (0, 4, 7, 10, 2, 5), 'maj11': (0, 4, 7, 11, 2, 5), 'm11': (0, 3, 7, 10, 2, 5),
+    '13': (0, 4, 7, 10, 2, 9), 'maj13': (0, 4, 7, 11, 2, 9), 'm13': (0, 3, 7, 10, 2, 9), '13sus4': (0, 5, 7, 10, 2, 9),
+    '7b9': (0, 4, 7, 10, 1), '7#9': (0, 4, 7, 10, 3), '7b5': (0, 4, 6, 10), '7#5': (0, 4, 8, 10), '7#11': (0, 4, 7, 10, 6),
+    '7b13': (0, 4, 7, 10, 8), '7#5b9': (0, 4, 8, 10, 1), '7#9#5': (0, 4, 8, 10, 3), '7b9b13': (0, 4, 7, 10, 1, 8),
+    '7#9b13': (0, 4, 7, 10, 3, 8), '7#11b13': (0, 4, 7, 10, 6, 8),
+    '9b5': (0, 4, 6, 10, 2), '9#5': (0, 4, 8, 10, 2), '9#11': (0, 4, 7, 10, 2, 6), '9b13': (0, 4, 7, 10, 2, 8),
+    '13b9': (0, 4, 7, 10, 1, 9), '13#9': (0, 4, 7, 10, 3, 9), '13#11': (0, 4, 7, 10, 2, 6, 9), '13b5': (0, 4, 6, 10, 2, 9),
+    'm13b9': (0, 3, 7, 10, 1, 9), 'maj13#11': (0, 4, 7, 11, 2, 6, 9), '7alt': (0, 4, 10, 1, 3, 6, 8),
+}
+# How a quality key is written after the root in a chord name
+QUALITY_SYMBOLS = {'major': '', 'minor': 'm'}
+TEMPLATE_SLOT = 'chord-chart-slot'  # Placeholder element marking where per-chord content goes in a prebuilt template
+MANIFEST_FILENAME = '.chord_chart_manifest.json'
+GALLERY_FILENAME = 'chord_chart_gallery.html'  # The gallery index; its pages sit beside it
+GALLERY_PAGE_SIZE = 48
+PACK_MAGIC = b'CCPK'
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct('<4sHHIIQQI')  # magic, version, reserved, index slots, entries, index offset, metadata offset and length
+PACK_SLOT = struct.Struct('<QQII')  # key hash (0 marks an empty slot), body offset, body length, key length
+
+logger = logging.getLogger(__name__)
+
+_DECIMAL_PATTERN = re.compile(r'^-?\d+\.\d+$')
+_HEX_COLOR_PATTERN = re.compile(r'^#[0-9a-fA-F]{6}$')
+
+def _escape_pretty(data: str) -> str:
+    # Same escaping minidom's toprettyxml applies to both text and attribute values
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+def _escape_text(data: str) -> str:
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def _escape_attribute(data: str) -> str:
+    return _escape_text(data).replace("\"", "&quot;").replace("\n", "&#10;")
+
+@functools.lru_cache(maxsize=None)
+def _read_font(path: str) -> bytes:
+    # Process-wide: every generator shares one copy of each font file, read on first use
+    with open(path, 'rb') as font_file:
+        return font_file.read()
+
+@functools.lru_cache(maxsize=None)
+def _font_data_uri(path: str) -> str:
+    return 'data:font/truetype;charset=utf-8;base64,{}'.format(base64.b64encode(_read_font(path)).decode('utf-8'))
+
+@contextlib.contextmanager
+def _atomic_open(path: str, mode: str = 'w') -> Iterator[IO]:
+    # Write a sibling temp file, then rename it over the target, so readers (and uploads) never see a partial file.
+    # The temp name is unique per thread instead of coming from mkstemp, so the result keeps the usual umask permissions.
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp_path)
+        raise
+
+def _atomic_write(path: str, data: Union[str, bytes]) -> int:
+    with _atomic_open(path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        return f.write(data)
+
+def _compact_css(css: str) -> str:
+    # Plain string operations: the text can hold a ~200 KB data URI that a regex would crawl through
+    css = ''.join(line.strip() for line in css.splitlines())
+    return css.replace(' {', '{').replace(': ', ':')
+
+def _compact_number(value: str) -> str:
+    # 60.0 -> 60, 44.44444444444444 -> 44.44
+    if _DECIMAL_PATTERN.match(value):
+        return f"{float(value):.2f}".rstrip('0').rstrip('.')
+    return value
+
+def _json_default(value: Any) -> Any:
+    # Read-only mappings (color schemes, palettes) hash like the dicts they wrap
+    return dict(value) if isinstance(value, Mapping) else repr(value)
+
+def gil_enabled() -> bool:
+    # False only on a free-threaded build (3.13t+) running with the GIL off
+    return getattr(sys, '_is_gil_enabled', lambda: True)()
+
+def resolve_executor(executor: str) -> str:
+    if executor == 'auto':
+        return 'process' if gil_enabled() else 'thread'
+    return executor
+
+class LRUCache:
+    # Bounded least-recently-used cache; a maxsize of 0 disables it. Only store immutable values.
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 128):
+        if maxsize < 0:
+            raise ValueError(f"🚫 Cache size must be zero or positive, got {maxsize}.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, self._MISSING)
+            if value is self._MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        # Under the lock, so a /metrics scrape sees counters and size from one moment
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._data), 'maxsize': self.maxsize}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class RasterCache:
+    # Content-addressed: keys hash the SVG bytes plus the raster parameters, so identical diagrams share an entry
+    # whatever chord name produced them. Entries live in an in-memory LRU and, with a directory, on disk across runs.
+    def __init__(self, maxsize: int = 256, directory: Optional[str] = None):
+        self.memory = LRUCache(maxsize)
+        self.directory = directory
+
+    @staticmethod
+    def key(svg: bytes, scale: float, output_format: str, quality: int) -> str:
+        digest = hashlib.sha256(svg)
+        digest.update(f"|{scale!r}|{output_format}|{quality}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str, output_format: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{output_format}")
+
+    def get(self, key: str, output_format: str) -> Optional[bytes]:
+        data = self.memory.get(key)
+        if data is None and self.directory:
+            try:
+                with open(self._path(key, output_format), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return None
+            self.memory.put(key, data)
+        return data
+
+    def put(self, key: str, output_format: str, data: bytes):
+        self.memory.put(key, data)
+        if self.directory:
+            path = self._path(key, output_format)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _atomic_write(path, data)
+
+    def clear(self):
+        self.memory.clear()
+
+class OutputManifest:
+    # Maps each output path (relative to output_dir) to a hash of every input that went into it.
+    # Outputs whose hash is unchanged and whose file still exists are skipped; tracked files a run no longer
+    # produces are deleted by finish(). Files the manifest never wrote are left alone.
+    def __init__(self, output_dir: str = '.', filename: str = MANIFEST_FILENAME, force: bool = False):
+        # force regenerates everything, but still reads the old manifest so orphans get cleaned up
+        self.output_dir = output_dir
+        self.force = force
+        self.path = os.path.join(output_dir, filename)
+        try:
+            with open(self.path) as f:
+                self.previous: Dict[str, str] = json.load(f).get('outputs', {})
+        except (FileNotFoundError, ValueError):
+            self.previous = {}
+        self.current: Dict[str, str] = {}
+        self.generated: List[str] = []
+        self.skipped: List[str] = []
+        self.removed: List[str] = []
+
+    @staticmethod
+    def digest(*inputs: Any) -> str:
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=_json_default).encode('utf-8')).hexdigest()
+
+    def is_current(self, relative_path: str, digest: str) -> bool:
+        if not self.force and self.previous.get(relative_path) == digest and os.path.exists(os.path.join(self.output_dir, relative_path)):
+            self.current[relative_path] = digest
+            self.skipped.append(relative_path)
+            return True
+        return False
+
+    def record(self, relative_path: str, digest: str):
+        self.current[relative_path] = digest
+        self.generated.append(relative_path)
+
+    def write(self, relative_path: str, digest: str, data: Union[str, bytes]) -> int:
+        path = os.path.join(self.output_dir, relative_path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        written = _atomic_write(path, data)
+        self.record(relative_path, digest)
+        return written
+
+    def finish(self, remove_orphans: bool = True):
+        if remove_orphans:
+            for relative_path in self.previous.keys() - self.current.keys():
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.output_dir, relative_path))
+                self.removed.append(relative_path)
+        else:
+            self.current = {**self.previous, **self.current}
+        # A no-op run leaves even the manifest untouched
+        if self.current != self.previous:
+            os.makedirs(self.output_dir, exist_ok=True)
+            _atomic_write(self.path, json.dumps({'generator_version': __version__, 'outputs': self.current}, indent=1, sort_keys=True))
+
+    def summary(self) -> str:
+        return f"Generated {len(self.generated)} files, skipped {len(self.skipped)} unchanged, removed {len(self.removed)} orphaned."
+
+class _NullStage:
+    # Shared by every stage while profiling is off, so instrumentation costs one attribute test and an empty with-block
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullStage':
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def add_bytes(self, count: int):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+class _ProfiledStage:
+    __slots__ = ('profiler', 'name', 'chord', 'bytes', 'start', 'blocks', 'previous_chord')
+
+    def __init__(self, profiler: 'RenderProfiler', name: str, chord: Optional[str]):
+        self.profiler = profiler
+        self.name = name
+        self.chord = chord
+        self.bytes = 0
+
+    def __enter__(self) -> '_ProfiledStage':
+        if self.chord is not None:
+            self.previous_chord = self.profiler.chord
+            self.profiler.chord = self.chord
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def add_bytes(self, count: int):
+        self.bytes += count
+
+    def __exit__(self, *exc_info) -> bool:
+        seconds = time.perf_counter() - self.start
+        self.profiler._record(self.profiler.chord, self.name, seconds, self.bytes, sys.getallocatedblocks() - self.blocks)
+        if self.chord is not None:
+            self.profiler.chord = self.previous_chord
+        return False
+
+class RenderProfiler:
+    # Wall time, bytes produced and net allocated blocks per (chord, stage). Nested stages are recorded separately,
+    # so 'guitar' includes its 'guitar.*' children. Chord attribution assumes one rendering thread at a time.
     def __init__(self):
+        self.chord: Optional[str] = None
+        self.stats: Dict[Tuple[Optional[str], str], List[float]] = {}
+        self.counters: Counter = Counter()
+        self.capture_report: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def stage(self, name: str, chord: Optional[str] = None) -> _ProfiledStage:
+        return _ProfiledStage(self, name, chord)
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _record(self, chord: Optional[str], name: str, seconds: float, output_bytes: int, blocks: int):
+        with self._lock:
+            entry = self.stats.get((chord, name))
+            if entry is None:
+                self.stats[(chord, name)] = [1, seconds, output_bytes, blocks]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] += output_bytes
+                entry[3] += blocks
+
+    def by_stage(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, List[float]] = {}
+        for (_, name), (calls, seconds, output_bytes, blocks) in self.stats.items():
+            entry = totals.setdefault(name, [0, 0.0, 0, 0])
+            entry[0] += calls
+            entry[1] += seconds
+            entry[2] += output_bytes
+            entry[3] += blocks
+        return {name: {'calls': calls, 'seconds': seconds, 'bytes': output_bytes, 'blocks': blocks}
+                for name, (calls, seconds, output_bytes, blocks) in totals.items()}
+
+    def by_chord(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        chords: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (chord, name), (calls, seconds, output_bytes, blocks) in self.stats.items():
+            chords.setdefault(chord or '', {})[name] = {'calls': calls, 'seconds': seconds, 'bytes': output_bytes, 'blocks': blocks}
+        return chords
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<20} {'calls':>7} {'total ms':>10} {'mean µs':>10} {'bytes':>12} {'blocks':>9}"]
+        for name, stage in sorted(self.by_stage().items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f"{name:<20} {stage['calls']:>7} {stage['seconds'] * 1000:>10.2f} {stage['seconds'] / stage['calls'] * 1e6:>10.1f} "
+                         f"{stage['bytes']:>12,} {stage['blocks']:>9,}")
+        for name, count in sorted(self.counters.items()):
+            lines.append(f"{name:<20} {count:>7}")
+        if self.capture_report:
+            lines.extend(['', self.capture_report])
+        return '\n'.join(lines)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'stages': self.by_stage(), 'chords': self.by_chord(), 'counters': dict(self.counters), 'capture': self.capture_report}
+
+    def write_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    @contextlib.contextmanager
+    def capture(self, mode: str, limit: int = 25) -> Iterator['RenderProfiler']:
+        # Heavier, whole-batch capture on top of the stage timings: a cProfile function table or the top tracemalloc allocation sites
+        if mode not in PROFILE_CAPTURES:
+            raise ValueError(f"🚫 Capture mode '{mode}' not recognized. Use one of: {', '.join(PROFILE_CAPTURES)}.")
+        if mode == 'cprofile':
+            import cProfile
+            import io
+            import pstats
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield self
+            finally:
+                profile.disable()
+                report = io.StringIO()
+                pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(limit)
+                self.capture_report = report.getvalue().strip()
+        else:
+            import tracemalloc
+            already_tracing = tracemalloc.is_tracing()
+            if not already_tracing:
+                tracemalloc.start()
+            try:
+                yield self
+            finally:
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                if not already_tracing:
+                    tracemalloc.stop()
+                lines = [f"tracemalloc: current {current / 1e6:.2f} MB, peak {peak / 1e6:.2f} MB; top {limit} allocation sites"]
+                lines.extend(str(statistic) for statistic in snapshot.statistics('lineno')[:limit])
+                self.capture_report = '\n'.join(lines)
+
+class BatchResult(NamedTuple):
+    index: int
+    chord: str
+    color_scheme: str
+    guitar_svg: Optional[str] = None
+    notation_svg: Optional[str] = None
+    guitar_path: Optional[str] = None
+    notation_path: Optional[str] = None
+    error: Optional[str] = None
+    skipped: bool = False
+
+class RasterResult(NamedTuple):
+    index: int
+    chord: str
+    color_scheme: str
+    scale: float
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+class ChordMatch(NamedTuple):
+    name: str
+    root: str
+    quality: str
+    bass: Optional[str]
+    missing: int  # Chord tones that aren't sounding
+    extra: int  # Sounding notes that aren't chord tones (a foreign bass note doesn't count)
+    exact: bool
+
+class Voicing(NamedTuple):
+    frets: Tuple[int, ...]  # Low E to high E like parse_chord's finger positions: 0 open, -1 muted
+    base_fret: int  # First fret of the drawn window; 1 unless the voicing reaches past the diagram's last fret
+    fingers: int
+    span: int  # Frets from the lowest to the highest fretted note, inclusive
+    missing: int  # Optional chord tones left out
+    score: float  # Lower is easier to play
+
+class ChordDiagram(NamedTuple):
+    # Everything the renderers draw, as plain data: clients that draw their own UI take this (or its JSON) instead of SVG
+    root: str
+    quality: str
+    bass: Optional[str]
+    frets: Tuple[int, ...]  # Per string, low E to high E: the fret pressed, 0 for open, -1 for muted
+    base_fret: int = 1  # Fret number the drawn window starts at
+    notes: Tuple[Tuple[int, int], ...] = ()  # Notation note heads as (staff step, 1 = C to 7 = B; octave)
+    key_signature: Tuple[str, ...] = ()  # Notes carrying a sharp or flat, in signature order
+
+    @property
+    def name(self) -> str:
+        return f"{self.root}{self.quality}" + (f"/{self.bass}" if self.bass else '')
+
+    @property
+    def string_states(self) -> Tuple[str, ...]:
+        return tuple('muted' if fret < 0 else 'open' if fret == 0 else 'fretted' for fret in self.frets)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'root': self.root, 'quality': self.quality, 'bass': self.bass, 'frets': self.frets, 'base_fret': self.base_fret,
+                'notes': self.notes, 'key_signature': self.key_signature}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), separators=(',', ':'))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ChordDiagram':
+        return cls(data['root'], data['quality'], data.get('bass'), tuple(data['frets']), data.get('base_fret', 1),
+                   tuple(tuple(note) for note in data.get('notes', ())), tuple(data.get('key_signature', ())))
+
+    @classmethod
+    def from_json(cls, text: Union[str, bytes]) -> 'ChordDiagram':
+        return cls.from_dict(json.loads(text))
+
+class ChordShapeStore(dict):
+    # Read-only quality -> finger positions table. Shapes are tuples, and identical shapes are stored once however many
+    # qualities use them. Aliases (maj, min7, ...) are kept apart from the qualities they stand for, so code that
+    # needs one entry per chord (reverse lookup, voicing search) iterates qualities() and never sees duplicates.
+    # A dict subclass with mutation blocked, rather than a Mapping wrapper, so lookups stay at plain dict speed.
+    def __init__(self, shapes: Mapping[str, Sequence[int]], aliases: Optional[Mapping[str, str]] = None,
+                 intervals: Optional[Mapping[str, Sequence[int]]] = None):
+        interned: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        table: Dict[str, Tuple[int, ...]] = {}
+        for quality, positions in shapes.items():
+            positions = tuple(int(pos) for pos in positions)
+            if not positions:
+                raise ValueError(f"🚫 Shape '{quality}' has no finger positions.")
+            table[quality] = interned.setdefault(positions, positions)
+        self._qualities = tuple(table)
+        self.aliases: Dict[str, str] = {}
+        for alias, quality in (aliases or {}).items():
+            if quality not in self._qualities:
+                raise ValueError(f"🚫 Alias '{alias}' points at unknown quality '{quality}'.")
+            self.aliases[alias] = quality
+            table[alias] = table[quality]
+        super().__init__(table)
+        # Chord tones per quality, in semitones above the root; qualities without them are skipped by reverse lookup
+        self.intervals: Dict[str, Tuple[int, ...]] = {quality: tuple(QUALITY_INTERVALS[quality]) for quality in self._qualities if quality in QUALITY_INTERVALS}
+        for quality, quality_intervals in (intervals or {}).items():
+            if quality not in self._qualities:
+                raise ValueError(f"🚫 Intervals given for unknown quality '{quality}'.")
+            self.intervals[quality] = tuple(int(interval) % 12 for interval in quality_intervals)
+        self.unique_shapes = len(interned)
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("🚫 The chord shape table is read-only. Build a new ChordShapeStore, or load extra shapes from a file.")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return self.__class__, (self.to_dict()['shapes'], self.aliases, self.intervals)
+
+    def __repr__(self) -> str:
+        return f"ChordShapeStore({len(self._qualities)} qualities, {len(self.aliases)} aliases, {self.unique_shapes} distinct shapes)"
+
+    def qualities(self) -> Tuple[str, ...]:
+        return self._qualities
+
+    def canonical(self, quality: str) -> str:
+        if quality not in self:
+            raise KeyError(quality)
+        return self.aliases.get(quality, quality)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'shapes': {quality: list(self[quality]) for quality in self._qualities},
+            'aliases': dict(self.aliases),
+            'intervals': {quality: list(intervals) for quality, intervals in self.intervals.items()},
+        }
+
+    def save(self, path: str) -> int:
+        return _atomic_write(path, json.dumps(self.to_dict(), indent=1))
+
+    @classmethod
+    def load(cls, path: str, base: Optional['ChordShapeStore'] = None) -> 'ChordShapeStore':
+        # A JSON file as written by save(). With a base table, its shapes, aliases and intervals add to or replace the base's.
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get('shapes'), dict):
+            raise ValueError(f"🚫 '{path}' is not a chord shape file: expected an object with a 'shapes' mapping.")
+        shapes, aliases, intervals = data['shapes'], data.get('aliases', {}), data.get('intervals', {})
+        if base is not None:
+            base_data = base.to_dict()
+            # A quality redefined by the file stops being an alias of the base table
+            shapes = {**base_data['shapes'], **shapes}
+            aliases = {alias: quality for alias, quality in {**base_data['aliases'], **aliases}.items() if alias not in shapes}
+            intervals = {**base_data['intervals'], **intervals}
+        return cls(shapes, aliases, intervals)
+
+class ChordSymbolParser:
+    # Compiled once per process; selection rules mirror the original per-call regex choice in parse_chord
+    M6_9_PATTERN = re.compile(r'^([A-G][b#]?)m6/9(?:/([A-G][b#]?))?$')
+    SLASH_PATTERN = re.compile(r'^([A-G][b#]?)([^\s/]+)?(?:/([A-G][b#]?))?$')
+    PLAIN_PATTERN = re.compile(r'^([A-G][b#]?)([^\s/]*)?$')
+    _TERMINAL = ''
+
+    def __init__(self, qualities: Iterable[str]):
+        # Prefix trie over every known quality: walking it once finds the longest known prefix without slicing
+        self._trie: Dict[str, dict] = {}
+        for quality in qualities:
+            node = self._trie
+            for char in quality:
+                node = node.setdefault(char, {})
+            node[self._TERMINAL] = quality
+
+    def pattern_for(self, chord_notation: str) -> Pattern:
+        if "/" in chord_notation:
+            return self.M6_9_PATTERN if "m6/9" in chord_notation else self.SLASH_PATTERN
+        return self.PLAIN_PATTERN
+
+    def match_quality(self, quality: str) -> Tuple[Optional[str], List[str]]:
+        node = self._trie
+        base_quality = None
+        for length, char in enumerate(quality, 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if self._TERMINAL in node:
+                base_quality, matched_length = node[self._TERMINAL], length
+        if base_quality is None:
+            return None, []
+        return base_quality, [quality[matched_length:]] if matched_length < len(quality) else []
+
+    def split(self, chord_notation: str) -> Tuple[str, str, Optional[str], str, List[str]]:
+        match = self.pattern_for(chord_notation).match(chord_notation)
+        if not match:
+            raise ValueError(f"❌ Error: The chord notation '{chord_notation}' is invalid. Please check your input.")
+        root = match.group(1)
+        quality = match.group(2) or "major"
+        bass = match.group(3) if len(match.groups()) >= 3 else None
+        base_quality, alterations = self.match_quality(quality)
+        if base_quality is None:
+            raise ValueError(f"🚫 Chord quality '{quality}' not recognized. Ensure the chord is defined in the chord shapes dictionary.")
+        return root, quality, bass, base_quality, alterations
+
+
+class ChordChartGenerator:
+    def __init__(self, font_mode: str = 'embed', font_url: str = '', font_dir: Optional[str] = None, verbosity: str = 'quiet', parse_cache_size: int = 4096, render_cache_size: int = 64, use_templates: bool = True, serializer: str = 'pretty',
+                 raster_cache_size: int = 256, raster_cache_dir: Optional[str] = None, voicing_cache_path: Optional[str] = None, shape_file: Optional[str] = None,
+                 color_mode: str = 'fixed', color_schemes: Optional[Mapping[str, Mapping[str, str]]] = None):
+        if font_mode not in FONT_MODES:
+            raise ValueError(f"🚫 Font mode '{font_mode}' not recognized. Use one of: {', '.join(FONT_MODES)}.")
+        if verbosity not in VERBOSITY_LEVELS:
+            raise ValueError(f"🚫 Verbosity '{verbosity}' not recognized. Use one of: {', '.join(VERBOSITY_LEVELS)}.")
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"🚫 Serializer '{serializer}' not recognized. Use one of: {', '.join(SERIALIZERS)}.")
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"🚫 Color mode '{color_mode}' not recognized. Use one of: {', '.join(COLOR_MODES)}.")
+        schemes = {**DEFAULT_COLOR_SCHEMES, **(color_schemes or {})}
+        for name, colors in schemes.items():
+            missing = [key for key in COLOR_KEYS if key not in colors]
+            if missing:
+                raise ValueError(f"🚫 Color scheme '{name}' is missing: {', '.join(missing)}.")
+            unshadeable = sorted({base for _, base, _, _ in DERIVED_COLORS if not _HEX_COLOR_PATTERN.match(colors[base])})
+            if unshadeable:
+                raise ValueError(f"🚫 Color scheme '{name}' needs #rrggbb colors to derive shades from: {', '.join(unshadeable)}.")
+        # Read-only from here on, like every other setting: a generator is shared by threads without locking
+        self._color_schemes = MappingProxyType({name: MappingProxyType(dict(colors)) for name, colors in schemes.items()})
+        self.font_mode = font_mode
+        self.color_mode = color_mode
+        self.verbosity = verbosity
+        self.serializer = serializer
+        # Constructor arguments, so batch worker processes can build an identically configured generator
+        self.options = {
+            'font_mode': font_mode, 'font_url': font_url, 'font_dir': font_dir, 'verbosity': verbosity, 'parse_cache_size': parse_cache_size,
+            'render_cache_size': render_cache_size, 'use_templates': use_templates, 'serializer': serializer,
+            'raster_cache_size': raster_cache_size, 'raster_cache_dir': raster_cache_dir, 'voicing_cache_path': voicing_cache_path,
+            'shape_file': shape_file, 'color_mode': color_mode,
+            'color_schemes': {name: dict(colors) for name, colors in self._color_schemes.items()}
+        }
+        self.font_url = font_url
+        self.font_dir = font_dir or DEFAULT_FONT_DIR
         self.frets = 10
         self.strings = 6
         self.width = 250
         self.height = 400
         self.chord_shapes = self._initialize_chord_shapes()
-        self.color_schemes = {
-            'default': {'background': '#f5f5f5', 'fretboard': '#8a4b08', 'text': '#333', 'finger': '#4CAF50', 'open': '#1e88e5', 'muted': '#e53935'},
-            'neon': {'background': '#000000', 'fretboard': '#ffffff', 'text': '#ffffff', 'finger': '#00ff00', 'open': '#00ffff', 'muted': '#ff00ff'}
-        }
-        self.fonts = {
-            'roboto': 'data:font/truetype;charset=utf-8;base64,{}'.format(base64.b64encode(open('Roboto-Regular.ttf', 'rb').read()).decode('utf-8')),
-            'noto_music': 'data:font/truetype;charset=utf-8;base64,{}'.format(base64.b64encode(open('NotoMusic-Regular.ttf', 'rb').read()).decode('utf-8'))
-        }
+        if shape_file:
+            # Extra or replacement shapes from a JSON file (see ChordShapeStore.save), on top of the built-in table
+            self.chord_shapes = ChordShapeStore.load(shape_file, base=self.chord_shapes)
+            for quality in self.chord_shapes.qualities():
+                if len(self.chord_shapes[quality]) != self.strings:
+                    raise ValueError(f"🚫 Shape '{quality}' has {len(self.chord_shapes[quality])} positions but the generator draws {self.strings} strings.")
+        self.parser = ChordSymbolParser(self.chord_shapes)
+        # The memo dicts below only ever gain entries, published with setdefault so racing threads agree on one value
+        self._subset_fonts: Dict[Tuple[str, str], str] = {}
+        self._palettes: Dict[tuple, Mapping[str, str]] = {}
+        # Parsed chords and finished SVG strings, both immutable, so cached values can be handed out as-is
+        self.parse_cache = LRUCache(parse_cache_size)
+        self.render_cache = LRUCache(render_cache_size)
+        self.raster_cache = RasterCache(raster_cache_size, raster_cache_dir)
+        self.use_templates = use_templates
+        self._guitar_templates: Dict[tuple, Tuple[str, str]] = {}
+        self._fragment_wrappers: Dict[str, Tuple[int, int]] = {}
+        self._voicing_table: Optional['VoicingTable'] = None
+        self._chord_identifier: Optional['ChordIdentifier'] = None
+        self.voicing_cache_path = voicing_cache_path
+        self._voicing_search: Optional['VoicingSearch'] = None
+        # Opt-in instrumentation; see profile()
+        self.profiler: Optional[RenderProfiler] = None
+        self._lazy_lock = threading.Lock()
+
+    @property
+    def color_schemes(self) -> Mapping[str, Mapping[str, str]]:
+        return self._color_schemes
 
-    def _initialize_chord_shapes(self) -> Dict[str, List[int]]:
+    @property
+    def fonts(self) -> Dict[str, str]:
+        # Loaded and base64-encoded lazily, on the first render that embeds them, then shared by every instance
+        return {font_name: _font_data_uri(self._font_path(font_name)) for font_name in FONT_FILES}
+
+    def _font_path(self, font_name: str) -> str:
+        return os.path.join(self.font_dir, FONT_FILES[font_name])
+
+    def _initialize_chord_shapes(self) -> ChordShapeStore:
         base_chord_shapes = {
             'major': [0, 2, 2, 1, 0, 0],
             'maj7': [0, 2, 1, 1, 0, 0],
@@ -79,21 +775,114 @@ class ChordChartGenerator:
             '7alt': [0, 2, 0, 1, 3, 4],
         }
 
-        expanded_chord_shapes = base_chord_shapes.copy()
+        aliases = {}
 
         # Programmatically add redundant entries
-        for chord_name, positions in base_chord_shapes.items():
+        for chord_name in base_chord_shapes:
             if 'major' in chord_name:
-                expanded_chord_shapes[chord_name.replace('major', 'maj')] = positions
+                aliases[chord_name.replace('major', 'maj')] = chord_name
             if 'minor' in chord_name:
-                expanded_chord_shapes[chord_name.replace('minor', 'm')] = positions
+                aliases[chord_name.replace('minor', 'm')] = chord_name
             if chord_name.startswith('m'):
-                expanded_chord_shapes[chord_name.replace('m', 'min', 1)] = positions
+                aliases[chord_name.replace('m', 'min', 1)] = chord_name
 
-        return expanded_chord_shapes
+        return ChordShapeStore(base_chord_shapes, aliases)
         
-    def parse_chord(self, chord_notation: str) -> Tuple[str, str, List[int], Optional[str]]:
-        use_verbose = 1
+    def parse_chord(self, chord_notation: str) -> Tuple[str, str, Tuple[int, ...], Optional[str]]:
+        # The verbose modes narrate every call, so only the quiet path goes through the cache
+        if self.verbosity != 'quiet':
+            return self._parse_chord(chord_notation)
+        result = self.parse_cache.get(chord_notation)
+        if result is None:
+            result = self._parse_chord(chord_notation)
+            self.parse_cache.put(chord_notation, result)
+        return result
+
+    def voicing_table(self) -> 'VoicingTable':
+        # Built on first use: it needs NumPy, which plain rendering does not
+        if self._voicing_table is None:
+            with self._lazy_lock:
+                if self._voicing_table is None:
+                    self._voicing_table = VoicingTable(self)
+        return self._voicing_table
+
+    def transpose_many(self, chords: Iterable[str], semitones: Union[int, Iterable[int]]) -> Tuple[List[str], Any]:
+        return self.voicing_table().transpose_many(chords, semitones)
+
+    def chord_identifier(self) -> 'ChordIdentifier':
+        if self._chord_identifier is None:
+            with self._lazy_lock:
+                if self._chord_identifier is None:
+                    self._chord_identifier = ChordIdentifier(self)
+        return self._chord_identifier
+
+    def identify(self, frets: Union[str, Sequence[Optional[int]]], limit: int = 5) -> List[ChordMatch]:
+        return self.chord_identifier().identify(frets, limit)
+
+    def identify_many(self, fingerings: Iterable[Union[str, Sequence[Optional[int]]]], limit: int = 1) -> List[List[ChordMatch]]:
+        return self.chord_identifier().identify_many(fingerings, limit)
+
+    def voicing_search(self) -> 'VoicingSearch':
+        if self._voicing_search is None:
+            with self._lazy_lock:
+                if self._voicing_search is None:
+                    self._voicing_search = VoicingSearch(self, cache_path=self.voicing_cache_path)
+        return self._voicing_search
+
+    def voicings(self, chord_notation: str, limit: int = 5) -> List['Voicing']:
+        # Playable fingerings ranked easiest first; pass one to generate_svg(voicing=...) to draw it
+        return self.voicing_search().search(chord_notation, limit)
+
+    def clear_caches(self):
+        self.parse_cache.clear()
+        self.render_cache.clear()
+        self.raster_cache.clear()
+
+    def fingerprint(self, font_mode: Optional[str] = None, serializer: Optional[str] = None) -> str:
+        # Every input besides the chord and its colors that shapes rendered output. Font files count by size and
+        # modification time, so checking whether anything changed never has to read them.
+        fonts = []
+        for font_name in FONT_FILES:
+            stat = os.stat(self._font_path(font_name))
+            fonts.append((font_name, stat.st_size, stat.st_mtime_ns))
+        return OutputManifest.digest(__version__, dict(self.chord_shapes), self.frets, self.strings, self.width, self.height,
+                                     font_mode or self.font_mode, self.font_url, serializer or self.serializer, fonts, self.color_mode)
+
+    def output_digests(self, fingerprint: str, index: int, chord_notation: str, color_scheme: str, show_notation: bool,
+                       compression: Optional[str] = None, compression_level: Optional[int] = None) -> List[Tuple[str, str]]:
+        # (relative path, input hash) for each file generate_batch writes for this item
+        colors = self.color_schemes.get(color_scheme)
+        guitar_path, notation_path = output_filenames(index, chord_notation, color_scheme)
+        outputs = [(guitar_path, 'guitar')] + ([(notation_path, 'notation')] if show_notation else [])
+        digests = []
+        for path, kind in outputs:
+            digest = OutputManifest.digest(fingerprint, chord_notation, colors, kind)
+            for output_path in compressed_paths(path, compression):
+                digests.append((output_path, digest if output_path == path else OutputManifest.digest(digest, compression, compression_level)))
+        return digests
+
+    def _stage(self, name: str, chord: Optional[str] = None):
+        profiler = self.profiler
+        return _NULL_STAGE if profiler is None else profiler.stage(name, chord)
+
+    @contextlib.contextmanager
+    def profile(self, capture: Optional[str] = None, limit: int = 25) -> Iterator[RenderProfiler]:
+        # Record per-stage timings for everything rendered inside the block, optionally under cProfile or tracemalloc
+        previous = self.profiler
+        profiler = self.profiler = RenderProfiler()
+        try:
+            if capture is None:
+                yield profiler
+            else:
+                with profiler.capture(capture, limit):
+                    yield profiler
+        finally:
+            self.profiler = previous
+
+    def _parse_chord(self, chord_notation: str) -> Tuple[str, str, Tuple[int, ...], Optional[str]]:
+        # 'print' narrates every step for learners, 'log' emits structured DEBUG records, 'quiet' does neither
+        use_verbose = self.verbosity == 'print'
+        use_trace = self.verbosity == 'log' and logger.isEnabledFor(logging.DEBUG)
 
         if use_verbose:
             print(f"\n🎼 Starting to parse chord notation: '{chord_notation}'")
@@ -101,9 +890,10 @@ class ChordChartGenerator:
             print("   and then adjust the finger positions based on the chord structure and the root note.")
 
         # Step 1: Determine the correct regex pattern based on the chord notation
+        pattern = self.parser.pattern_for(chord_notation)
+        regex_pattern = pattern.pattern
         if "/" in chord_notation:
-            if "m6/9" in chord_notation:
-                regex_pattern = r'^([A-G][b#]?)m6/9(?:/([A-G][b#]?))?$'
+            if pattern is self.parser.M6_9_PATTERN:
                 if use_verbose:
                     print(f"🔍 Detected 'm6/9' pattern in chord. Using specific regex for 'm6/9' chords: {regex_pattern}")
                     print("\n🎵 **Explanation for Musicians:**")
@@ -120,7 +910,6 @@ class ChordChartGenerator:
                     print("   - 'm6/9' looks for this exact chord quality, indicating a minor chord with an added 6th and 9th.")
                     print("   - (?:/([A-G][b#]?))?$ checks for an optional bass note after a slash (e.g., 'C#m6/9/B').")
             else:
-                regex_pattern = r'^([A-G][b#]?)([^\s/]+)?(?:/([A-G][b#]?))?$'
                 if use_verbose:
                     print(f"🔍 Detected '/' in chord notation. Using general regex for slash chords: {regex_pattern}")
                     print("\n🎵 **Explanation for Musicians:**")
@@ -136,7 +925,6 @@ class ChordChartGenerator:
                     print("   - (?:/([A-G][b#]?))?$ looks for a bass note that might be specified after a slash,")
                     print("     for example, the 'G' in 'Cmaj7/G'.")
         else:
-            regex_pattern = r'^([A-G][b#]?)([^\s/]*)?$'
             if use_verbose:
                 print(f"🔍 No '/' detected. Using regex for standard chords without a bass note: {regex_pattern}")
                 print("\n🎵 **Explanation for Musicians:**")
@@ -153,7 +941,7 @@ class ChordChartGenerator:
                 print("     It stops if it sees a space or slash, making sure it only picks up the part of the chord notation")
                 print("     that actually describes the chord itself.")
 
-        match = re.match(regex_pattern, chord_notation)
+        match = pattern.match(chord_notation)
 
         if not match:
             raise ValueError(f"❌ Error: The chord notation '{chord_notation}' is invalid. Please check your input.")
@@ -171,6 +959,9 @@ class ChordChartGenerator:
         quality = match.group(2) or ""
         bass = match.group(3) if len(match.groups()) >= 3 else None
 
+        if use_trace:
+            self._trace(chord_notation, 'match', pattern=regex_pattern, root=root, quality=quality, bass=bass)
+
         if use_verbose:
             print(f"\n🎯 Extracted root note: '{root}'")
             print(f"🎼 Extracted chord quality: '{quality or 'None'}'")
@@ -203,9 +994,6 @@ class ChordChartGenerator:
                 print("   In music theory, a chord symbol like 'C' is shorthand for a major chord ('C major').")
 
         # Step 3: Analyze and match chord quality
-        base_quality = None
-        alterations = []
-
         if use_verbose:
             print(f"\n🔧 Beginning analysis of the chord quality '{quality}'.")
             print("   The function will try to match the longest possible substring of the quality in the known chord shapes.")
@@ -225,28 +1013,26 @@ class ChordChartGenerator:
             print("   Understanding the quality of a chord is crucial because it determines the specific notes that make up the chord,")
             print("   and thus how it will sound when played.")
 
-        for length in range(len(quality), 0, -1):
-            potential_quality = quality[:length]
-            if potential_quality in self.chord_shapes:
-                base_quality = potential_quality
-                alterations = [quality[length:]] if length < len(quality) else []
-                if use_verbose:
-                    print(f"   ✅ Matched base quality: '{base_quality}'")
-                    if alterations:
-                        print(f"   ➕ Detected alterations after base quality: '{alterations}'")
-                break
+        base_quality, alterations = self.parser.match_quality(quality)
+        if base_quality is not None:
+            if use_trace:
+                self._trace(chord_notation, 'quality', base_quality=base_quality, alterations=alterations)
+            if use_verbose:
+                print(f"   ✅ Matched base quality: '{base_quality}'")
+                if alterations:
+                    print(f"   ➕ Detected alterations after base quality: '{alterations}'")
 
         if base_quality is None:
             raise ValueError(f"🚫 Chord quality '{quality}' not recognized. Ensure the chord is defined in the chord shapes dictionary.")
 
         # Step 4: Retrieve and display the base finger positions
-        finger_positions = self.chord_shapes[base_quality]
+        finger_positions = list(self.chord_shapes[base_quality])  # Alterations below work on a list copy of the immutable shape
         if use_verbose:
             print(f"\n🎶 Retrieved finger positions for the '{base_quality}' chord: {finger_positions}")
             print("   These positions represent the standard way to play this chord quality on the guitar, without any alterations.")
 
         # Step 5: Apply alterations to the chord
-        if alterations:
+        if alterations and use_verbose:
             print(f"\n🛠 Applying alterations to the base chord '{base_quality}'.")
             print("   Alterations modify the chord by sharpening or flattening specific notes, or adding extra notes.")
         for alteration in alterations:
@@ -294,13 +1080,7 @@ class ChordChartGenerator:
             print("   This adjustment shifts the entire chord diagram to align with the correct root note on the fretboard.")
             print("   Each note in the chord is transposed to start from the specified root note.")
 
-        root_adjustment = {
-            'A': 0, 'A#': 1, 'Bb': 1, 'B': 2, 'C': 3, 'C#': 4, 'Db': 4,
-            'D': 5, 'D#': 6, 'Eb': 6, 'E': 7, 'F': 8, 'F#': 9, 'Gb': 9,
-            'G': 10, 'G#': 11, 'Ab': 11
-        }
-        
-        adjustment = root_adjustment[root]
+        adjustment = ROOT_ADJUSTMENT[root]
         if use_verbose:
             print(f"   ➡️ Calculated root adjustment value for '{root}': {adjustment}")
             print("   This adjustment value represents the number of semitones to shift all finger positions.")
@@ -325,6 +1105,8 @@ class ChordChartGenerator:
             print(f"   The positions now reflect the chord as it should be played with the root note '{root}'.")
 
         # Final output
+        if use_trace:
+            self._trace(chord_notation, 'result', root=root, quality=quality, adjustment=adjustment, finger_positions=list(finger_positions), bass=bass)
         if use_verbose:
             print(f"\n📋 Final parsed chord details:")
             print(f"   - Root: {root}")
@@ -335,28 +1117,92 @@ class ChordChartGenerator:
             print(f"\nℹ️ The chord diagram for '{root}{quality}{'/' + bass if bass else ''}' is now ready for rendering.")
             print("\n____________________________________________________________________________________________________________________________\n")
 
-        return root, quality, finger_positions, bass
-
+        return root, quality, tuple(finger_positions), bass
 
+    @staticmethod
+    def _trace(chord_notation: str, step: str, **fields):
+        logger.debug("parse_chord %r %s %s", chord_notation, step, fields, extra={'chord': chord_notation, 'step': step, 'fields': fields})
 
-    def _add_fonts(self, svg: ET.Element):
-        defs = ET.SubElement(svg, 'defs')
-        for font_name, font_data in self.fonts.items():
-            ET.SubElement(defs, 'style', {'type': 'text/css'}).text = f"""
+    def _add_fonts(self, svg: ET.Element, font_mode: Optional[str] = None):
+        # Called once the rest of the SVG is built, so subset mode can see every glyph in use
+        font_mode = font_mode or self.font_mode
+        defs = svg.find('defs')
+        if defs is None:
+            defs = ET.Element('defs')
+            svg.insert(0, defs)
+        for i, (font_name, font_src) in enumerate(self._font_sources(svg, font_mode)):
+            style = ET.Element('style', {'type': 'text/css'})
+            style.text = f"""
                 @font-face {{
                     font-family: '{font_name}';
-                    src: url('{font_data}');
+                    src: url('{font_src}');
                 }}
             """
+            defs.insert(i, style)
+
+    def _font_sources(self, svg: ET.Element, font_mode: str) -> List[Tuple[str, str]]:
+        if font_mode == 'embed':
+            return list(self.fonts.items())
+        if font_mode == 'external':
+            return [(font_name, f"{self.font_url}{font_file}") for font_name, font_file in FONT_FILES.items()]
+        if font_mode == 'subset':
+            used_text = self._collect_font_text(svg)
+            return [(font_name, self._subset_font(font_name, used_text[font_name])) for font_name in FONT_FILES if font_name in used_text]
+        raise ValueError(f"🚫 Font mode '{font_mode}' not recognized. Use one of: {', '.join(FONT_MODES)}.")
+
+    def _collect_font_text(self, svg: ET.Element) -> Dict[str, str]:
+        used_text: Dict[str, set] = {}
+
+        def visit(element: ET.Element, font_family: Optional[str]):
+            font_family = element.get('font-family', font_family)
+            if font_family and element.text:
+                used_text.setdefault(font_family, set()).update(element.text)
+            for child in element:
+                visit(child, font_family)
+
+        visit(svg, None)
+        return {font_name: ''.join(sorted(chars)) for font_name, chars in used_text.items()}
+
+    def _subset_font(self, font_name: str, chars: str) -> str:
+        key = (font_name, chars)
+        data_uri = self._subset_fonts.get(key)
+        if data_uri is None:
+            try:
+                # Imported on demand: fontTools is optional and slow to import
+                from fontTools import subset as font_subset
+                from fontTools.ttLib import TTFont
+            except ImportError:
+                raise ImportError("🚫 Font subsetting requires fontTools. Install it with 'pip install fonttools'.")
+            font = TTFont(BytesIO(_read_font(self._font_path(font_name))), recalcTimestamp=False)  # Keep output deterministic
+            options = font_subset.Options()
+            options.notdef_outline = True
+            subsetter = font_subset.Subsetter(options)
+            subsetter.populate(unicodes=[ord(char) for char in chars])
+            subsetter.subset(font)
+            buffer = BytesIO()
+            font.save(buffer)
+            data_uri = self._subset_fonts.setdefault(key, 'data:font/truetype;charset=utf-8;base64,{}'.format(base64.b64encode(buffer.getvalue()).decode('utf-8')))
+        return data_uri
 
-    def _add_gradients(self, svg: ET.Element, colors: Dict[str, str]):
+    def write_external_fonts(self, output_dir: str):
+        # Copy the font files next to SVGs rendered with font_mode='external'
+        os.makedirs(output_dir, exist_ok=True)
+        for font_name, font_file in FONT_FILES.items():
+            target = os.path.join(output_dir, font_file)
+            source = self._font_path(font_name)
+            # Leave an up-to-date copy alone, so repeat runs don't rewrite (and re-upload) the fonts
+            if os.path.exists(target) and os.path.getsize(target) == os.path.getsize(source) and os.path.getmtime(target) >= os.path.getmtime(source):
+                continue
+            _atomic_write(target, _read_font(source))
+
+    def _add_gradients(self, svg: ET.Element, colors: Dict[str, str], gradient_id: str = 'fretboardGradient'):
         defs = svg.find('defs')
         if defs is None:
             defs = ET.SubElement(svg, 'defs')
         
-        gradient = ET.SubElement(defs, 'linearGradient', {'id': 'fretboardGradient', 'x1': '0%', 'y1': '0%', 'x2': '100%', 'y2': '100%'})
+        gradient = ET.SubElement(defs, 'linearGradient', {'id': gradient_id, 'x1': '0%', 'y1': '0%', 'x2': '100%', 'y2': '100%'})
         ET.SubElement(gradient, 'stop', {'offset': '0%', 'style': f'stop-color:{colors["fretboard"]};stop-opacity:1'})
-        ET.SubElement(gradient, 'stop', {'offset': '100%', 'style': f'stop-color:{self._darken_color(colors["fretboard"], 0.2)};stop-opacity:1'})
+        ET.SubElement(gradient, 'stop', {'offset': '100%', 'style': f'stop-color:{colors["fretboard-shade"]};stop-opacity:1'})
 
     def _add_background(self, svg: ET.Element, colors: Dict[str, str]):
         ET.SubElement(svg, 'rect', {
@@ -367,14 +1213,14 @@ class ChordChartGenerator:
             'ry': '10'
         })
 
-    def _draw_fretboard(self, svg: ET.Element, colors: Dict[str, str]):
+    def _draw_fretboard(self, svg: ET.Element, colors: Dict[str, str], gradient_id: str = 'fretboardGradient', base_fret: int = 1):
         fretboard = ET.SubElement(svg, 'g', {'transform': 'translate(25, 60)'})
         fretboard_width = self.width - 50
         fretboard_height = self.height - 180
         ET.SubElement(fretboard, 'rect', {
             'width': str(fretboard_width),
             'height': str(fretboard_height),
-            'fill': f'url(#fretboardGradient)',
+            'fill': f'url(#{gradient_id})',
             'rx': '5',
             'ry': '5'
         })
@@ -385,7 +1231,7 @@ class ChordChartGenerator:
             ET.SubElement(fretboard, 'line', {
                 'x1': '0', 'y1': str(y),
                 'x2': str(fretboard_width), 'y2': str(y),
-                'stroke': self._lighten_color(colors['fretboard'], 0.3),
+                'stroke': colors['fret'],
                 'stroke-width': '2'
             })
         
@@ -395,7 +1241,7 @@ class ChordChartGenerator:
             ET.SubElement(fretboard, 'line', {
                 'x1': str(x), 'y1': '0',
                 'x2': str(x), 'y2': str(fretboard_height),
-                'stroke': self._lighten_color(colors['fretboard'], 0.5),
+                'stroke': colors['string'],
                 'stroke-width': '1'
             })
         
@@ -409,9 +1255,9 @@ class ChordChartGenerator:
                 'font-family': 'roboto',
                 'fill': colors['text'],
                 'text-anchor': 'middle'
-            }).text = str(i)
+            }).text = str(i + base_fret - 1)
 
-    def _add_finger_positions(self, svg: ET.Element, finger_positions: List[int], colors: Dict[str, str]):
+    def _add_finger_positions(self, svg: ET.Element, finger_positions: Tuple[int, ...], colors: Dict[str, str], base_fret: int = 1):
         fretboard_width = self.width - 50
         fretboard_height = self.height - 180
         string_spacing = fretboard_width / (self.strings - 1)
@@ -419,8 +1265,8 @@ class ChordChartGenerator:
         for i, pos in enumerate(finger_positions):
             x = 25 + (self.strings - 1 - i) * string_spacing
             if pos > 0:
-                y = 60 + (pos - 0.5) * fret_spacing
-                self._add_finger_circle(svg, x, y, colors['finger'], colors['text'], str(pos))
+                y = 60 + (pos - base_fret + 0.5) * fret_spacing
+                self._add_finger_circle(svg, x, y, colors['finger'], colors['finger-stroke'], colors['text'], str(pos))
             elif pos == 0:
                 y = 50
                 self._add_open_string(svg, x, y, colors['open'])
@@ -428,53 +1274,602 @@ class ChordChartGenerator:
                 y = 50
                 self._add_muted_string(svg, x, y, colors['muted'])
 
-    def _svg_to_string(self, svg: ET.Element) -> str:
-        xml_string = ET.tostring(svg, encoding='unicode')
-        pretty_xml_string = xml.dom.minidom.parseString(xml_string).toprettyxml()
-        return pretty_xml_string    
+    def _svg_to_string(self, svg: ET.Element, serializer: Optional[str] = None) -> str:
+        with self._stage('serialize') as stage:
+            text = ''.join(self._iter_svg_chunks(svg, serializer or self.serializer))
+            stage.add_bytes(len(text))
+        return text
+
+    def _iter_svg_chunks(self, svg: ET.Element, serializer: str) -> Iterator[str]:
+        if serializer == 'pretty':
+            # Byte-for-byte what ET.tostring + minidom toprettyxml() used to produce, without the second parse
+            yield '<?xml version="1.0" ?>\n'
+            yield from self._iter_pretty(svg, '')
+        elif serializer == 'compact':
+            yield from self._iter_compact(svg)
+        else:
+            raise ValueError(f"🚫 Serializer '{serializer}' not recognized. Use one of: {', '.join(SERIALIZERS)}.")
+
+    def _iter_pretty(self, element: ET.Element, indent: str) -> Iterator[str]:
+        # minidom's parser reports namespace declarations ahead of ordinary attributes
+        items = sorted(element.attrib.items(), key=lambda item: not item[0].startswith('xmlns'))
+        attributes = ''.join(f' {name}="{_escape_pretty(value)}"' for name, value in items)
+        nodes = [element.text] if element.text else []
+        for child in element:
+            nodes.append(child)
+            if child.tail:
+                nodes.append(child.tail)
+
+        if not nodes:
+            yield f'{indent}<{element.tag}{attributes}/>\n'
+        elif len(nodes) == 1 and isinstance(nodes[0], str):
+            yield f'{indent}<{element.tag}{attributes}>{_escape_pretty(nodes[0])}</{element.tag}>\n'
+        else:
+            yield f'{indent}<{element.tag}{attributes}>\n'
+            for node in nodes:
+                if isinstance(node, str):
+                    yield _escape_pretty(f'{indent}\t{node}\n')
+                else:
+                    yield from self._iter_pretty(node, indent + '\t')
+            yield f'{indent}</{element.tag}>\n'
+
+    def _iter_compact(self, element: ET.Element) -> Iterator[str]:
+        attributes = ''.join(f' {name}="{_escape_attribute(_compact_number(value))}"' for name, value in element.attrib.items())
+        text = element.text or ''
+        if element.tag == 'style':
+            text = _compact_css(text)
+        if not text and len(element) == 0:
+            yield f'<{element.tag}{attributes}/>'
+            return
+        yield f'<{element.tag}{attributes}>{_escape_text(text)}'
+        for child in element:
+            yield from self._iter_compact(child)
+            if child.tail:
+                yield _escape_text(child.tail)
+        yield f'</{element.tag}>'
+
+    def write_svg(self, fp: TextIO, chord_notation: str, color_scheme: str = 'default', notation: bool = False, font_mode: Optional[str] = None, serializer: Optional[str] = None,
+                  color_mode: Optional[str] = None):
+        # Streams one diagram straight to a text file object instead of building the whole string first
+        diagram = self.diagram(chord_notation)
+        colors = self.palette(color_scheme, color_mode)
+        font_mode = font_mode or self.font_mode
+        if notation:
+            svg = self._build_notation_svg(diagram, colors, font_mode)
+        else:
+            svg = self._build_guitar_svg(diagram, colors, font_mode)
+        for chunk in self._iter_svg_chunks(svg, serializer or self.serializer):
+            fp.write(chunk)
     
-    def generate_svg(self, chord_notation: str, color_scheme: str = 'default', show_notation: bool = True) -> Tuple[str, str]:
-        root, quality, finger_positions, bass = self.parse_chord(chord_notation)
-        colors = self.color_schemes[color_scheme]
-        
-        # Generate guitar diagram SVG
-        guitar_svg = self._generate_guitar_svg(root, quality, finger_positions, bass, colors)
-        
-        # Generate musical notation SVG if requested
-        notation_svg = self._generate_notation_svg(root, quality, colors) if show_notation else None
-        
+    def generate_sprite(self, items: Iterable[Union[str, Tuple[str, str]]], show_notation: bool = False, font_mode: Optional[str] = None,
+                        serializer: Optional[str] = None) -> str:
+        sprite, _ = self._build_sprite(items, show_notation, font_mode or self.font_mode)
+        return self._svg_to_string(sprite, serializer)
+
+    def generate_sprite_gallery(self, items: Iterable[Union[str, Tuple[str, str]]], show_notation: bool = False, font_mode: Optional[str] = None,
+                                sprite_href: Optional[str] = None, title: str = "Chord Chart Gallery") -> str:
+        # One HTML page for a whole batch. The sprite is inlined, or with sprite_href referenced as a single external file.
+        sprite, entries = self._build_sprite(items, show_notation, font_mode or self.font_mode)
+        parts = [f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }}
+        h1 {{ text-align: center; }}
+        .gallery {{ display: flex; flex-wrap: wrap; justify-content: center; gap: 20px; }}
+        /* Off-screen chords are neither laid out nor painted until scrolled near */
+        .chord-set {{ text-align: center; content-visibility: auto; contain-intrinsic-size: {self.width}px {self.height + (150 if show_notation else 0) + 40}px; }}
+        .chord-set svg {{ display: block; border: 1px solid #ddd; border-radius: 4px; }}
+    </style>
+</head>
+<body>
+    <h1>{html.escape(title)}</h1>
+"""]
+        if sprite_href is None:
+            sprite.set('style', 'display: none')
+            parts.append(self._svg_to_string(sprite, 'compact'))
+            prefix = ''
+        else:
+            prefix = html.escape(sprite_href)
+        parts.append('\n    <div class="gallery">\n')
+        for chord, color_scheme, guitar_id, notation_id in entries:
+            label = html.escape(f"{chord} ({color_scheme})")
+            parts.append(f'        <figure class="chord-set">\n'
+                         f'            <svg width="{self.width}" height="{self.height}" viewBox="0 0 {self.width} {self.height}" role="img" aria-label="{html.escape(chord)} guitar chord"><use href="{prefix}#{guitar_id}"/></svg>\n')
+            if notation_id:
+                parts.append(f'            <svg width="{self.width}" height="150" viewBox="0 0 {self.width} 150" role="img" aria-label="{html.escape(chord)} musical notation"><use href="{prefix}#{notation_id}"/></svg>\n')
+            parts.append(f'            <figcaption>{label}</figcaption>\n        </figure>\n')
+        parts.append('    </div>\n</body>\n</html>\n')
+        return ''.join(parts)
+
+    def write_gallery(self, output_dir: str, sections: Iterable[Tuple[Optional[str], Iterable[Union[str, Tuple[str, str]]]]], page_size: int = GALLERY_PAGE_SIZE,
+                      show_notation: bool = False, compression: Optional[str] = None, title: str = "Chord Chart Gallery",
+                      exclude: Iterable[int] = ()) -> List[str]:
+        # Writes an HTML gallery of the SVG files generate_batch wrote into output_dir for these items (numbered across all
+        # sections, in order), page_size chords per page, plus an index page linking every page and section. Pages are
+        # written as the items arrive, with at most two pages of entries held, so lazy catalogs of any size use flat memory.
+        # exclude takes item numbers to leave out, such as the ones that failed to render. Returns the paths written,
+        # relative to output_dir, the index first.
+        if page_size < 1:
+            raise ValueError(f"🚫 A gallery page needs room for at least one chord, got page_size={page_size}.")
+        exclude = set(exclude)
+        entries = ((section, number, *_batch_item(item)) for number, (section, item) in
+                   enumerate((section, item) for section, items in sections for item in items) if number not in exclude)
+        os.makedirs(output_dir, exist_ok=True)
+        written = [GALLERY_FILENAME]
+        with _atomic_open(os.path.join(output_dir, GALLERY_FILENAME)) as index:
+            index.write(self._gallery_head(title, title))
+            index.write('    <ol class="pages">\n')
+            previous_section = None
+            page = list(itertools.islice(entries, page_size))
+            page_number = 0
+            while page:
+                following = list(itertools.islice(entries, page_size))
+                page_number += 1
+                page_path = gallery_page_filename(page_number)
+                with _atomic_open(os.path.join(output_dir, page_path)) as f:
+                    anchors = self._write_gallery_page(f, page, page_number, bool(following), previous_section, show_notation, compression, title)
+                written.append(page_path)
+                first, last = html.escape(page[0][2]), html.escape(page[-1][2])
+                links = ''.join(f' · <a href="{page_path}#{anchor}">{html.escape(section)}</a>' for section, anchor in anchors)
+                index.write(f'        <li><a href="{page_path}">Page {page_number}</a>: {first} – {last}{links}</li>\n')
+                previous_section = page[-1][0]
+                page = following
+            index.write('    </ol>\n</body>\n</html>\n')
+        return written
+
+    def _gallery_head(self, title: str, heading: str) -> str:
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }}
+        h1, h2, nav {{ text-align: center; }}
+        nav a {{ margin: 0 8px; }}
+        .gallery {{ display: flex; flex-wrap: wrap; justify-content: center; gap: 20px; }}
+        .chord-set {{ text-align: center; margin: 0 0 20px; }}
+        .chord-set img {{ display: block; max-width: 100%; height: auto; border: 1px solid #ddd; border-radius: 4px; }}
+    </style>
+</head>
+<body>
+    <h1>{html.escape(heading)}</h1>
+"""
+
+    def _write_gallery_page(self, f: TextIO, page: List[Tuple[Optional[str], int, str, str]], page_number: int, has_next: bool,
+                            previous_section: Optional[str], show_notation: bool, compression: Optional[str], title: str) -> List[Tuple[str, str]]:
+        # Returns (section, anchor id) for each section heading on the page
+        links = [f'<a href="{GALLERY_FILENAME}">Index</a>']
+        if page_number > 1:
+            links.insert(0, f'<a href="{gallery_page_filename(page_number - 1)}">← Previous</a>')
+        if has_next:
+            links.append(f'<a href="{gallery_page_filename(page_number + 1)}">Next →</a>')
+        nav = f'    <nav>{" ".join(links)}</nav>\n'
+        f.write(self._gallery_head(f"{title} – page {page_number}", f"{title} – page {page_number}"))
+        f.write(nav)
+        anchors = []
+        current = None
+        for position, (section, number, chord, color_scheme) in enumerate(page):
+            if position == 0 or section != current:
+                if position:
+                    f.write('    </div>\n')
+                if section is not None:
+                    anchor = 'section-' + (re.sub(r'[^a-z0-9]+', '-', section.lower()).strip('-') or str(len(anchors) + 1))
+                    continued = ' (continued)' if position == 0 and section == previous_section else ''
+                    f.write(f'    <h2 id="{anchor}">{html.escape(section)}{continued}</h2>\n')
+                    anchors.append((section, anchor))
+                f.write('    <div class="gallery">\n')
+                current = section
+            # Quoted, since a '#' in a chord name would otherwise start a URL fragment
+            guitar_path, notation_path = (quote(compressed_paths(path, compression)[0]) for path in output_filenames(number, chord, color_scheme))
+            label = html.escape(chord)
+            # Explicit sizes let the browser lay out every image before it loads, and lazy images only load near the viewport
+            f.write(f'        <figure class="chord-set">\n'
+                    f'            <img src="{guitar_path}" width="{self.width}" height="{self.height}" loading="lazy" decoding="async" alt="{label} guitar chord">\n')
+            if show_notation:
+                f.write(f'            <img src="{notation_path}" width="{self.width}" height="150" loading="lazy" decoding="async" alt="{label} musical notation">\n')
+            f.write(f'            <figcaption>{label} ({html.escape(color_scheme)})</figcaption>\n        </figure>\n')
+        f.write('    </div>\n')
+        f.write(nav)
+        f.write('</body>\n</html>\n')
+        return anchors
+
+    def _build_sprite(self, items: Iterable[Union[str, Tuple[str, str]]], show_notation: bool, font_mode: str) -> Tuple[ET.Element, List[Tuple[str, str, str, Optional[str]]]]:
+        # Fonts, gradients and the fretboard are defined once per sprite (per color scheme); each chord is a small <symbol> that <use>s them
+        sprite = ET.Element('svg', {'xmlns': 'http://www.w3.org/2000/svg'})
+        defs = ET.SubElement(sprite, 'defs')
+        fretboards: Dict[str, str] = {}
+        entries = []
+        for index, item in enumerate(items):
+            chord, color_scheme = _batch_item(item)
+            diagram = self.diagram(chord)
+            colors = self.palette(color_scheme)
+            if color_scheme not in fretboards:
+                fretboard_id = fretboards[color_scheme] = f"fretboard-{color_scheme}"
+                self._add_gradients(sprite, colors, f"fretboardGradient-{color_scheme}")
+                fretboard = ET.SubElement(defs, 'symbol', {'id': fretboard_id, 'viewBox': f"0 0 {self.width} {self.height}"})
+                self._add_background(fretboard, colors)
+                self._draw_fretboard(fretboard, colors, f"fretboardGradient-{color_scheme}")
+
+            slug = chord.replace('#', 'sharp').replace('/', '_')
+            guitar_id = f"chord-{index + 1:03d}-{slug}-{color_scheme}"
+            symbol = ET.SubElement(defs, 'symbol', {'id': guitar_id, 'viewBox': f"0 0 {self.width} {self.height}"})
+            ET.SubElement(symbol, 'use', {'href': f"#{fretboards[color_scheme]}"})
+            self._add_finger_positions(symbol, diagram.frets, colors)
+            self._add_chord_name(symbol, diagram.root, diagram.quality, diagram.bass, colors)
+
+            notation_id = None
+            if show_notation:
+                notation_id = f"notation-{index + 1:03d}-{slug}-{color_scheme}"
+                symbol = ET.SubElement(defs, 'symbol', {'id': notation_id, 'viewBox': f"0 0 {self.width} 150"})
+                self._add_background(symbol, colors)
+                self._add_musical_notation(symbol, diagram, colors)
+            entries.append((chord, color_scheme, guitar_id, notation_id))
+
+        if self.color_mode == 'themable':
+            self._theme_colors_to_style(sprite)
+        self._add_fonts(sprite, font_mode)
+        return sprite, entries
+
+    def generate_batch(self, items: Iterable[Union[str, Tuple[str, str]]], workers: Optional[int] = None, executor: str = 'auto',
+                       show_notation: bool = True, output_dir: Optional[str] = None, chunksize: int = 16,
+                       manifest: Optional[OutputManifest] = None, compression: Optional[str] = None, compression_level: Optional[int] = None) -> Iterator[BatchResult]:
+        # Yields one BatchResult per item as chunks finish, so order follows completion, not input; use result.index to reorder.
+        # With output_dir the workers write the files themselves and results carry paths instead of SVG text.
+        # With a manifest (for output_dir) too, items whose files are current are yielded as skipped without rendering.
+        # compression (one of COMPRESSIONS, for output_dir) has the workers compress what they write.
+        # Arguments are checked here, when called, rather than on the first next() of the generator doing the work.
+        if executor not in EXECUTORS:
+            raise ValueError(f"🚫 Executor '{executor}' not recognized. Use one of: {', '.join(EXECUTORS)}.")
+        _check_batch_sizes(workers, chunksize)
+        if manifest is not None and output_dir is None:
+            raise ValueError("🚫 A manifest needs an output_dir to track.")
+        if compression is not None:
+            if output_dir is None:
+                raise ValueError("🚫 Compression needs an output_dir to write to.")
+            compression_level = _check_compression(compression, compression_level)
+        return self._generate_batch(items, workers or os.cpu_count() or 1, resolve_executor(executor), show_notation, output_dir, chunksize,
+                                    manifest, compression, compression_level)
+
+    def _generate_batch(self, items: Iterable[Union[str, Tuple[str, str]]], workers: int, executor: str, show_notation: bool, output_dir: Optional[str],
+                        chunksize: int, manifest: Optional[OutputManifest], compression: Optional[str], compression_level: Optional[int]) -> Iterator[BatchResult]:
+        skipped: List[BatchResult] = []
+        fingerprint = self.fingerprint() if manifest is not None else None
+
+        def pending_items() -> Iterator[Tuple[int, str, str]]:
+            for i, item in enumerate(items):
+                chord, color_scheme = _batch_item(item)
+                if manifest is not None:
+                    digests = self.output_digests(fingerprint, i, chord, color_scheme, show_notation, compression, compression_level)
+                    # Check every output (not all() short-circuiting), so each current file is counted as skipped
+                    if all([manifest.is_current(path, digest) for path, digest in digests]):
+                        guitar_path, notation_path = (os.path.join(output_dir, compressed_paths(path, compression)[0]) for path in output_filenames(i, chord, color_scheme))
+                        skipped.append(BatchResult(i, chord, color_scheme, guitar_path=guitar_path, notation_path=notation_path if show_notation else None, skipped=True))
+                        continue
+                yield i, chord, color_scheme
+
+        def recorded(results: List[BatchResult]) -> Iterator[BatchResult]:
+            yield from skipped
+            skipped.clear()
+            for result in results:
+                if manifest is not None and not result.error:
+                    for path, digest in self.output_digests(fingerprint, result.index, result.chord, result.color_scheme, show_notation, compression, compression_level):
+                        manifest.record(path, digest)
+                yield result
+
+        chunks = _chunked(pending_items(), chunksize)
+
+        if executor == 'serial':
+            for chunk in chunks:
+                yield from recorded(_render_batch_chunk(self, chunk, show_notation, output_dir, compression, compression_level))
+            yield from recorded([])
+            return
+
+        if executor == 'process':
+            # Each worker process builds its own generator (and loads the fonts) once, in the initializer
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(self.options,))
+            submit = lambda chunk: pool.submit(_process_batch_chunk, chunk, show_notation, output_dir, compression, compression_level)
+        else:
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+            submit = lambda chunk: pool.submit(_render_batch_chunk, self, chunk, show_notation, output_dir, compression, compression_level)
+
+        with pool:
+            # Keep a bounded number of chunks in flight so arbitrarily long (or lazy) inputs use flat memory
+            pending = set()
+            for chunk in chunks:
+                pending.add(submit(chunk))
+                if len(pending) >= workers * 2:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield from recorded(future.result())
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield from recorded(future.result())
+            yield from recorded([])
+
+    def generate_svg(self, chord_notation: str, color_scheme: str = 'default', show_notation: bool = True, font_mode: Optional[str] = None, serializer: Optional[str] = None,
+                     voicing: Optional[Union['Voicing', Sequence[int]]] = None, color_mode: Optional[str] = None) -> Tuple[str, str]:
+        # voicing replaces the shifted shape-table template with given fret numbers (a Voicing from voicings(), or six ints)
+        font_mode = font_mode or self.font_mode
+        serializer = serializer or self.serializer
+        color_mode = color_mode or self.color_mode
+        if voicing is not None:
+            voicing = tuple(voicing.frets if isinstance(voicing, Voicing) else voicing)
+        cache_key = (chord_notation, color_scheme, show_notation, font_mode, serializer, voicing, color_mode)
+        cached = self.render_cache.get(cache_key)
+        if cached is not None:
+            if self.profiler is not None:
+                self.profiler.count('render_cache_hits')
+            return cached
+
+        with self._stage('render', chord_notation):
+            with self._stage('parse'):
+                diagram = self.diagram(chord_notation, voicing)
+            colors = self.palette(color_scheme, color_mode)
+
+            # Generate guitar diagram SVG
+            with self._stage('guitar') as stage:
+                guitar_svg = self._generate_guitar_svg(diagram, colors, font_mode, serializer)
+                stage.add_bytes(len(guitar_svg))
+
+            # Generate musical notation SVG if requested
+            notation_svg = None
+            if show_notation:
+                with self._stage('notation') as stage:
+                    notation_svg = self._generate_notation_svg(diagram, colors, font_mode, serializer)
+                    stage.add_bytes(len(notation_svg))
+
+        self.render_cache.put(cache_key, (guitar_svg, notation_svg))
         return guitar_svg, notation_svg
 
-    def _generate_guitar_svg(self, root: str, quality: str, finger_positions: List[int], bass: Optional[str], colors: Dict[str, str]) -> str:
+    def diagram(self, chord_notation: str, voicing: Optional[Union['Voicing', Sequence[int]]] = None) -> ChordDiagram:
+        # The data behind generate_svg's drawings; with a voicing, its frets instead of the shifted shape-table template
+        root, quality, finger_positions, bass = self.parse_chord(chord_notation)
+        base_fret = 1
+        if voicing is not None:
+            finger_positions = tuple(voicing.frets if isinstance(voicing, Voicing) else voicing)
+            if len(finger_positions) != self.strings:
+                raise ValueError(f"🚫 Expected {self.strings} fret numbers, got {len(finger_positions)}.")
+            base_fret = self._base_fret(finger_positions)
+        return ChordDiagram(root, quality, bass, tuple(finger_positions), base_fret,
+                            tuple(self._get_note_positions(root, quality)), tuple(self._get_key_signature(root)))
+
+    def diagrams(self, chords: Iterable[str]) -> List[ChordDiagram]:
+        return [self.diagram(chord) for chord in chords]
+
+    def diagrams_json(self, chords: Iterable[str]) -> str:
+        # A JSON array of diagram objects, assembled from each one's compact encoding
+        return '[' + ','.join(self.diagram(chord).to_json() for chord in chords) + ']'
+
+    def _raster_source(self, chord_notation: str, color_scheme: str, notation: bool) -> bytes:
+        # cairosvg ignores @font-face and draws with the installed fonts of the same family, so the
+        # embedded base64 fonts would only be parsed and thrown away; rasterize the small external-font form
+        guitar_svg, notation_svg = self.generate_svg(chord_notation, color_scheme, show_notation=notation, font_mode='external', serializer='compact')
+        return (notation_svg if notation else guitar_svg).encode('utf-8')
+
+    def generate_raster(self, chord_notation: str, color_scheme: str = 'default', scale: float = 1.0, output_format: str = 'png',
+                        notation: bool = False, quality: int = 90) -> bytes:
+        # Scale 1 is 96 DPI; quality only applies to WebP
+        if output_format not in RASTER_FORMATS:
+            raise ValueError(f"🚫 Raster format '{output_format}' not recognized. Use one of: {', '.join(RASTER_FORMATS)}.")
+        svg = self._raster_source(chord_notation, color_scheme, notation)
+        key = RasterCache.key(svg, scale, output_format, quality)
+        data = self.raster_cache.get(key, output_format)
+        if data is None:
+            data = _rasterize(svg, scale, output_format, quality)
+            self.raster_cache.put(key, output_format, data)
+        return data
+
+    def generate_png(self, chord_notation: str, color_scheme: str = 'default', scale: float = 1.0, notation: bool = False) -> bytes:
+        return self.generate_raster(chord_notation, color_scheme, scale, 'png', notation)
+
+    def generate_raster_batch(self, items: Iterable[Union[str, Tuple[str, str]]], scales: Iterable[float] = (1, 2, 3), output_format: str = 'png',
+                              workers: Optional[int] = None, executor: str = 'auto', output_dir: Optional[str] = None,
+                              notation: bool = False, quality: int = 90) -> Iterator[RasterResult]:
+        # SVGs are rendered here (cheap, templated); only cache misses are shipped to the pool for rasterizing.
+        # Yields one RasterResult per (item, scale), cache hits first and the rest as they finish.
+        if output_format not in RASTER_FORMATS:
+            raise ValueError(f"🚫 Raster format '{output_format}' not recognized. Use one of: {', '.join(RASTER_FORMATS)}.")
+        if executor not in EXECUTORS:
+            raise ValueError(f"🚫 Executor '{executor}' not recognized. Use one of: {', '.join(EXECUTORS)}.")
+        _check_batch_sizes(workers, 1)
+        return self._generate_raster_batch(items, tuple(scales), output_format, workers or os.cpu_count() or 1, resolve_executor(executor),
+                                           output_dir, notation, quality)
+
+    def _generate_raster_batch(self, items: Iterable[Union[str, Tuple[str, str]]], scales: Tuple[float, ...], output_format: str, workers: int,
+                               executor: str, output_dir: Optional[str], notation: bool, quality: int) -> Iterator[RasterResult]:
+        def finish(job: Tuple[int, str, str, float, str], data: bytes, cached: bool) -> RasterResult:
+            index, chord, color_scheme, scale, _ = job
+            if output_dir is None:
+                return RasterResult(index, chord, color_scheme, scale, data=data, cached=cached)
+            path = os.path.join(output_dir, raster_filename(index, chord, color_scheme, scale, output_format, notation))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _atomic_write(path, data)
+            return RasterResult(index, chord, color_scheme, scale, path=path, cached=cached)
+
+        def jobs() -> Iterator[Union[RasterResult, Tuple[Tuple[int, str, str, float, str], bytes]]]:
+            for index, item in enumerate(items):
+                chord, color_scheme = _batch_item(item)
+                try:
+                    svg = self._raster_source(chord, color_scheme, notation)
+                except Exception as e:
+                    for scale in scales:
+                        yield RasterResult(index, chord, color_scheme, scale, error=f"{type(e).__name__}: {e}")
+                    continue
+                for scale in scales:
+                    yield (index, chord, color_scheme, scale, RasterCache.key(svg, scale, output_format, quality)), svg
+
+        if executor == 'serial':
+            pool = None
+        elif executor == 'process':
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        else:
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+        # Jobs waiting on each in-flight key, so a diagram requested twice in one batch is rasterized once
+        waiting: Dict[str, List[Tuple[int, str, str, float, str]]] = {}
+        futures: Dict[concurrent.futures.Future, str] = {}
+
+        def collect(done: Iterable[concurrent.futures.Future]) -> Iterator[RasterResult]:
+            for future in done:
+                key = futures.pop(future)
+                jobs_for_key = waiting.pop(key)
+                try:
+                    data = future.result()
+                except Exception as e:
+                    for index, chord, color_scheme, scale, _ in jobs_for_key:
+                        yield RasterResult(index, chord, color_scheme, scale, error=f"{type(e).__name__}: {e}")
+                    continue
+                self.raster_cache.put(key, output_format, data)
+                for job in jobs_for_key:
+                    yield finish(job, data, False)
+
+        try:
+            for job in jobs():
+                if isinstance(job, RasterResult):
+                    yield job
+                    continue
+                job, svg = job
+                key = job[4]
+                if key in waiting:
+                    waiting[key].append(job)
+                    continue
+                data = self.raster_cache.get(key, output_format)
+                if data is not None:
+                    yield finish(job, data, True)
+                    continue
+                if pool is None:
+                    try:
+                        data = _rasterize(svg, job[3], output_format, quality)
+                    except Exception as e:
+                        yield RasterResult(*job[:4], error=f"{type(e).__name__}: {e}")
+                        continue
+                    self.raster_cache.put(key, output_format, data)
+                    yield finish(job, data, False)
+                    continue
+                waiting[key] = [job]
+                futures[pool.submit(_rasterize, svg, job[3], output_format, quality)] = key
+                # Same flat-memory bound as generate_batch
+                if len(futures) >= workers * 4:
+                    done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                    yield from collect(done)
+            while futures:
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                yield from collect(done)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def _base_fret(self, finger_positions: Sequence[int]) -> int:
+        # Voicings that reach past the last drawn fret are drawn from their lowest fretted note, numbered to match
+        fretted = [pos for pos in finger_positions if pos > 0]
+        return min(fretted) if fretted and max(fretted) > self.frets else 1
+
+    def _generate_guitar_svg(self, diagram: ChordDiagram, colors: Dict[str, str], font_mode: Optional[str] = None, serializer: Optional[str] = None) -> str:
+        font_mode = font_mode or self.font_mode
+        serializer = serializer or self.serializer
+        # Subset fonts depend on the chord name's glyphs, so those diagrams can't share a static template
+        if self.use_templates and font_mode != 'subset':
+            return self._render_guitar_from_template(diagram, colors, font_mode, serializer)
+        return self._svg_to_string(self._build_guitar_svg(diagram, colors, font_mode), serializer)
+
+    def _build_guitar_svg(self, diagram: ChordDiagram, colors: Dict[str, str], font_mode: str) -> ET.Element:
         svg = ET.Element('svg', {
             'width': str(self.width),
             'height': str(self.height),
             'xmlns': 'http://www.w3.org/2000/svg'
         })
         
-        self._add_fonts(svg)
-        self._add_gradients(svg, colors)
-        self._add_background(svg, colors)
-        self._draw_fretboard(svg, colors)
-        self._add_finger_positions(svg, finger_positions, colors)
-        self._add_chord_name(svg, root, quality, bass, colors)
+        with self._stage('guitar.gradients'):
+            self._add_gradients(svg, colors)
+        with self._stage('guitar.background'):
+            self._add_background(svg, colors)
+        with self._stage('guitar.fretboard'):
+            self._draw_fretboard(svg, colors, base_fret=diagram.base_fret)
+        with self._stage('guitar.fingers'):
+            self._add_finger_positions(svg, diagram.frets, colors, diagram.base_fret)
+        with self._stage('guitar.name'):
+            self._add_chord_name(svg, diagram.root, diagram.quality, diagram.bass, colors)
+        if self._is_themable(colors):
+            self._theme_colors_to_style(svg)
+        with self._stage('guitar.fonts'):
+            self._add_fonts(svg, font_mode)
         
-        return self._svg_to_string(svg)
-    
-    def _generate_notation_svg(self, root: str, quality: str, colors: Dict[str, str]) -> str:
+        return svg
+
+    def _render_guitar_from_template(self, diagram: ChordDiagram, colors: Dict[str, str], font_mode: str, serializer: str) -> str:
+        with self._stage('guitar.template'):
+            head, tail = self._guitar_template(colors, font_mode, serializer, diagram.base_fret)
+        fragment = ET.Element('svg')
+        with self._stage('guitar.fingers'):
+            self._add_finger_positions(fragment, diagram.frets, colors, diagram.base_fret)
+        with self._stage('guitar.name'):
+            self._add_chord_name(fragment, diagram.root, diagram.quality, diagram.bass, colors)
+        if self._is_themable(colors):
+            self._theme_colors_to_style(fragment)
+        return head + self._serialize_fragment(fragment, serializer) + tail
+
+    def _guitar_template(self, colors: Dict[str, str], font_mode: str, serializer: str, base_fret: int = 1) -> Tuple[str, str]:
+        # Background, gradient, fretboard, fret numbers and fonts are identical for every chord sharing these settings
+        key = (tuple(colors.items()), self.frets, self.strings, self.width, self.height, font_mode, serializer, base_fret)
+        template = self._guitar_templates.get(key)
+        if template is None:
+            svg = ET.Element('svg', {
+                'width': str(self.width),
+                'height': str(self.height),
+                'xmlns': 'http://www.w3.org/2000/svg'
+            })
+            self._add_gradients(svg, colors)
+            self._add_background(svg, colors)
+            self._draw_fretboard(svg, colors, base_fret=base_fret)
+            if self._is_themable(colors):
+                self._theme_colors_to_style(svg)
+            ET.SubElement(svg, TEMPLATE_SLOT)
+            self._add_fonts(svg, font_mode)
+            head, tail = self._svg_to_string(svg, serializer).split(f'<{TEMPLATE_SLOT}/>')
+            template = self._guitar_templates.setdefault(key, (head, tail))
+        return template
+
+    def _serialize_fragment(self, fragment: ET.Element, serializer: str) -> str:
+        # Serialize children of a bare <svg> wrapper exactly as they would appear in the slot of a full document
+        lengths = self._fragment_wrappers.get(serializer)
+        if lengths is None:
+            wrapper = ET.Element('svg')
+            ET.SubElement(wrapper, TEMPLATE_SLOT)
+            head, tail = self._svg_to_string(wrapper, serializer).split(f'<{TEMPLATE_SLOT}/>')
+            lengths = self._fragment_wrappers.setdefault(serializer, (len(head), len(tail)))
+        head_length, tail_length = lengths
+        serialized = self._svg_to_string(fragment, serializer)
+        return serialized[head_length:len(serialized) - tail_length]
+
+    def _generate_notation_svg(self, diagram: ChordDiagram, colors: Dict[str, str], font_mode: Optional[str] = None, serializer: Optional[str] = None) -> str:
+        return self._svg_to_string(self._build_notation_svg(diagram, colors, font_mode or self.font_mode), serializer)
+
+    def _build_notation_svg(self, diagram: ChordDiagram, colors: Dict[str, str], font_mode: str) -> ET.Element:
         svg = ET.Element('svg', {
             'width': str(self.width),
             'height': '150',
             'xmlns': 'http://www.w3.org/2000/svg'
         })
         
-        self._add_fonts(svg)
-        self._add_background(svg, colors)
-        self._add_musical_notation(svg, root, quality, colors)
+        with self._stage('notation.background'):
+            self._add_background(svg, colors)
+        with self._stage('notation.staff'):
+            self._add_musical_notation(svg, diagram, colors)
+        if self._is_themable(colors):
+            self._theme_colors_to_style(svg)
+        with self._stage('notation.fonts'):
+            self._add_fonts(svg, font_mode)
         
-        return self._svg_to_string(svg)
+        return svg
 
-    def _add_musical_notation(self, svg: ET.Element, root: str, quality: str, colors: Dict[str, str]):
+    def _add_musical_notation(self, svg: ET.Element, diagram: ChordDiagram, colors: Dict[str, str]):
         staff_group = ET.SubElement(svg, 'g', {'transform': 'translate(25, 50)'})
         
         # Draw staff lines
@@ -495,11 +1890,11 @@ class ChordChartGenerator:
         }).text = '\uE050'  # Treble clef in Noto Music font
         
         # Add key signature
-        key_signature = self._get_key_signature(root)
+        key_signature = diagram.key_signature
         self._add_key_signature(staff_group, key_signature, colors['text'])
         
         # Add notes
-        note_positions = self._get_note_positions(root, quality)
+        note_positions = diagram.notes
         x_offset = 70 + len(key_signature) * 10
         for i, (note, octave) in enumerate(note_positions):
             x = x_offset + i * 30
@@ -587,11 +1982,11 @@ class ChordChartGenerator:
             'fill': color
         }).text = '\uE262'  # Sharp symbol in Noto Music font
     
-    def _add_finger_circle(self, svg: ET.Element, x: float, y: float, fill_color: str, text_color: str, label: str):
+    def _add_finger_circle(self, svg: ET.Element, x: float, y: float, fill_color: str, stroke_color: str, text_color: str, label: str):
         ET.SubElement(svg, 'circle', {
             'cx': str(x), 'cy': str(y), 'r': '12',
             'fill': fill_color,
-            'stroke': self._darken_color(fill_color, 0.2),
+            'stroke': stroke_color,
             'stroke-width': '2'
         })
         ET.SubElement(svg, 'text', {
@@ -645,7 +2040,7 @@ class ChordChartGenerator:
         shadow = ET.SubElement(text_element, 'tspan', {
             'dx': '1',
             'dy': '1',
-            'fill': self._lighten_color(colors['background'], 0.2)
+            'fill': colors['text-shadow']
         })
         shadow.text = chord_name
 
@@ -656,7 +2051,51 @@ class ChordChartGenerator:
         })
         main_text.text = chord_name
 
+    def palette(self, color_scheme: str, color_mode: Optional[str] = None) -> Mapping[str, str]:
+        return self._palette(self.color_schemes[color_scheme], color_mode or self.color_mode)
+
+    def _palette(self, colors: Mapping[str, str], color_mode: str) -> Mapping[str, str]:
+        # Every color a diagram uses: the scheme's own plus the shades derived from them. In themable mode each one
+        # is a CSS custom property reference, falling back to the scheme's color where no theme defines it.
+        key = (tuple(colors.items()), color_mode)
+        palette = self._palettes.get(key)
+        if palette is None:
+            palette = dict(colors)
+            for name, base, shade, factor in DERIVED_COLORS:
+                palette[name] = (self._lighten_color if shade == 'lighten' else self._darken_color)(colors[base], factor)
+            if color_mode == 'themable':
+                palette = {name: f"var({THEME_PROPERTY_PREFIX}{name}, {color})" for name, color in palette.items()}
+            elif color_mode not in COLOR_MODES:
+                raise ValueError(f"🚫 Color mode '{color_mode}' not recognized. Use one of: {', '.join(COLOR_MODES)}.")
+            palette = self._palettes.setdefault(key, MappingProxyType(palette))
+        return palette
+
+    def theme_stylesheet(self, color_scheme: Optional[str] = None, selector: Optional[str] = None) -> str:
+        # The custom properties that theme diagrams rendered with color_mode='themable'. Put them on any ancestor of
+        # inline SVGs (or <use> of an inline sprite); switching themes is then just switching a class.
+        # With no scheme, one rule per scheme; the default selector is .chord-theme-<scheme>.
+        rules = []
+        for scheme in ([color_scheme] if color_scheme else self.color_schemes):
+            palette = self._palette(self.color_schemes[scheme], 'fixed')
+            declarations = ''.join(f"\n    {THEME_PROPERTY_PREFIX}{name}: {color};" for name, color in palette.items())
+            rules.append(f"{selector or f'.chord-theme-{scheme}'} {{{declarations}\n}}\n")
+        return '\n'.join(rules)
+
     @staticmethod
+    def _theme_colors_to_style(svg: ET.Element):
+        # Presentation attributes can't reliably hold var(), so themable colors move into each element's style
+        for element in svg.iter():
+            declarations = [f"{name}:{element.attrib.pop(name)}" for name in ('fill', 'stroke') if element.get(name, '').startswith('var(')]
+            if declarations:
+                style = element.get('style')
+                element.set('style', ';'.join(([style] if style else []) + declarations))
+
+    @staticmethod
+    def _is_themable(colors: Dict[str, str]) -> bool:
+        return colors['background'].startswith('var(')
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _lighten_color(color: str, factor: float = 0.1) -> str:
         # Convert hex to RGB
         color = color.lstrip('#')
@@ -671,6 +2110,7 @@ class ChordChartGenerator:
         return f'#{r:02x}{g:02x}{b:02x}'
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def _darken_color(color: str, factor: float = 0.1) -> str:
         # Convert hex to RGB
         color = color.lstrip('#')
@@ -684,113 +2124,1166 @@ class ChordChartGenerator:
         # Convert back to hex
         return f'#{r:02x}{g:02x}{b:02x}'
 
-# List of all chord examples
-chord_examples = [
-    # Basic major and minor chords
-    ("C", "default"), ("Am", "default"), ("F#", "default"), ("Ebm", "default"),
-    
-    # Seventh chords
-    ("G7", "default"), ("Bm7", "default"), ("Dmaj7", "default"), ("F#m7", "default"),
-    
-    # Extended chords
-    ("A9", "default"), ("Cm11", "default"), ("Gmaj13", "default"), ("E7#9", "default"),
-    
-    # Sus and add chords
-    ("Dsus4", "default"), ("Fsus2", "default"), ("Cadd9", "default"), ("G6", "default"),
-    
-    # Altered chords
-    ("Ab7b5", "default"), ("B7#5", "default"), ("F#7b9", "default"), ("C7#9", "default"),
-    
-    # Diminished and augmented chords
-    ("Ddim", "default"), ("F#dim7", "default"), ("Gaug", "default"), ("Baug7", "default"),
-    
-    # Complex jazz chords
-    ("Cmaj9#11", "default"), ("Dm11b5", "default"), ("G13b9", "default"), ("Ebm9#5", "default"),
-    
-    # Slash chords
-    ("C/E", "default"), ("Am/F#", "default"), ("G/B", "default"), ("F#m7/C#", "default"),
-    
-    # Exotic and rare chords
-    ("C7#9#5", "default"), ("Abmaj7#5", "default"), ("E7alt", "default"), ("Bbm6/9", "default"),
-    
-    # Chords with multiple alterations
-    ("D7b9b13", "default"), ("Gmaj13#11", "default"), ("F#7#9b13", "default"), ("Am11b5", "default"),
-    
-    # Power chords
-    ("C5", "default"), ("G5", "default"), ("F#5", "default"), ("Bb5", "default")
+class VoicingTable:
+    # Finger positions for every (root spelling, quality key) as one int8 array, plus vectorized resolve/transpose.
+    # Rows are the A-rooted shapes (adjustment 0), so any root is one modular add away, exactly as in parse_chord.
+    BASS_PATTERN = re.compile(r'/([A-G][b#]?)$')
+
+    def __init__(self, generator: ChordChartGenerator):
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("🚫 The voicing table requires NumPy. Install it with 'pip install numpy'.")
+        self.np = numpy
+        self.generator = generator
+        self.roots = tuple(ROOT_ADJUSTMENT)
+        self.qualities = tuple(generator.chord_shapes)
+        self.root_index = {root: i for i, root in enumerate(self.roots)}
+        self.quality_index = {quality: i for i, quality in enumerate(self.qualities)}
+
+        # Qualities that parse_chord rejects on their own (e.g. '6/9') keep a zero row and are masked out
+        base = numpy.zeros((len(self.qualities), generator.strings), dtype=numpy.int8)
+        self.valid = numpy.zeros(len(self.qualities), dtype=bool)
+        for i, quality in enumerate(self.qualities):
+            row = self._a_rooted_row(quality)
+            if row is not None and len(row) == generator.strings:
+                base[i], self.valid[i] = row, True
+        self._rows = base
+        self._row_index: Dict[str, int] = {quality: i for i, quality in enumerate(self.qualities) if self.valid[i]}
+        self._row_index[''] = self._row_index['major']
+        self._lock = threading.Lock()
+
+        adjustments = numpy.array([ROOT_ADJUSTMENT[root] for root in self.roots], dtype=numpy.int8)
+        self.table = self._transpose(base[None, :, :], adjustments[:, None, None])
+
+    def _a_rooted_row(self, rest: str) -> Optional[Tuple[int, ...]]:
+        try:
+            _, _, finger_positions, _ = self.generator.parse_chord('A' + rest)
+        except (ValueError, KeyError):
+            return None
+        return finger_positions
+
+    def _transpose(self, rows, adjustments):
+        np = self.np
+        return np.where(rows == 0, 0, (rows.astype(np.int16) + adjustments) % 12).astype(np.int8)
+
+    def lookup(self, root: str, quality: str) -> Tuple[int, ...]:
+        return tuple(int(pos) for pos in self.table[self.root_index[root], self.quality_index[quality]])
+
+    def _split(self, chords: Iterable[str]) -> Tuple[List[str], List[int], List[int]]:
+        # Root text, A-based root semitones and shape-row index per chord; unseen suffixes (alterations, bass notes) get a row on first sight
+        roots, adjustments, rows = [], [], []
+        unseen: Dict[str, Tuple[str, List[int]]] = {}
+        for position, chord in enumerate(chords):
+            root = chord[:2] if chord[1:2] in ('b', '#') else chord[:1]
+            if root not in ROOT_ADJUSTMENT:
+                raise ValueError(f"❌ Error: The chord notation '{chord}' is invalid. Please check your input.")
+            rest = chord[len(root):]
+            row = self._row_index.get(rest)
+            if row is None:
+                unseen.setdefault(rest, (chord, []))[1].append(position)
+            roots.append(root)
+            adjustments.append(ROOT_ADJUSTMENT[root])
+            rows.append(row)
+        if unseen:
+            self._add_rows(unseen, rows)
+        return roots, adjustments, rows
+
+    def _add_rows(self, unseen: Dict[str, Tuple[str, List[int]]], rows: List[int]):
+        # The table only grows, under the lock: the new rows are in place before any index entry points at them, so
+        # lock-free readers in _split always find their row in _rows
+        with self._lock:
+            new_rows, new_index = [], {}
+            for rest, (chord, positions) in unseen.items():
+                row = self._row_index.get(rest)  # Another thread may have added it since
+                if row is None:
+                    finger_positions = self._a_rooted_row(rest)
+                    if finger_positions is None:
+                        raise ValueError(f"❌ Error: The chord notation '{chord}' is invalid. Please check your input.")
+                    if len(finger_positions) != self.generator.strings:
+                        # Shapes like maj9#11 carry more positions than strings; only generate_svg can draw those
+                        raise ValueError(f"🚫 Chord '{chord}' has {len(finger_positions)} finger positions but the voicing table holds "
+                                         f"{self.generator.strings} per chord. Draw it with generate_svg instead.")
+                    row = new_index[rest] = len(self._rows) + len(new_rows)
+                    new_rows.append(finger_positions)
+                for position in positions:
+                    rows[position] = row
+            if new_rows:
+                self._rows = self.np.vstack([self._rows, self.np.array(new_rows, dtype=self.np.int8)])
+                self._row_index.update(new_index)
+
+    def resolve_many(self, chords: Iterable[str]):
+        # Same finger positions parse_chord returns, as an (N, strings) int8 array
+        _, adjustments, rows = self._split(chords)
+        np = self.np
+        return self._transpose(self._rows[np.asarray(rows, dtype=np.intp)], np.asarray(adjustments, dtype=np.int16)[:, None])
+
+    def transpose_many(self, chords: Iterable[str], semitones: Union[int, Iterable[int]]) -> Tuple[List[str], Any]:
+        chords = list(chords)
+        np = self.np
+        if not isinstance(semitones, int):
+            semitones = list(semitones)
+            if len(semitones) != len(chords):
+                raise ValueError(f"🚫 Got {len(semitones)} semitone shifts for {len(chords)} chords. Pass one shift per chord, or a single int for all.")
+        roots, adjustments, rows = self._split(chords)
+        shift = np.asarray(semitones, dtype=np.int16)
+        new_adjustments = (np.asarray(adjustments, dtype=np.int16) + shift) % 12
+        positions = self._transpose(self._rows[np.asarray(rows, dtype=np.intp)], new_adjustments[:, None])
+        shifts = np.broadcast_to(shift, new_adjustments.shape)
+        names = [self._transpose_name(chord, root, int(new_adjustment), int(step)) for chord, root, new_adjustment, step in zip(chords, roots, new_adjustments, shifts)]
+        return names, positions
+
+    def _transpose_name(self, chord: str, root: str, new_adjustment: int, step: int) -> str:
+        spelling = FLAT_ROOTS if 'b' in root else SHARP_ROOTS
+        rest = chord[len(root):]
+        bass_match = self.BASS_PATTERN.search(rest)
+        if bass_match and bass_match.group(1) in ROOT_ADJUSTMENT:
+            bass = bass_match.group(1)
+            bass_spelling = FLAT_ROOTS if 'b' in bass else SHARP_ROOTS
+            rest = rest[:bass_match.start()] + '/' + bass_spelling[(ROOT_ADJUSTMENT[bass] + step) % 12]
+        return spelling[new_adjustment] + rest
+
+class ChordIdentifier:
+    # The reverse of parse_chord: fret numbers, low E to high E (negative, None or 'x' for a muted string), to ranked
+    # chord names. Every root pitch class x base quality becomes a 12-bit pitch-class mask. The exact index maps each mask
+    # between a chord's required tones and its full set back to that chord, so a complete voicing (with or without the
+    # commonly omitted fifth, ninth or eleventh) is one dict lookup. Ranked results are memoized per sounding set and bass.
+    CACHED_RESULTS = 10
+
+    def __init__(self, generator: ChordChartGenerator, tuning: Sequence[int] = STANDARD_TUNING):
+        if len(tuning) != generator.strings:
+            raise ValueError(f"🚫 Tuning has {len(tuning)} strings but the generator draws {generator.strings}.")
+        self.tuning = tuple(tuning)
+        # Pitch classes carry no octave, so each string is taken to sound above the one below it (true of standard,
+        # drop and open guitar tunings); the lowest sounding pitch, not the lowest string, is the bass
+        self._open_pitches = [self.tuning[0]]
+        for open_string in self.tuning[1:]:
+            self._open_pitches.append(self._open_pitches[-1] + ((open_string - self._open_pitches[-1]) % 12 or 12))
+        self.parser = generator.parser
+        self._shapes = generator.chord_shapes
+        spellings: Dict[int, List[str]] = {}
+        for root, adjustment in ROOT_ADJUSTMENT.items():
+            spellings.setdefault(adjustment, []).append(root)
+        # (root spellings, quality, root pitch class, full mask, required mask, (tone count, name length));
+        # enharmonic roots share one entry. Only spellings whose name parses back to the same chord are kept,
+        # with the ones that also take a slash bass in _slash_roots (qualities like '6/9' have neither)
+        self.candidates: List[Tuple[Tuple[str, ...], str, int, int, int, Tuple[int, int]]] = []
+        self._slash_roots: List[Tuple[str, ...]] = []
+        self.exact: Dict[int, List[int]] = {}
+        self._by_root: List[List[int]] = [[] for _ in range(12)]
+        # Aliases (maj, m, min7, ...) would only repeat their base quality's names, so only canonical qualities count
+        for quality in generator.chord_shapes.qualities():
+            intervals = generator.chord_shapes.intervals.get(quality)
+            if intervals is None:
+                continue
+            optional = self._optional_intervals(quality, intervals)
+            for adjustment, roots in sorted(spellings.items()):
+                roots = [root for root in roots if self._round_trips(root, quality, None)]
+                if not roots:
+                    continue
+                full = self._mask((adjustment + interval) % 12 for interval in intervals)
+                optional_mask = self._mask((adjustment + interval) % 12 for interval in optional)
+                index = len(self.candidates)
+                self.candidates.append((tuple(roots), quality, adjustment, full, full & ~optional_mask, (len(intervals), len(quality))))
+                self._slash_roots.append(tuple(root for root in roots if self._round_trips(root, quality, 'E')))
+                self._by_root[adjustment].append(index)
+                # Every combination of the optional tones, from none of them to all
+                subset = optional_mask
+                while True:
+                    self.exact.setdefault((full & ~optional_mask) | subset, []).append(index)
+                    if not subset:
+                        break
+                    subset = (subset - 1) & optional_mask
+        self._results = LRUCache(65536)
+
+    def _round_trips(self, root: str, quality: str, bass: Optional[str]) -> bool:
+        name = root + QUALITY_SYMBOLS.get(quality, quality) + (f'/{bass}' if bass else '')
+        try:
+            parsed_root, _, parsed_bass, base_quality, alterations = self.parser.split(name)
+        except ValueError:
+            return False
+        return (parsed_root, self._shapes.canonical(base_quality), parsed_bass, alterations) == (root, quality, bass, [])
+
+    @staticmethod
+    def _mask(pitch_classes: Iterable[int]) -> int:
+        mask = 0
+        for pitch_class in pitch_classes:
+            mask |= 1 << pitch_class
+        return mask
+
+    @staticmethod
+    def _optional_intervals(quality: str, intervals: Tuple[int, ...]) -> Tuple[int, ...]:
+        # Tones a guitar voicing commonly leaves out: the perfect fifth of four-note and bigger chords,
+        # the ninth of an eleventh chord, and the ninth and eleventh of a thirteenth chord
+        optional = []
+        if 7 in intervals and len(intervals) >= 4:
+            optional.append(7)
+        if '13' in quality:
+            optional.extend(interval for interval in (2, 5) if interval in intervals)
+        elif '11' in quality and '#11' not in quality and 2 in intervals:
+            optional.append(2)
+        return tuple(optional)
+
+    def _parse_frets(self, frets: Union[str, Sequence[Optional[int]]]) -> List[int]:
+        if isinstance(frets, str):
+            # 'x32010', or separated ('x 3 2 0 1 0', 'x-10-12-11-10-x') when frets reach two digits
+            fields = re.split(r'[\s,-]+', frets.strip()) if re.search(r'[\s,-]', frets.strip()) else list(frets.strip())
+            frets = [None if field.lower() == 'x' else int(field) for field in fields]
+        if len(frets) != len(self.tuning):
+            raise ValueError(f"🚫 Expected {len(self.tuning)} fret numbers, got {len(frets)}.")
+        return [-1 if fret is None else fret for fret in frets]
+
+    def identify(self, frets: Union[str, Sequence[Optional[int]]], limit: int = 5) -> List[ChordMatch]:
+        pitches = sorted(open_pitch + fret for open_pitch, fret in zip(self._open_pitches, self._parse_frets(frets)) if fret >= 0)
+        if not pitches:
+            return []
+        sounding = [pitch % 12 for pitch in pitches]
+        key = (self._mask(sounding), sounding[0], self._mask(sounding[1:]))
+        if limit > self.CACHED_RESULTS:
+            return self._rank(*key, limit)
+        results = self._results.get(key)
+        if results is None:
+            results = tuple(self._rank(*key, self.CACHED_RESULTS))
+            self._results.put(key, results)
+        return list(results[:limit])
+
+    def identify_many(self, fingerings: Iterable[Union[str, Sequence[Optional[int]]]], limit: int = 1) -> List[List[ChordMatch]]:
+        # Repeated shapes (the common case when scanning songs or drag events) come straight from the memo
+        return [self.identify(frets, limit) for frets in fingerings]
+
+    def _rank(self, mask: int, bass: int, upper: int, limit: int) -> List[ChordMatch]:
+        candidates = self.candidates
+        scored = []
+        seen = set()
+        for index in self.exact.get(mask, ()):
+            scored.append(self._rank_key(index, mask, bass, True))
+            seen.add(index)
+        # A bass note outside the chord (C/D): the notes above it name the chord
+        if not upper >> bass & 1:
+            for index in self.exact.get(upper, ()):
+                if index not in seen:
+                    scored.append(self._rank_key(index, upper, bass, True))
+                    seen.add(index)
+        # Partial matches need the root sounding and at least two chord tones; only sounding roots are scored.
+        # Same key as _rank_key, inlined because this loop covers up to a few hundred candidates per cold lookup.
+        for root_pc in range(12):
+            if not mask >> root_pc & 1:
+                continue
+            inversion_if_tone = 0 if bass == root_pc else 1
+            for index in self._by_root[root_pc]:
+                if index in seen:
+                    continue
+                _, _, _, full, required, size = candidates[index]
+                if (full & mask).bit_count() < 2:
+                    continue
+                missing_required = (required & ~mask).bit_count()
+                missing_optional = (full & ~mask).bit_count() - missing_required
+                inversion = inversion_if_tone if full >> bass & 1 else 2
+                scored.append((True, 2 * (missing_required + (mask & ~full).bit_count()) + missing_optional + inversion,
+                               inversion, missing_optional, size, mask, index))
+        scored.sort()
+
+        matches = []
+        for rank in scored:
+            exact, index, tones, bass_is_root = not rank[0], rank[-1], rank[-2], rank[2] == 0
+            roots, quality, _, full, _, _ = candidates[index]
+            for root in (roots if bass_is_root else self._slash_roots[index]):
+                bass_name = None if bass_is_root else (FLAT_ROOTS if 'b' in root else SHARP_ROOTS)[bass]
+                name = root + QUALITY_SYMBOLS.get(quality, quality) + (f'/{bass_name}' if bass_name else '')
+                matches.append(ChordMatch(name, root, quality, bass_name, (full & ~tones).bit_count(), (tones & ~full).bit_count(), exact))
+            if len(matches) >= limit:
+                break
+        return matches[:limit]
+
+    def _rank_key(self, index: int, tones: int, bass: int, exact: bool) -> tuple:
+        _, _, root_pc, full, required, size = self.candidates[index]
+        missing_required = (required & ~tones).bit_count()
+        missing_optional = (full & ~tones).bit_count() - missing_required
+        inversion = 0 if bass == root_pc else 1 if full >> bass & 1 else 2
+        # Exact before partial; then a penalty weighing wrong or missing essential notes double against thinned-out
+        # voicings and inversions; ties go to root position, complete voicings, then simpler chords
+        return (not exact, 2 * (missing_required + (tones & ~full).bit_count()) + missing_optional + inversion,
+                inversion, missing_optional, size, tones, index)
+
+class VoicingSearch:
+    # Playable fingerings of a chord anywhere up to max_fret, found by a depth-first walk over the strings from low E
+    # to high E. A branch is cut as soon as its hand span, the frets it needs fingers on or the strings left to cover
+    # the missing required tones rule it out, or once even its best possible score can't make the current top K.
+    # Results are memoized per chord-tone set and bass note, and with a cache_path persisted as JSON across runs.
+    CACHED_RESULTS = 10
+    # How each alteration parse_chord accepts changes the chord tones: (interval it replaces, interval it adds)
+    ALTERATIONS = {'#5': (7, 8), 'b5': (7, 6), '#9': (2, 3), 'b9': (2, 1), 'add9': (None, 2), '#11': (5, 6), 'b13': (9, 8)}
+
+    def __init__(self, generator: ChordChartGenerator, max_fret: int = 12, max_span: int = 4, max_fingers: int = 4, min_strings: int = 3,
+                 max_gaps: int = 1, tuning: Sequence[int] = STANDARD_TUNING, cache_path: Optional[str] = None):
+        if len(tuning) != generator.strings:
+            raise ValueError(f"🚫 Tuning has {len(tuning)} strings but the generator draws {generator.strings}.")
+        if max_span < 1 or max_fingers < 1:
+            raise ValueError("🚫 A voicing needs a hand span and a finger count of at least 1.")
+        self.generator = generator
+        self.tuning = tuple(tuning)
+        self.max_fret = max_fret
+        self.max_span = max_span
+        self.max_fingers = max_fingers
+        self.min_strings = min(min_strings, len(self.tuning))
+        self.max_gaps = max_gaps
+        self.cache_path = cache_path
+        self._params = [__version__, list(self.tuning), max_fret, max_span, max_fingers, self.min_strings, max_gaps, generator.frets]
+        self._results: Dict[Tuple[int, int, int], Tuple[Voicing, ...]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if cache_path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        # Entries from another version or other search limits would be stale, so they are dropped wholesale
+        if data.get('params') != self._params:
+            return
+        for key, voicings in data.get('voicings', {}).items():
+            self._results[tuple(int(part) for part in key.split(':'))] = tuple(
+                Voicing(tuple(frets), *rest) for frets, *rest in voicings)
+
+    def save(self) -> bool:
+        with self._lock:
+            if not self.cache_path or not self._dirty:
+                return False
+            snapshot = self._results.copy()
+            self._dirty = False
+        voicings = {':'.join(map(str, key)): [[list(voicing.frets), *voicing[1:]] for voicing in results] for key, results in snapshot.items()}
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        _atomic_write(self.cache_path, json.dumps({'params': self._params, 'voicings': voicings}, separators=(',', ':'), sort_keys=True))
+        return True
+
+    def chord_tones(self, root: str, quality: str, alterations: Iterable[str] = (), bass: Optional[str] = None) -> Tuple[int, Tuple[int, ...], Tuple[int, ...], int]:
+        # (root pitch class, intervals, optional intervals, bass pitch class), pitch classes counted from A like ROOT_ADJUSTMENT
+        shapes = self.generator.chord_shapes
+        if quality not in shapes:
+            raise ValueError(f"🚫 Chord quality '{quality}' not recognized. Ensure the chord is defined in the chord shapes dictionary.")
+        base_quality = shapes.canonical(quality)
+        if base_quality not in shapes.intervals:
+            raise ValueError(f"🚫 Chord quality '{quality}' has no chord tones to search for. Add its intervals to the shape file.")
+        intervals = list(shapes.intervals[base_quality])
+        for alteration in alterations:
+            if alteration not in self.ALTERATIONS:
+                raise ValueError(f"🚫 Alteration '{alteration}' not recognized. No rule defined for this alteration.")
+            replaced, added = self.ALTERATIONS[alteration]
+            if replaced in intervals:
+                intervals.remove(replaced)
+            if added not in intervals:
+                intervals.append(added)
+        intervals = tuple(intervals)
+        optional = ChordIdentifier._optional_intervals(base_quality, intervals)
+        if len(intervals) > len(self.tuning):
+            # More tones than strings (7alt): only the root, third and seventh shell is required
+            optional = tuple(interval for interval in intervals if interval not in (0, 3, 4, 10, 11))
+        root_pc = ROOT_ADJUSTMENT[root]
+        bass_pc = ROOT_ADJUSTMENT[bass] if bass else root_pc
+        return root_pc, intervals, optional, bass_pc
+
+    def search(self, chord_notation: str, limit: int = 5) -> List[Voicing]:
+        root, _, bass, base_quality, alterations = self.generator.parser.split(chord_notation)
+        return self.voicings_for(root, base_quality, alterations, bass, limit)
+
+    def voicings_for(self, root: str, quality: str, alterations: Iterable[str] = (), bass: Optional[str] = None, limit: int = 5) -> List[Voicing]:
+        root_pc, intervals, optional, bass_pc = self.chord_tones(root, quality, alterations, bass)
+        full = ChordIdentifier._mask((root_pc + interval) % 12 for interval in intervals)
+        optional_mask = ChordIdentifier._mask((root_pc + interval) % 12 for interval in optional)
+        key = (full, full & ~optional_mask, bass_pc)
+        if limit > self.CACHED_RESULTS:
+            return self._search(*key, limit)
+        results = self._results.get(key)
+        if results is None:
+            results = tuple(self._search(*key, self.CACHED_RESULTS))
+            with self._lock:
+                results = self._results.setdefault(key, results)
+                self._dirty = True
+        return list(results[:limit])
+
+    def catalog(self, roots: Iterable[str] = tuple(ROOT_ADJUSTMENT), qualities: Optional[Iterable[str]] = None, limit: int = 5) -> Dict[str, List[Voicing]]:
+        # Every root x quality (aliases included) by chord name; enharmonic roots and aliases share one search
+        catalog = {}
+        roots = list(roots)
+        shapes = self.generator.chord_shapes
+        for quality in (shapes if qualities is None else qualities):
+            if qualities is None and shapes.canonical(quality) not in shapes.intervals:
+                continue  # A shape-file quality without intervals has no chord tones to search for
+            for root in roots:
+                catalog[root + QUALITY_SYMBOLS.get(quality, quality)] = self.voicings_for(root, quality, limit=limit)
+        self.save()
+        return catalog
+
+    def _search(self, full: int, required: int, bass: int, limit: int) -> List[Voicing]:
+        strings = len(self.tuning)
+        allowed = full | 1 << bass  # A slash bass outside the chord may sound, but only as the lowest note
+        optional = full & ~required
+        max_fret, max_span, max_fingers, min_strings, max_gaps = self.max_fret, self.max_span, self.max_fingers, self.min_strings, self.max_gaps
+        # (fret, pitch-class bit) for every fret on each string that sounds an allowed note
+        choices = [[(fret, 1 << (open_string + fret) % 12) for fret in range(max_fret + 1) if allowed >> (open_string + fret) % 12 & 1]
+                   for open_string in self.tuning]
+        bass_bit = 1 << bass
+        frets = [-1] * strings
+        best: List[Tuple[float, int, Tuple[int, ...], int, int]] = []  # Min-heap of the top K as (-score, -found order, frets, fingers, missing)
+        found = 0
+
+        def position(low: int, high: int) -> float:
+            # Stretch plus half the position up the neck: moving the lowest note down adds as much stretch as it saves
+            # in position, so like every other score term this only grows as strings are added
+            return high - low + low / 2 if high else 0
+
+        def visit(string: int, low: int, high: int, covered: int, sounding: int, gaps: int, fretted: int):
+            nonlocal found
+            muted = string - sounding
+            # Bound: each distinct fretted fret needs a finger, and a muted string costs the same as in the final score
+            if len(best) == limit and 2 * (muted + gaps) + fretted.bit_count() + position(low, high) >= -best[0][0]:
+                return
+            if string == strings:
+                if sounding < min_strings or required & ~covered:
+                    return
+                fingers = self._fingers(frets, low)
+                if fingers > max_fingers:
+                    return
+                missing = (optional & ~covered).bit_count()
+                # Missing optional tones weigh most, then silent strings (gaps inside the voicing doubly), fingers and position
+                score = 3 * missing + 2 * (muted + gaps) + fingers + position(low, high)
+                entry = (-score, -found, tuple(frets), fingers, missing)
+                found += 1
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                else:
+                    heapq.heappushpop(best, entry)
+                return
+            left = strings - string - 1
+            if (required & ~covered).bit_count() > left + 1 or sounding + left + 1 < min_strings:
+                return
+            if sounding:
+                if gaps < max_gaps and (required & ~covered).bit_count() <= left:
+                    frets[string] = -1
+                    visit(string + 1, low, high, covered, sounding, gaps + 1, fretted)
+            else:
+                frets[string] = -1
+                visit(string + 1, low, high, covered, sounding, gaps, fretted)
+            for fret, bit in choices[string]:
+                if not sounding and bit != bass_bit:
+                    continue
+                if fret:
+                    new_low = fret if fret < low or not high else low
+                    new_high = fret if fret > high else high
+                    if new_high - new_low >= max_span or fretted | 1 << fret != fretted and fretted.bit_count() >= max_fingers:
+                        continue
+                    frets[string] = fret
+                    visit(string + 1, new_low, new_high, covered | bit, sounding + 1, gaps, fretted | 1 << fret)
+                else:
+                    frets[string] = 0
+                    visit(string + 1, low, high, covered | bit, sounding + 1, gaps, fretted)
+            frets[string] = -1
+
+        visit(0, 0, 0, 0, 0, 0, 0)
+        results = []
+        for negative_score, _, voicing, fingers, missing in sorted(best, reverse=True):
+            fretted = [fret for fret in voicing if fret > 0]
+            low, high = (min(fretted), max(fretted)) if fretted else (0, 0)
+            results.append(Voicing(voicing, self.generator._base_fret(voicing), fingers, high - low + 1 if fretted else 0, missing, -negative_score))
+        return results
+
+    @staticmethod
+    def _fingers(frets: Sequence[int], low: int) -> int:
+        # One finger per fretted note, except that the index finger can barre every note at the lowest fret when
+        # no string between them is open or muted
+        fretted = sum(1 for fret in frets if fret > 0)
+        barred = [string for string, fret in enumerate(frets) if fret == low and fret > 0]
+        if len(barred) > 1 and all(fret >= low for fret in frets[barred[0]:barred[-1] + 1]):
+            return fretted - len(barred) + 1
+        return fretted
+
+def output_filenames(index: int, chord: str, color_scheme: str) -> Tuple[str, str]:
+    # Relative paths for the guitar diagram and notation of the index-th chord (0-based) in a run
+    stem = f"{index + 1:03d}_{chord.replace('/', '_')}_{color_scheme}"
+    return f"guitar_chord_diagrams/chord_{stem}.svg", f"musical_notation/notation_{stem}.svg"
+
+def compressed_paths(path: str, compression: Optional[str]) -> List[str]:
+    # Every file written for one SVG path, the one results point at first
+    if compression is None:
+        return [path]
+    if compression == 'svgz':
+        return [path + 'z']
+    return [path, path + ('.gz' if compression == 'gzip' else '.br')]
+
+def _check_compression(compression: str, level: Optional[int]) -> int:
+    # Returns the level to use; fails before any rendering, including when brotli isn't installed
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"🚫 Compression '{compression}' not recognized. Use one of: {', '.join(COMPRESSIONS)}.")
+    default_level, max_level = COMPRESSION_LEVELS[compression]
+    level = default_level if level is None else level
+    if not 0 <= level <= max_level:
+        raise ValueError(f"🚫 {compression} compression levels run from 0 to {max_level}, got {level}.")
+    _compress(b'', compression, level)
+    return level
+
+def _compress(data: bytes, compression: str, level: int) -> bytes:
+    if compression == 'brotli':
+        try:
+            import brotli
+        except ImportError:
+            raise ImportError("🚫 Brotli output requires the brotli package. Install it with 'pip install brotli'.")
+        return brotli.compress(data, quality=level)
+    # mtime=0 leaves the timestamp out of the header, so the same SVG always compresses to the same bytes
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def _write_output(path: str, svg: str, compression: Optional[str], level: Optional[int]) -> int:
+    if compression is None:
+        return _atomic_write(path, svg)
+    data = svg.encode('utf-8')
+    written = 0
+    for output_path in compressed_paths(path, compression):
+        written += _atomic_write(output_path, svg if output_path == path else _compress(data, compression, level))
+    return written
+
+def gallery_page_filename(page_number: int) -> str:
+    return f"{GALLERY_FILENAME[:-len('.html')]}_page_{page_number:03d}.html"
+
+def _batch_item(item: Union[str, Tuple[str, str]]) -> Tuple[str, str]:
+    return (item, 'default') if isinstance(item, str) else (item[0], item[1])
+
+def _check_batch_sizes(workers: Optional[int], chunksize: int) -> None:
+    if workers is not None and workers < 1:
+        raise ValueError(f"🚫 Workers must be at least 1 (or None for one per CPU), got {workers}.")
+    if chunksize < 1:
+        raise ValueError(f"🚫 Chunk size must be at least 1, got {chunksize}.")
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for value in iterable:
+        chunk.append(value)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _render_batch_chunk(generator: ChordChartGenerator, chunk: List[Tuple[int, str, str]], show_notation: bool, output_dir: Optional[str],
+                        compression: Optional[str] = None, compression_level: Optional[int] = None) -> List[BatchResult]:
+    results = []
+    for index, chord, color_scheme in chunk:
+        try:
+            guitar_svg, notation_svg = generator.generate_svg(chord, color_scheme=color_scheme, show_notation=show_notation)
+        except Exception as e:
+            results.append(BatchResult(index, chord, color_scheme, error=f"{type(e).__name__}: {e}"))
+            continue
+        if output_dir is None:
+            results.append(BatchResult(index, chord, color_scheme, guitar_svg, notation_svg))
+            continue
+        guitar_path, notation_path = (os.path.join(output_dir, name) for name in output_filenames(index, chord, color_scheme))
+        with generator._stage('write', chord) as stage:
+            os.makedirs(os.path.dirname(guitar_path), exist_ok=True)
+            stage.add_bytes(_write_output(guitar_path, guitar_svg, compression, compression_level))
+            if notation_svg is None:
+                notation_path = None
+            else:
+                os.makedirs(os.path.dirname(notation_path), exist_ok=True)
+                stage.add_bytes(_write_output(notation_path, notation_svg, compression, compression_level))
+        if compression is not None:
+            guitar_path = compressed_paths(guitar_path, compression)[0]
+            notation_path = notation_path and compressed_paths(notation_path, compression)[0]
+        results.append(BatchResult(index, chord, color_scheme, guitar_path=guitar_path, notation_path=notation_path))
+    return results
+
+_worker_generator: Optional[ChordChartGenerator] = None
+
+def _init_batch_worker(options: Dict[str, Any]):
+    global _worker_generator
+    _worker_generator = ChordChartGenerator(**options)
+
+def _process_batch_chunk(chunk: List[Tuple[int, str, str]], show_notation: bool, output_dir: Optional[str],
+                         compression: Optional[str] = None, compression_level: Optional[int] = None) -> List[BatchResult]:
+    return _render_batch_chunk(_worker_generator, chunk, show_notation, output_dir, compression, compression_level)
+
+def raster_filename(index: int, chord: str, color_scheme: str, scale: float, output_format: str, notation: bool = False) -> str:
+    # The SVG's relative path with a density suffix, e.g. guitar_chord_diagrams/chord_001_C_default@2x.png
+    svg_path = output_filenames(index, chord, color_scheme)[1 if notation else 0]
+    return f"{svg_path[:-len('.svg')]}@{scale:g}x.{output_format}"
+
+def _rasterize(svg: bytes, scale: float, output_format: str, quality: int) -> bytes:
+    # Module-level so process pool workers can run it; the imports stay lazy because both libraries are optional
+    try:
+        import cairosvg
+    except (ImportError, OSError):  # cairocffi raises OSError when the Cairo shared library itself is missing
+        raise ImportError("🚫 Raster output requires cairosvg and the Cairo library. Install it with 'pip install cairosvg'.")
+    png = cairosvg.svg2png(bytestring=svg, scale=scale)
+    if output_format == 'png':
+        return png
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("🚫 WebP output requires Pillow. Install it with 'pip install pillow'.")
+    buffer = BytesIO()
+    Image.open(BytesIO(png)).save(buffer, format='WEBP', quality=quality)
+    return buffer.getvalue()
+
+def read_chord_list(path: str, default_scheme: str = 'default') -> Iterator[Tuple[str, str]]:
+    # One chord per line, optionally followed by a color scheme; blank lines and lines starting with '#' are skipped
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            yield fields[0], fields[1] if len(fields) > 1 else default_scheme
+
+CHORDPRO_CHORD_PATTERN = re.compile(r'\[([^\]\s]+)\]')
+CHORDPRO_DIRECTIVE_PATTERN = re.compile(r'^\s*\{.*\}\s*$')
+
+class SongbookStats:
+    def __init__(self):
+        self.lines = 0
+        self.chord_tokens = 0
+        self.unique_chords = 0
+        self.rendered = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    def summary(self) -> str:
+        rate = self.unique_chords / self.seconds if self.seconds else 0.0
+        duplicates = self.chord_tokens - self.unique_chords
+        return (f"Read {self.lines:,} lines with {self.chord_tokens:,} chord symbols; {self.unique_chords:,} unique "
+                f"({duplicates:,} duplicates skipped). Rendered {self.rendered:,}, failed {self.failed:,} "
+                f"in {self.seconds:.2f}s ({rate:,.0f} chords/s).")
+
+def iter_song_chords(lines: Iterable[str], parser: ChordSymbolParser, stats: Optional[SongbookStats] = None) -> Iterator[str]:
+    # ChordPro ([Am]lyrics) and plain chords-over-lyrics text. A token is a chord only if parser splits it, so section
+    # labels ([Verse], [N.C.]) are skipped, and a plain line only counts as chords if every token is one ('A Bad Day' isn't).
+    def is_chord(token: str) -> bool:
+        try:
+            parser.split(token)
+        except ValueError:
+            return False
+        return True
+
+    for line in lines:
+        if stats is not None:
+            stats.lines += 1
+        if CHORDPRO_DIRECTIVE_PATTERN.match(line):
+            continue
+        chords = CHORDPRO_CHORD_PATTERN.findall(line)
+        if chords:
+            chords = [chord for chord in chords if is_chord(chord)]
+        else:
+            tokens = line.split()
+            if tokens and all(is_chord(token) for token in tokens):
+                chords = tokens
+        for chord in chords:
+            if stats is not None:
+                stats.chord_tokens += 1
+            yield chord
+
+def iter_unique(values: Iterable[str], stats: Optional[SongbookStats] = None) -> Iterator[str]:
+    # Order of first appearance; only the set of distinct chords is kept in memory
+    seen = set()
+    for value in values:
+        if value not in seen:
+            seen.add(value)
+            if stats is not None:
+                stats.unique_chords += 1
+            yield value
+
+def iter_songbook_lines(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            yield from f
+
+def render_songbook(generator: ChordChartGenerator, paths: Iterable[str], output: str, color_scheme: str = 'default', show_notation: bool = False,
+                    workers: Optional[int] = None, executor: str = 'serial') -> SongbookStats:
+    # Streams songbook lines -> chord symbols -> unique chords -> rendered SVGs -> a directory, or a ZIP when output ends in .zip
+    stats = SongbookStats()
+    start = time.perf_counter()
+    chords = iter_unique(iter_song_chords(iter_songbook_lines(paths), generator.parser, stats), stats)
+    items = ((chord, color_scheme) for chord in chords)
+
+    if output.lower().endswith('.zip'):
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            if generator.font_mode == 'external':
+                for font_name, font_file in FONT_FILES.items():
+                    archive.writestr(font_file, _read_font(generator._font_path(font_name)))
+            for result in generator.generate_batch(items, workers=workers, executor=executor, show_notation=show_notation):
+                if result.error:
+                    stats.failed += 1
+                    print(f"❌ {result.chord}: {result.error}", file=sys.stderr)
+                    continue
+                stats.rendered += 1
+                guitar_path, notation_path = output_filenames(result.index, result.chord, result.color_scheme)
+                archive.writestr(guitar_path, result.guitar_svg)
+                if result.notation_svg is not None:
+                    archive.writestr(notation_path, result.notation_svg)
+    else:
+        if generator.font_mode == 'external':
+            generator.write_external_fonts(output)
+        for result in generator.generate_batch(items, workers=workers, executor=executor, show_notation=show_notation, output_dir=output):
+            if result.error:
+                stats.failed += 1
+                print(f"❌ {result.chord}: {result.error}", file=sys.stderr)
+            else:
+                stats.rendered += 1
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+class PackStats:
+    def __init__(self):
+        self.entries = 0
+        self.failed = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def summary(self) -> str:
+        return (f"Packed {self.entries:,} SVGs ({self.bytes / 1e6:.1f} MB), failed {self.failed:,}, "
+                f"in {self.seconds:.2f}s ({self.entries / self.seconds if self.seconds else 0.0:,.0f} SVGs/s).")
+
+def pack_chords(generator: ChordChartGenerator) -> List[str]:
+    # Every root spelling parse_chord accepts with every quality in the shape table, under its canonical name.
+    # Names the parser can't read back as that quality (6/9 parses as a slash chord) could never be looked up, so they're left out.
+    chords = []
+    for quality in generator.chord_shapes.qualities():
+        for root in ROOT_ADJUSTMENT:
+            chord = root + QUALITY_SYMBOLS.get(quality, quality)
+            try:
+                _, _, bass, base_quality, alterations = generator.parser.split(chord)
+            except ValueError:
+                continue
+            if not bass and not alterations and generator.chord_shapes.canonical(base_quality) == quality:
+                chords.append(chord)
+    return chords
+
+def pack_settings(generator: ChordChartGenerator) -> Dict[str, Any]:
+    # What a pack's SVGs depend on besides the chord and scheme; a server only serves a pack built with its own settings
+    return {'generator_version': __version__, 'font_mode': generator.font_mode, 'font_url': generator.font_url,
+            'serializer': generator.serializer, 'color_mode': generator.color_mode}
+
+def _pack_key(chord: str, color_scheme: str, notation: bool) -> bytes:
+    return f"{chord}|{color_scheme}|{'notation' if notation else 'guitar'}".encode('utf-8')
+
+def _pack_hash(key: bytes) -> int:
+    # Stable across processes, unlike hash(); the low bit is forced on so 0 can mark empty slots
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little') | 1
+
+def build_pack(generator: ChordChartGenerator, path: str, color_schemes: Optional[Iterable[str]] = None, notation: bool = True,
+               workers: Optional[int] = None, executor: str = 'auto') -> PackStats:
+    # Renders every chord from pack_chords in every scheme into one file: the SVG bodies, each preceded by its key,
+    # then an open-addressed hash index of fixed-size slots, then JSON metadata. Bodies are written in input order
+    # whatever order the workers finish in, so the same inputs always give the same file.
+    if generator.font_mode == 'embed':
+        # Both fonts in each of the ~3,500 SVGs would make a pack of over 1.5 GB
+        raise ValueError("🚫 Packs can't embed fonts. Build them with font_mode='external' (and serializer='compact'), as the pack command does.")
+    stats = PackStats()
+    start = time.perf_counter()
+    color_schemes = list(color_schemes or generator.color_schemes)
+    items = [(chord, color_scheme) for color_scheme in color_schemes for chord in pack_chords(generator)]
+    entries: List[Tuple[int, int, int, int]] = []
+    with _atomic_open(path, 'wb') as f:
+        f.write(bytes(PACK_HEADER.size))
+        finished: Dict[int, BatchResult] = {}
+        next_index = 0
+        for result in generator.generate_batch(items, workers=workers, executor=executor, show_notation=notation):
+            finished[result.index] = result
+            while next_index in finished:
+                result = finished.pop(next_index)
+                next_index += 1
+                if result.error:
+                    stats.failed += 1
+                    print(f"❌ {result.chord} ({result.color_scheme}): {result.error}", file=sys.stderr)
+                    continue
+                for svg, is_notation in ((result.guitar_svg, False), (result.notation_svg, True)):
+                    if svg is None:
+                        continue
+                    key, body = _pack_key(result.chord, result.color_scheme, is_notation), svg.encode('utf-8')
+                    f.write(key)
+                    entries.append((_pack_hash(key), f.tell(), len(body), len(key)))
+                    f.write(body)
+                    stats.bytes += len(body)
+
+        # At most half the slots are used, so a probe for a missing key ends at an empty slot within a few reads
+        slot_count = 1 << max(3, (2 * len(entries) - 1).bit_length())
+        slots: List[Optional[Tuple[int, int, int, int]]] = [None] * slot_count
+        for entry in entries:
+            slot = entry[0] & (slot_count - 1)
+            while slots[slot] is not None:
+                slot = (slot + 1) & (slot_count - 1)
+            slots[slot] = entry
+        index_offset = f.tell()
+        f.write(b''.join(PACK_SLOT.pack(*(entry or (0, 0, 0, 0))) for entry in slots))
+        metadata = json.dumps({
+            'settings': pack_settings(generator), 'color_schemes': {name: dict(generator.color_schemes[name]) for name in color_schemes},
+            'notation': notation, 'shapes': generator.chord_shapes.to_dict(),
+        }, sort_keys=True).encode('utf-8')
+        metadata_offset = f.tell()
+        f.write(metadata)
+        f.seek(0)
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, slot_count, len(entries), index_offset, metadata_offset, len(metadata)))
+    stats.entries = len(entries)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+class PackReader:
+    # Memory-maps a file written by build_pack and hands out SVGs as memoryview slices of the mapping, so nothing is
+    # read or copied until the bytes are sent. Chord names are split with the pack's own shape table, so aliases,
+    # 'Cmaj' for 'C' or 'Cmin7' for 'Cm7', find the canonical entry. Release any views before close().
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, self._slot_count, self.count, self._index_offset, metadata_offset, metadata_length = PACK_HEADER.unpack_from(self._mmap)
+            if magic != PACK_MAGIC or version != PACK_VERSION:
+                raise ValueError(f"🚫 '{path}' is not a version {PACK_VERSION} chord pack.")
+            self.metadata = json.loads(self._mmap[metadata_offset:metadata_offset + metadata_length])
+        except (struct.error, ValueError):
+            self._mmap.close()
+            raise
+        self.settings: Dict[str, Any] = self.metadata['settings']
+        self.color_schemes: Dict[str, Dict[str, str]] = self.metadata['color_schemes']
+        shapes = self.metadata['shapes']
+        self.chord_shapes = ChordShapeStore(shapes['shapes'], shapes['aliases'], shapes['intervals'])
+        self.parser = ChordSymbolParser(self.chord_shapes)
+        self._view = memoryview(self._mmap)
+
+    def key(self, chord_notation: str, color_scheme: str = 'default', notation: bool = False) -> Optional[bytes]:
+        # None for symbols the pack can't hold: invalid ones, alterations beyond the shape table, and slash chords'
+        # guitar diagrams. The staff only draws the root's chord, so a slash chord's notation is its root chord's.
+        try:
+            root, _, bass, base_quality, alterations = self.parser.split(chord_notation)
+        except ValueError:
+            return None
+        if alterations or (bass and not notation):
+            return None
+        quality = self.chord_shapes.canonical(base_quality)
+        return _pack_key(root + QUALITY_SYMBOLS.get(quality, quality), color_scheme, notation)
+
+    def get(self, chord_notation: str, color_scheme: str = 'default', notation: bool = False) -> Optional[memoryview]:
+        key = self.key(chord_notation, color_scheme, notation)
+        return None if key is None else self.lookup(key)
+
+    def lookup(self, key: bytes) -> Optional[memoryview]:
+        key_hash = _pack_hash(key)
+        mask = self._slot_count - 1
+        slot = key_hash & mask
+        while True:
+            slot_hash, offset, length, key_length = PACK_SLOT.unpack_from(self._mmap, self._index_offset + slot * PACK_SLOT.size)
+            if slot_hash == 0:
+                return None
+            if slot_hash == key_hash and self._mmap[offset - key_length:offset] == key:
+                return self._view[offset:offset + length]
+            slot = (slot + 1) & mask
+
+    def keys(self) -> Iterator[Tuple[str, str, bool]]:
+        for slot in range(self._slot_count):
+            slot_hash, offset, _, key_length = PACK_SLOT.unpack_from(self._mmap, self._index_offset + slot * PACK_SLOT.size)
+            if slot_hash:
+                chord, color_scheme, kind = self._mmap[offset - key_length:offset].decode('utf-8').rsplit('|', 2)
+                yield chord, color_scheme, kind == 'notation'
+
+    def matches(self, generator: ChordChartGenerator) -> bool:
+        # True when the generator would render these exact bytes: same settings, scheme colors and shape table
+        return (self.settings == pack_settings(generator)
+                and all(generator.color_schemes.get(name) == colors for name, colors in self.color_schemes.items())
+                and self.metadata['shapes'] == json.loads(json.dumps(generator.chord_shapes.to_dict())))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'PackReader':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# The chord examples, grouped into sections for the HTML gallery
+chord_example_sections = [
+    ("Basic major and minor chords", [("C", "default"), ("Am", "default"), ("F#", "default"), ("Ebm", "default")]),
+
+    ("Seventh chords", [("G7", "default"), ("Bm7", "default"), ("Dmaj7", "default"), ("F#m7", "default")]),
+
+    ("Extended chords", [("A9", "default"), ("Cm11", "default"), ("Gmaj13", "default"), ("E7#9", "default")]),
+
+    ("Sus and add chords", [("Dsus4", "default"), ("Fsus2", "default"), ("Cadd9", "default"), ("G6", "default")]),
+
+    ("Altered chords", [("Ab7b5", "default"), ("B7#5", "default"), ("F#7b9", "default"), ("C7#9", "default")]),
+
+    ("Diminished and augmented chords", [("Ddim", "default"), ("F#dim7", "default"), ("Gaug", "default"), ("Baug7", "default")]),
+
+    ("Complex jazz chords", [("Cmaj9#11", "default"), ("Dm11b5", "default"), ("G13b9", "default"), ("Ebm9#5", "default")]),
+
+    ("Slash chords", [("C/E", "default"), ("Am/F#", "default"), ("G/B", "default"), ("F#m7/C#", "default")]),
+
+    ("Exotic and rare chords", [("C7#9#5", "default"), ("Abmaj7#5", "default"), ("E7alt", "default"), ("Bbm6/9", "default")]),
+
+    ("Chords with multiple alterations", [("D7b9b13", "default"), ("Gmaj13#11", "default"), ("F#7#9b13", "default"), ("Am11b5", "default")]),
+
+    ("Power chords", [("C5", "default"), ("G5", "default"), ("F#5", "default"), ("Bb5", "default")]),
 ]
 
+# List of all chord examples
+chord_examples = [item for _, items in chord_example_sections for item in items]
+
 use_musical_notation = 0
 use_generate_html_gallery = 0
+use_verbose_parsing = 1
+use_sprite_gallery = 0
 
-if __name__ == "__main__":
+def generate_examples(profile: Optional[str] = None, profile_json: Optional[str] = None, force: bool = False):
     # Ensure the output directories exist
     os.makedirs("guitar_chord_diagrams", exist_ok=True)
     if use_musical_notation:
         os.makedirs("musical_notation", exist_ok=True)
 
     # Create an instance of the ChordChartGenerator
-    generator = ChordChartGenerator()
+    generator = ChordChartGenerator(verbosity='print' if use_verbose_parsing else 'quiet')
 
-    # Generate chord diagrams and musical notation
-    for i, (chord, color_scheme) in enumerate(chord_examples):
-        # Generate guitar chord diagram and musical notation
-        guitar_svg, notation_svg = generator.generate_svg(chord, color_scheme=color_scheme, show_notation=True)
-        
-        # Save guitar chord diagram
-        with open(f"guitar_chord_diagrams/chord_{i+1:03d}_{chord.replace('/', '_')}_{color_scheme}.svg", "w") as f:
-            f.write(guitar_svg)
-        
-        if use_musical_notation:
-            # Save musical notation if available
-            if notation_svg:
-                with open(f"musical_notation/notation_{i+1:03d}_{chord.replace('/', '_')}_{color_scheme}.svg", "w") as f:
-                    f.write(notation_svg)
-        time.sleep(0.2)
-    print("All SVG files have been generated.")
-
-    if use_generate_html_gallery:
-        # Generate the HTML gallery
-        html_content = """
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Chord Chart Gallery</title>
-            <style>
-                body { font-family: Arial, sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }
-                h1, h2 { text-align: center; }
-                .gallery { display: flex; flex-wrap: wrap; justify-content: center; gap: 20px; }
-                .chord-set { text-align: center; margin-bottom: 20px; }
-                img { max-width: 300px; height: auto; border: 1px solid #ddd; border-radius: 4px; }
-            </style>
-        </head>
-        <body>
-            <h1>Chord Chart Gallery</h1>
-        """
+    # Files whose inputs haven't changed since the last run are neither rendered nor rewritten
+    manifest = OutputManifest('.', force=force)
+    fingerprint = generator.fingerprint()
 
+    # profile is 'stages' for timings only, or a PROFILE_CAPTURES mode to also capture the whole run
+    profiling = generator.profile(None if profile == 'stages' else profile) if profile else contextlib.nullcontext()
+    with profiling as profiler:
+        # Generate chord diagrams and musical notation
         for i, (chord, color_scheme) in enumerate(chord_examples):
-            html_content += f"""
-                <h2>{chord} ({color_scheme})</h2>
-                <div class="gallery">
-                    <div class="chord-set">
-                        <h3>Guitar Chord Diagram</h3>
-                        <img src="guitar_chord_diagrams/chord_{i+1:03d}_{chord.replace('/', '_')}_{color_scheme}.svg" alt="{chord} guitar chord">
-                    </div>
-                    <div class="chord-set">
-                        <h3>Musical Notation</h3>
-                        <img src="musical_notation/notation_{i+1:03d}_{chord.replace('/', '_')}_{color_scheme}.svg" alt="{chord} musical notation">
-                    </div>
-                </div>
-                """
-
-        html_content += """
-        </body>
-        </html>
-        """
-
-        with open("chord_chart_gallery.html", "w") as f:
-            f.write(html_content)
-
-        print("HTML gallery file has been generated.")
\ No newline at end of file
+            outputs = [(path, digest) for path, digest in generator.output_digests(fingerprint, i, chord, color_scheme, bool(use_musical_notation))
+                       if not manifest.is_current(path, digest)]
+            if not outputs:
+                continue
+
+            # Generate guitar chord diagram and musical notation
+            guitar_svg, notation_svg = generator.generate_svg(chord, color_scheme=color_scheme, show_notation=bool(use_musical_notation))
+
+            # Save the guitar chord diagram and, if enabled, the musical notation
+            with generator._stage('write', chord) as stage:
+                for path, digest in outputs:
+                    stage.add_bytes(manifest.write(path, digest, notation_svg if path.startswith('musical_notation/') else guitar_svg))
+    print("All SVG files are up to date.")
+    if profiler is not None:
+        print(profiler.summary())
+        if profile_json:
+            profiler.write_json(profile_json)
+
+    # The index and every page, so a gallery with a page missing is rewritten
+    gallery_pages = [GALLERY_FILENAME] + [gallery_page_filename(page) for page in range(1, -(-len(chord_examples) // GALLERY_PAGE_SIZE) + 1)]
+    gallery_digest = OutputManifest.digest(__version__, chord_example_sections, GALLERY_PAGE_SIZE, bool(use_musical_notation), 'gallery')
+    if use_generate_html_gallery and not all([manifest.is_current(path, gallery_digest) for path in gallery_pages]):
+        # Notation images are only linked when the notation SVGs are generated
+        for path in generator.write_gallery('.', chord_example_sections, show_notation=bool(use_musical_notation)):
+            manifest.record(path, gallery_digest)
+
+        print("HTML gallery file has been generated.")
+
+    sprite_digest = OutputManifest.digest(fingerprint, chord_examples, generator.color_schemes, bool(use_musical_notation), 'sprite_gallery')
+    if use_sprite_gallery and not manifest.is_current("chord_chart_sprite_gallery.html", sprite_digest):
+        # Single self-contained page: fonts, gradients and fretboards are shared through one inline <symbol> sprite
+        manifest.write("chord_chart_sprite_gallery.html", sprite_digest, generator.generate_sprite_gallery(chord_examples, show_notation=bool(use_musical_notation)))
+
+        print("Sprite gallery file has been generated.")
+
+    manifest.finish()
+    print(manifest.summary())
+
+def run_batch(args: argparse.Namespace):
+    # Diagrams land one directory below output_dir, next to which write_external_fonts puts the fonts
+    font_url = '../' if args.font_url is None else args.font_url
+    generator = ChordChartGenerator(font_mode=args.font_mode, font_url=font_url, serializer=args.serializer, color_mode=args.color_mode)
+    if args.font_mode == 'external':
+        generator.write_external_fonts(args.output_dir)
+    items = read_chord_list(args.chord_file, args.color_scheme)
+    start = time.perf_counter()
+    rendered = skipped = 0
+    failed: List[int] = []
+    manifest = OutputManifest(args.output_dir, force=args.force)
+    if args.color_mode == 'themable':
+        # Every scheme as a stylesheet for the themable diagrams, tracked like the diagrams themselves
+        stylesheet = generator.theme_stylesheet()
+        digest = OutputManifest.digest(stylesheet)
+        if not manifest.is_current(THEME_STYLESHEET, digest):
+            manifest.write(THEME_STYLESHEET, digest, stylesheet)
+    profiling = generator.profile(None if args.profile == 'stages' else args.profile) if args.profile else contextlib.nullcontext()
+    with profiling as profiler:
+        for result in generator.generate_batch(items, workers=args.workers, executor=args.executor, show_notation=args.notation, output_dir=args.output_dir,
+                                               chunksize=args.chunksize, manifest=manifest, compression=args.compression, compression_level=args.compression_level):
+            if result.error:
+                failed.append(result.index)
+                print(f"❌ {result.chord} ({result.color_scheme}): {result.error}", file=sys.stderr)
+            elif result.skipped:
+                skipped += 1
+            else:
+                rendered += 1
+    if args.gallery:
+        # The pages link files by name and leave out failed chords, so the chord list and the failures are their inputs.
+        # The index and every page are checked, so a gallery with a page missing is rewritten.
+        chord_file_digest = hashlib.sha256()
+        with open(args.chord_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                chord_file_digest.update(block)
+        digest = OutputManifest.digest(__version__, chord_file_digest.hexdigest(), args.color_scheme, sorted(failed), args.gallery_page_size,
+                                       args.notation, args.compression, 'gallery')
+        shown = rendered + skipped
+        gallery_pages = [GALLERY_FILENAME] + [gallery_page_filename(page) for page in range(1, -(-shown // max(args.gallery_page_size, 1)) + 1)]
+        if not all([manifest.is_current(path, digest) for path in gallery_pages]):
+            # Reads the chord file again instead of keeping the items, so the gallery streams like the batch did
+            for path in generator.write_gallery(args.output_dir, [(None, read_chord_list(args.chord_file, args.color_scheme))], page_size=args.gallery_page_size,
+                                                show_notation=args.notation, compression=args.compression, exclude=failed):
+                manifest.record(path, digest)
+    manifest.finish()
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {rendered} chords, skipped {skipped} unchanged ({len(failed)} failed) into '{args.output_dir}' in {elapsed:.2f}s ({(rendered + skipped + len(failed)) / elapsed:,.0f} chords/s).")
+    print(manifest.summary())
+    if profiler is not None:
+        print(profiler.summary())
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
+    return 1 if failed else 0
+
+def run_songbook(args: argparse.Namespace):
+    font_url = '../' if args.font_url is None else args.font_url
+    generator = ChordChartGenerator(font_mode=args.font_mode, font_url=font_url, serializer=args.serializer)
+    stats = render_songbook(generator, args.songbook, args.output, color_scheme=args.color_scheme, show_notation=args.notation, workers=args.workers, executor=args.executor)
+    print(stats.summary())
+    return 1 if stats.failed else 0
+
+def run_raster(args: argparse.Namespace):
+    generator = ChordChartGenerator(raster_cache_dir=args.cache_dir)
+    items = read_chord_list(args.chord_file, args.color_scheme) if args.chord_file else chord_examples
+    # Scale 1 renders at 96 DPI, so --dpi 96,192,288 is the same as --scales 1,2,3
+    scales = [dpi / 96 for dpi in args.dpi] if args.dpi else args.scales
+    start = time.perf_counter()
+    rendered = cached = failed = 0
+    for result in generator.generate_raster_batch(items, scales=scales, output_format=args.format, workers=args.workers, executor=args.executor,
+                                                  output_dir=args.output_dir, notation=args.notation, quality=args.quality):
+        if result.error:
+            failed += 1
+            print(f"❌ {result.chord} ({result.color_scheme}) @{result.scale:g}x: {result.error}", file=sys.stderr)
+        elif result.cached:
+            cached += 1
+        else:
+            rendered += 1
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {rendered + cached} {args.format.upper()} images ({cached} from cache, {failed} failed) into '{args.output_dir}' in {elapsed:.2f}s.")
+    return 1 if failed else 0
+
+def run_voicings(args: argparse.Namespace):
+    generator = ChordChartGenerator()
+    search = VoicingSearch(generator, max_fret=args.max_fret, max_span=args.max_span, cache_path=args.cache)
+    if args.catalog:
+        start = time.perf_counter()
+        catalog = search.catalog(limit=args.limit)
+        print(f"Found voicings for {sum(1 for voicings in catalog.values() if voicings)} of {len(catalog)} chords in {time.perf_counter() - start:.2f}s.")
+    for chord in args.chords:
+        print(f"🎸 {chord}")
+        for rank, voicing in enumerate(search.search(chord, args.limit), 1):
+            frets = ' '.join('x' if fret < 0 else str(fret) for fret in voicing.frets)
+            print(f"   {rank}. {frets:<18} fingers {voicing.fingers}  span {voicing.span}  missing {voicing.missing}  score {voicing.score:g}")
+            if args.output_dir:
+                guitar_svg, _ = generator.generate_svg(chord, args.color_scheme, show_notation=False, voicing=voicing)
+                os.makedirs(args.output_dir, exist_ok=True)
+                _atomic_write(os.path.join(args.output_dir, f"voicing_{chord.replace('/', '_')}_{rank}_{args.color_scheme}.svg"), guitar_svg)
+    search.save()
+    return 0
+
+def run_pack(args: argparse.Namespace):
+    generator = ChordChartGenerator(font_mode=args.font_mode, font_url=args.font_url, serializer=args.serializer, color_mode=args.color_mode)
+    stats = build_pack(generator, args.output, color_schemes=args.color_scheme, notation=not args.no_notation, workers=args.workers, executor=args.executor)
+    print(stats.summary())
+    return 1 if stats.failed else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate SVG guitar chord diagrams. With no command, renders the built-in chord_examples.")
+    commands = parser.add_subparsers(dest='command')
+
+    batch = commands.add_parser('batch', help="Render every chord listed in a file (one chord per line, optionally followed by a color scheme)")
+    batch.add_argument('chord_file')
+    batch.add_argument('-o', '--output-dir', required=True)
+    batch.add_argument('-j', '--workers', type=int, default=None, help="Worker count (default: number of CPUs)")
+    batch.add_argument('--executor', choices=EXECUTORS, default='auto')
+    batch.add_argument('--chunksize', type=int, default=16)
+    batch.add_argument('--color-scheme', default='default', help="Scheme for lines that don't name one")
+    batch.add_argument('--notation', action='store_true', help="Also write musical notation SVGs")
+    batch.add_argument('--font-mode', choices=FONT_MODES, default='embed')
+    batch.add_argument('--font-url', default=None, help="URL prefix for font files with --font-mode external (default: '../', where the fonts are copied)")
+    batch.add_argument('--serializer', choices=SERIALIZERS, default='pretty')
+    batch.add_argument('--color-mode', choices=COLOR_MODES, default='fixed', help=f"themable writes colors as CSS custom properties, themed by {THEME_STYLESHEET}")
+    batch.add_argument('--compression', choices=COMPRESSIONS, default=None, help="Write .svgz files instead of .svg, or add precompressed .svg.gz or .svg.br siblings")
+    batch.add_argument('--compression-level', type=int, default=None, help="0-9 for svgz and gzip (default 6), 0-11 for brotli (default 11)")
+    batch.add_argument('--gallery', action='store_true', help=f"Also write a paginated HTML gallery, {GALLERY_FILENAME} and its pages")
+    batch.add_argument('--gallery-page-size', type=int, default=GALLERY_PAGE_SIZE, help="Chords per gallery page")
+
+    songbook = commands.add_parser('songbook', help="Render every distinct chord found in ChordPro or chords-over-lyrics song files")
+    songbook.add_argument('songbook', nargs='+')
+    songbook.add_argument('-o', '--output', required=True, help="Output directory, or a .zip file")
+    songbook.add_argument('-j', '--workers', type=int, default=None)
+    songbook.add_argument('--executor', choices=EXECUTORS, default='serial')
+    songbook.add_argument('--color-scheme', default='default')
+    songbook.add_argument('--notation', action='store_true', help="Also write musical notation SVGs")
+    songbook.add_argument('--font-mode', choices=FONT_MODES, default='embed')
+    songbook.add_argument('--font-url', default=None, help="URL prefix for font files with --font-mode external (default: '../')")
+    songbook.add_argument('--serializer', choices=SERIALIZERS, default='pretty')
+
+    raster = commands.add_parser('raster', help="Render PNG or WebP images at several scales (default: every chord in chord_examples)")
+    raster.add_argument('chord_file', nargs='?', default=None)
+    raster.add_argument('-o', '--output-dir', required=True)
+    raster.add_argument('--format', choices=RASTER_FORMATS, default='png')
+    raster.add_argument('--scales', type=lambda value: [float(scale) for scale in value.split(',')], default=[1.0, 2.0, 3.0], help="Comma-separated scale factors (default: 1,2,3)")
+    raster.add_argument('--dpi', type=lambda value: [float(dpi) for dpi in value.split(',')], default=None, help="Comma-separated DPIs, instead of --scales")
+    raster.add_argument('--quality', type=int, default=90, help="WebP quality")
+    raster.add_argument('-j', '--workers', type=int, default=None)
+    raster.add_argument('--executor', choices=EXECUTORS, default='auto')
+    raster.add_argument('--color-scheme', default='default')
+    raster.add_argument('--notation', action='store_true', help="Rasterize the musical notation instead of the guitar diagram")
+    raster.add_argument('--cache-dir', default=None, help="Directory for the content-addressed raster cache, reused across runs")
+
+    voicings = commands.add_parser('voicings', help="List the easiest playable voicings of chords anywhere on the neck")
+    voicings.add_argument('chords', nargs='*')
+    voicings.add_argument('-k', '--limit', type=int, default=5)
+    voicings.add_argument('--max-fret', type=int, default=12)
+    voicings.add_argument('--max-span', type=int, default=4, help="Most frets one hand covers, inclusive")
+    voicings.add_argument('-o', '--output-dir', default=None, help="Also write a guitar diagram SVG for each voicing")
+    voicings.add_argument('--color-scheme', default='default')
+    voicings.add_argument('--cache', default=None, help="JSON file keeping search results across runs")
+    voicings.add_argument('--catalog', action='store_true', help="Search every root and quality first (fills --cache)")
+
+    pack = commands.add_parser('pack', help="Render every root and quality in every color scheme into one memory-mappable pack file")
+    pack.add_argument('-o', '--output', required=True)
+    pack.add_argument('-j', '--workers', type=int, default=None)
+    pack.add_argument('--executor', choices=EXECUTORS, default='auto')
+    pack.add_argument('--color-scheme', action='append', default=None, help="Scheme to include; repeat for several (default: all)")
+    pack.add_argument('--no-notation', action='store_true', help="Leave out the musical notation SVGs")
+    pack.add_argument('--font-mode', choices=[mode for mode in FONT_MODES if mode != 'embed'], default='external')
+    pack.add_argument('--font-url', default='/fonts/', help="URL prefix for font files with --font-mode external (default: the server's /fonts/)")
+    pack.add_argument('--serializer', choices=SERIALIZERS, default='compact')
+    pack.add_argument('--color-mode', choices=COLOR_MODES, default='fixed')
+
+    for command_parser in (parser, batch):
+        command_parser.add_argument('--force', action='store_true', help="Regenerate every file, even those the manifest says are unchanged")
+        command_parser.add_argument('--profile', choices=('stages',) + PROFILE_CAPTURES, default=None,
+                                    help="Print per-stage timings; cprofile or tracemalloc also capture the whole run")
+        command_parser.add_argument('--profile-json', default=None, help="Also write the profile to this JSON file")
+
+    args = parser.parse_args(argv)
+    if args.command == 'batch' and args.profile and resolve_executor(args.executor) == 'process':
+        parser.error("--profile only sees renders in this process; use --executor serial or thread")
+    if args.command == 'raster':
+        return run_raster(args)
+    if args.command == 'batch':
+        return run_batch(args)
+    if args.command == 'songbook':
+        return run_songbook(args)
+    if args.command == 'voicings':
+        return run_voicings(args)
+    if args.command == 'pack':
+        return run_pack(args)
+    generate_examples(args.profile, args.profile_json, args.force)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,452 @@
+import os
+import sys
+import time
+import json
+import asyncio
+import hashlib
+import argparse
+import subprocess
+import concurrent.futures
+from collections import Counter, deque
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote, urlsplit, parse_qs
+
+import py_chord_chart_generator as charts
+from py_chord_chart_generator import ChordChartGenerator, LRUCache, FONT_FILES, FONT_MODES, SERIALIZERS, chord_examples, read_chord_list
+
+SERVER_EXECUTORS = ('auto', 'process', 'thread')
+MAX_HEADER_BYTES = 16384
+MAX_BULK_DIAGRAMS = 1000
+STATUS_TEXT = {
+    200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+}
+
+
+def _percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    # Nearest-rank percentile; values must already be sorted
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def _render_in_worker(chord: str, color_scheme: str, notation: bool) -> bytes:
+    # Runs inside a process pool worker set up by _init_batch_worker
+    guitar_svg, notation_svg = charts._worker_generator.generate_svg(chord, color_scheme, show_notation=notation)
+    return (notation_svg if notation else guitar_svg).encode('utf-8')
+
+
+class ChordChartServer:
+    # Serves GET /chord/{symbol}.svg?scheme=neon&notation=1, the diagram model as /diagram/{symbol}.json and
+    # /diagrams.json?chord=C&chord=Am, and /metrics on a plain asyncio stream server.
+    # Renders run on a worker pool; ETags hash the render inputs, so a revalidation never has to render.
+    # With a pack from build_pack, chords it holds are sent straight from the memory-mapped file and never rendered.
+    def __init__(self, generator: Optional[ChordChartGenerator] = None, workers: Optional[int] = None, executor: str = 'auto',
+                 response_cache_size: int = 1024, max_age: int = 86400, latency_window: int = 10000, pack_path: Optional[str] = None):
+        if executor not in SERVER_EXECUTORS:
+            raise ValueError(f"🚫 Executor '{executor}' not recognized. Use one of: {', '.join(SERVER_EXECUTORS)}.")
+        # External fonts keep each response a few KB; the fonts themselves are served from /fonts/
+        self.generator = generator or ChordChartGenerator(font_mode='external', font_url='/fonts/', serializer='compact')
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = charts.resolve_executor(executor)
+        self.max_age = max_age
+        self.responses = LRUCache(response_cache_size)
+        self.pool: Optional[concurrent.futures.Executor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._in_progress: Dict[str, asyncio.Future] = {}
+        self._etags: Dict[Tuple[str, str, bool], str] = {}
+        # Shapes, sizes, fonts and serializer settings are fixed for the server's lifetime, so they're hashed once
+        self._fingerprint = self.generator.fingerprint()
+        self.started = time.time()
+        self.status_counts: Counter = Counter()
+        self.renders = 0
+        self.in_flight = 0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.latencies: deque = deque(maxlen=latency_window)
+        self.pack: Optional[charts.PackReader] = None
+        self.pack_hits = 0
+        if pack_path:
+            self.pack = charts.PackReader(pack_path)
+            if not self.pack.matches(self.generator):
+                self.pack.close()
+                raise ValueError(f"🚫 Pack '{pack_path}' was built with other settings, colors or shapes than this server renders with.")
+
+    def etag(self, chord: str, color_scheme: str, notation: bool) -> str:
+        key = (chord, color_scheme, notation)
+        tag = self._etags.get(key)
+        if tag is None:
+            colors = sorted(self.generator.color_schemes[color_scheme].items())
+            tag = '"' + charts.OutputManifest.digest(self._fingerprint, chord, color_scheme, colors, notation)[:32] + '"'
+            if len(self._etags) < 65536:
+                self._etags[key] = tag
+        return tag
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8000) -> asyncio.AbstractServer:
+        if self.executor == 'process':
+            self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=charts._init_batch_worker,
+                                                               initargs=(self.generator.options,))
+        else:
+            self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        self.started = time.time()
+        self._server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        return self._server
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        if self.pack is not None:
+            self.pack.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 431, {}, b'', close=True)
+                    break
+                start = time.perf_counter()
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    await self._send(writer, 400, {}, b'Malformed request line\n', close=True)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                # GET requests shouldn't have bodies, but drain one if a client sends it so the connection stays in sync
+                if headers.get('content-length', '0').isdigit() and int(headers.get('content-length', '0')):
+                    await reader.readexactly(int(headers['content-length']))
+                connection = headers.get('connection', '').lower()
+                close = connection == 'close' or (version == 'HTTP/1.0' and connection != 'keep-alive')
+
+                status, response_headers, body = await self.respond(method, target, headers)
+                await self._send(writer, status, response_headers, b'' if method == 'HEAD' else body, close, len(body))
+                self._record(status, time.perf_counter() - start)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], body: bytes, close: bool, content_length: Optional[int] = None):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", f"Content-Length: {len(body) if content_length is None else content_length}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if close:
+            lines.append("Connection: close")
+        # Separate writes, so a memoryview from the pack goes to the transport without being copied into the header
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if body:
+            writer.write(body)
+        await writer.drain()
+
+    def _record(self, status: int, seconds: float):
+        self.status_counts[status] += 1
+        self.latency_sum += seconds
+        self.latency_count += 1
+        self.latencies.append(seconds)
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        if method not in ('GET', 'HEAD'):
+            return 405, {'Allow': 'GET, HEAD'}, b'Only GET and HEAD are supported\n'
+        url = urlsplit(target)
+        if url.path == '/metrics':
+            return 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8', 'Cache-Control': 'no-store'}, self.metrics().encode('utf-8')
+        if url.path.startswith('/chord/') and url.path.endswith('.svg'):
+            # Take everything between the prefix and suffix, so both C%2FG.svg and C/G.svg name the slash chord
+            chord = unquote(url.path[len('/chord/'):-len('.svg')])
+            query = parse_qs(url.query)
+            color_scheme = query.get('scheme', ['default'])[-1]
+            notation = query.get('notation', ['0'])[-1].lower() in ('1', 'true', 'yes')
+            return await self._chord_response(chord, color_scheme, notation, headers)
+        if url.path.startswith('/diagram/') and url.path.endswith('.json'):
+            return self._diagram_response([unquote(url.path[len('/diagram/'):-len('.json')])], False, headers)
+        if url.path == '/diagrams.json':
+            return self._diagram_response(parse_qs(url.query).get('chord', []), True, headers)
+        if url.path.startswith('/fonts/'):
+            return self._font_response(unquote(url.path[len('/fonts/'):]), headers)
+        return 404, {'Content-Type': 'text/plain; charset=utf-8'}, b'Not found\n'
+
+    def _not_modified(self, headers: Dict[str, str], tag: str) -> bool:
+        if_none_match = headers.get('if-none-match')
+        if not if_none_match:
+            return False
+        return if_none_match.strip() == '*' or tag in (candidate.strip() for candidate in if_none_match.split(','))
+
+    async def _chord_response(self, chord: str, color_scheme: str, notation: bool, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        if color_scheme not in self.generator.color_schemes:
+            return 404, {'Content-Type': 'text/plain; charset=utf-8'}, f"Color scheme '{color_scheme}' not recognized\n".encode('utf-8')
+        try:
+            # Memoized, so the render that follows doesn't parse again; a bad symbol never gets a 304 for 'If-None-Match: *'
+            self.generator.parse_chord(chord)
+        except (ValueError, KeyError, AttributeError) as e:
+            return 400, {'Content-Type': 'text/plain; charset=utf-8'}, f"Chord '{chord}' not recognized: {e}\n".encode('utf-8')
+        tag = self.etag(chord, color_scheme, notation)
+        response_headers = {'ETag': tag, 'Cache-Control': f'public, max-age={self.max_age}'}
+        if self._not_modified(headers, tag):
+            return 304, response_headers, b''
+
+        body = self.pack.get(chord, color_scheme, notation) if self.pack is not None else None
+        if body is not None:
+            self.pack_hits += 1
+        else:
+            body = self.responses.get(tag)
+        if body is None:
+            try:
+                body = await self._render(tag, chord, color_scheme, notation)
+            except Exception as e:
+                return 500, {'Content-Type': 'text/plain; charset=utf-8'}, f"Rendering '{chord}' failed: {e}\n".encode('utf-8')
+        response_headers['Content-Type'] = 'image/svg+xml; charset=utf-8'
+        return 200, response_headers, body
+
+    async def _render(self, tag: str, chord: str, color_scheme: str, notation: bool) -> bytes:
+        # Concurrent requests for the same uncached chord share a single render
+        pending = self._in_progress.get(tag)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        loop = asyncio.get_running_loop()
+        if self.executor == 'process':
+            future = loop.run_in_executor(self.pool, _render_in_worker, chord, color_scheme, notation)
+        else:
+            future = loop.run_in_executor(self.pool, self._render_in_thread, chord, color_scheme, notation)
+        self._in_progress[tag] = future
+        self.in_flight += 1
+        try:
+            body = await asyncio.shield(future)
+        finally:
+            self.in_flight -= 1
+            del self._in_progress[tag]
+        self.renders += 1
+        self.responses.put(tag, body)
+        return body
+
+    def _render_in_thread(self, chord: str, color_scheme: str, notation: bool) -> bytes:
+        guitar_svg, notation_svg = self.generator.generate_svg(chord, color_scheme, show_notation=notation)
+        return (notation_svg if notation else guitar_svg).encode('utf-8')
+
+    def _diagram_response(self, chords: List[str], bulk: bool, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        # Diagram JSON takes microseconds to build, so it's computed inline and tagged by its own bytes
+        if bulk and not 0 < len(chords) <= MAX_BULK_DIAGRAMS:
+            return 400, {'Content-Type': 'text/plain; charset=utf-8'}, f"Pass between 1 and {MAX_BULK_DIAGRAMS} chord parameters\n".encode('utf-8')
+        try:
+            body = (self.generator.diagrams_json(chords) if bulk else self.generator.diagram(chords[0]).to_json()).encode('utf-8')
+        except (ValueError, KeyError, AttributeError) as e:
+            return 400, {'Content-Type': 'text/plain; charset=utf-8'}, f"Chord not recognized: {e}\n".encode('utf-8')
+        tag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        response_headers = {'ETag': tag, 'Cache-Control': f'public, max-age={self.max_age}'}
+        if self._not_modified(headers, tag):
+            return 304, response_headers, b''
+        response_headers['Content-Type'] = 'application/json'
+        return 200, response_headers, body
+
+    def _font_response(self, font_file: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        font_name = next((name for name, file in FONT_FILES.items() if file == font_file), None)
+        if font_name is None:
+            return 404, {'Content-Type': 'text/plain; charset=utf-8'}, b'Not found\n'
+        data = charts._read_font(self.generator._font_path(font_name))
+        tag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        response_headers = {'ETag': tag, 'Cache-Control': f'public, max-age={self.max_age}'}
+        if self._not_modified(headers, tag):
+            return 304, response_headers, b''
+        response_headers['Content-Type'] = 'font/ttf'
+        return 200, response_headers, data
+
+    def metrics(self) -> str:
+        # Prometheus text exposition format
+        latencies = sorted(self.latencies)
+        lines = [
+            '# HELP chord_server_requests_total Requests answered, by HTTP status.',
+            '# TYPE chord_server_requests_total counter',
+        ]
+        lines.extend(f'chord_server_requests_total{{status="{status}"}} {count}' for status, count in sorted(self.status_counts.items()))
+        lines += [
+            '# HELP chord_server_request_seconds Request latency from parsed headers to response written.',
+            '# TYPE chord_server_request_seconds summary',
+            f'chord_server_request_seconds{{quantile="0.5"}} {_percentile(latencies, 0.5):.6f}',
+            f'chord_server_request_seconds{{quantile="0.99"}} {_percentile(latencies, 0.99):.6f}',
+            f'chord_server_request_seconds_sum {self.latency_sum:.6f}',
+            f'chord_server_request_seconds_count {self.latency_count}',
+            '# TYPE chord_server_renders_total counter',
+            f'chord_server_renders_total {self.renders}',
+            '# TYPE chord_server_pack_hits_total counter',
+            f'chord_server_pack_hits_total {self.pack_hits}',
+            '# TYPE chord_server_renders_in_flight gauge',
+            f'chord_server_renders_in_flight {self.in_flight}',
+        ]
+        for name, value in self.responses.stats().items():
+            lines.append(f'chord_server_response_cache_{name} {value}')
+        lines += [
+            '# TYPE chord_server_uptime_seconds gauge',
+            f'chord_server_uptime_seconds {time.time() - self.started:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8000, **server_options):
+    server = ChordChartServer(**server_options)
+    await server.start(host, port)
+    bound_host, bound_port = server.address
+    # The load tester reads this line to find the port when it spawns the server with --port 0
+    print(f"Serving chord charts on http://{bound_host}:{bound_port}/ ({server.executor} pool, {server.workers} workers)", flush=True)
+    try:
+        await server._server.serve_forever()
+    finally:
+        await server.close()
+
+
+def chord_paths(items: Sequence[Tuple[str, str]], notation: bool = False) -> List[str]:
+    suffix = '&notation=1' if notation else ''
+    return [f"/chord/{quote(chord, safe='')}.svg?scheme={quote(color_scheme)}{suffix}" for chord, color_scheme in items]
+
+
+async def _fetch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str, etag: Optional[str]) -> Tuple[int, Optional[str], int]:
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+    if etag:
+        request += f"If-None-Match: {etag}\r\n"
+    writer.write((request + "\r\n").encode('latin-1'))
+    await writer.drain()
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    status = int(head[0].split(' ')[1])
+    headers = {}
+    for line in head[1:]:
+        name, _, value = line.partition(':')
+        if name:
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', '0'))
+    if length:
+        await reader.readexactly(length)
+    return status, headers.get('etag'), length
+
+
+async def load_test(host: str, port: int, paths: Sequence[str], requests: int = 2000, concurrency: int = 32, revalidate: bool = False) -> Dict[str, object]:
+    # Each simulated client holds one keep-alive connection and walks the path list round-robin.
+    # With revalidate, clients send If-None-Match for paths they've already fetched, like a browser cache would.
+    next_request = 0
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    received = 0
+
+    async def client():
+        nonlocal next_request, received
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_HEADER_BYTES)
+        etags: Dict[str, str] = {}
+        try:
+            while next_request < requests:
+                path = paths[next_request % len(paths)]
+                next_request += 1
+                start = time.perf_counter()
+                status, etag, length = await _fetch(reader, writer, host, path, etags.get(path) if revalidate else None)
+                latencies.append(time.perf_counter() - start)
+                statuses[status] += 1
+                received += length
+                if etag:
+                    etags[path] = etag
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies), 'seconds': elapsed, 'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': _percentile(latencies, 0.5) * 1000, 'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0, 'statuses': dict(statuses), 'bytes': received,
+    }
+
+
+def _print_load_report(result: Dict[str, object], concurrency: int):
+    statuses = ', '.join(f"{status}: {count}" for status, count in sorted(result['statuses'].items()))
+    print(f"\n⏱  {result['requests']:,} requests with {concurrency} concurrent connections in {result['seconds']:.2f}s")
+    print(f"   - throughput {result['requests_per_second']:>10,.0f} requests/s")
+    print(f"   - p50        {result['p50_ms']:>10.2f} ms")
+    print(f"   - p99        {result['p99_ms']:>10.2f} ms")
+    print(f"   - max        {result['max_ms']:>10.2f} ms")
+    print(f"   - statuses   {statuses}   ({result['bytes'] / 1e6:.2f} MB received)")
+
+
+def run_load_test(args: argparse.Namespace) -> int:
+    items = list(read_chord_list(args.chord_file)) if args.chord_file else chord_examples
+    paths = chord_paths(items, args.notation)
+    process = None
+    host, port = args.host, args.port
+    if port is None:
+        # No target given: start a server in a separate process on a free port, so client and server don't share an event loop
+        command = [sys.executable, os.path.abspath(__file__), 'serve', '--host', host, '--port', '0', '--executor', args.executor]
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        banner = process.stdout.readline()
+        if not banner:
+            print("❌ The server failed to start.", file=sys.stderr)
+            return 1
+        print(banner.strip())
+        port = int(banner.split('://', 1)[1].split('/', 1)[0].rsplit(':', 1)[1])
+    try:
+        result = asyncio.run(load_test(host, port, paths, args.requests, args.concurrency, args.revalidate))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    _print_load_report(result, args.concurrency)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    return 0 if set(result['statuses']) <= {200, 304} else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve chord diagrams over HTTP, or load test a running server.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="Run the HTTP render service")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8000, help="0 picks a free port")
+    serve_parser.add_argument('-j', '--workers', type=int, default=None, help="Render workers (default: number of CPUs)")
+    serve_parser.add_argument('--executor', choices=SERVER_EXECUTORS, default='auto')
+    serve_parser.add_argument('--font-mode', choices=FONT_MODES, default='external')
+    serve_parser.add_argument('--font-url', default='/fonts/', help="URL prefix for font files with --font-mode external")
+    serve_parser.add_argument('--serializer', choices=SERIALIZERS, default='compact')
+    serve_parser.add_argument('--response-cache-size', type=int, default=1024)
+    serve_parser.add_argument('--max-age', type=int, default=86400, help="Cache-Control max-age for chord responses, in seconds")
+    serve_parser.add_argument('--pack', default=None, help="Pack file from 'py_chord_chart_generator.py pack' to serve chords from without rendering")
+
+    load_parser = commands.add_parser('loadtest', help="Measure latency and throughput against a server on localhost")
+    load_parser.add_argument('--host', default='127.0.0.1')
+    load_parser.add_argument('--port', type=int, default=None, help="Server to target (default: start one on a free port)")
+    load_parser.add_argument('-n', '--requests', type=int, default=2000)
+    load_parser.add_argument('-c', '--concurrency', type=int, default=32)
+    load_parser.add_argument('--chord-file', default=None, help="Chords to request, one per line (default: the built-in chord_examples)")
+    load_parser.add_argument('--notation', action='store_true', help="Request musical notation instead of guitar diagrams")
+    load_parser.add_argument('--revalidate', action='store_true', help="Send If-None-Match for paths already fetched")
+    load_parser.add_argument('--executor', choices=SERVER_EXECUTORS, default='auto', help="Executor for the spawned server")
+    load_parser.add_argument('-j', '--workers', type=int, default=None, help="Workers for the spawned server")
+    load_parser.add_argument('--json', action='store_true', help="Also print the results as JSON")
+
+    args = parser.parse_args(argv)
+    if args.command == 'loadtest':
+        return run_load_test(args)
+    generator = ChordChartGenerator(font_mode=args.font_mode, font_url=args.font_url, serializer=args.serializer)
+    try:
+        asyncio.run(serve(args.host, args.port, generator=generator, workers=args.workers, executor=args.executor,
+                          response_cache_size=args.response_cache_size, max_age=args.max_age, pack_path=args.pack))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+
+from py_chord_chart_generator import EXECUTORS, ChordChartGenerator, chord_examples
+
+
+class BatchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.generator = ChordChartGenerator(font_mode='external')
+
+    def test_every_executor_matches_generate_svg(self):
+        items = chord_examples[:10]
+        for executor in EXECUTORS:
+            with self.subTest(executor=executor):
+                results = sorted(self.generator.generate_batch(items, workers=2, executor=executor, chunksize=3),
+                                 key=lambda result: result.index)
+                self.assertEqual([result.index for result in results], list(range(len(items))))
+                for result, (chord, color_scheme) in zip(results, items):
+                    self.assertIsNone(result.error)
+                    self.assertEqual((result.guitar_svg, result.notation_svg), self.generator.generate_svg(chord, color_scheme))
+
+    def test_serial_batch_renders_every_item(self):
+        results = sorted(self.generator.generate_batch(['C', ('Am7', 'default'), 'H7'], executor='serial', workers=1),
+                         key=lambda result: result.index)
+        self.assertEqual([result.chord for result in results], ['C', 'Am7', 'H7'])
+        self.assertEqual([bool(result.error) for result in results], [False, False, True])
+
+    def test_output_dir_gets_the_files(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            results = list(self.generator.generate_batch(['C', 'G7'], executor='thread', show_notation=False, output_dir=output_dir))
+            self.assertEqual(len(results), 2)
+            for result in results:
+                self.assertTrue(result.guitar_path.startswith(output_dir))
+                self.assertIsNone(result.guitar_svg)
+                self.assertIsNone(result.notation_path)
+                with open(result.guitar_path, encoding='utf-8') as svg_file:
+                    self.assertEqual(svg_file.read(), self.generator.generate_svg(result.chord, show_notation=False)[0])
+
+    def test_generate_batch_checks_arguments_eagerly(self):
+        # Bad arguments raise when the batch is requested, not on the first next() of the generator doing the work
+        for options in ({'executor': 'fibers'}, {'workers': 0}, {'workers': -2}, {'chunksize': 0},
+                        {'manifest': object()}, {'compression': 'gzip'}):
+            with self.assertRaises(ValueError, msg=options):
+                self.generator.generate_batch(['C'], **options)
+
+    def test_generate_raster_batch_checks_arguments_eagerly(self):
+        for options in ({'executor': 'fibers'}, {'workers': 0}, {'output_format': 'bmp'}):
+            with self.assertRaises(ValueError, msg=options):
+                self.generator.generate_raster_batch(['C'], **options)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from py_chord_chart_generator import ChordChartGenerator, LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # 'b' is now the oldest
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+        cache.put('a', 4)  # Replacing a key refreshes it too
+        cache.put('d', 5)
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual(cache.get('a'), 4)
+
+    def test_stats(self):
+        cache = LRUCache(1)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', 1)
+        cache.get('a')
+        cache.put('b', 2)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 1, 'size': 1, 'maxsize': 1})
+        cache.clear()
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'maxsize': 1})
+
+    def test_size_zero_disables(self):
+        cache = LRUCache(0)
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a', 'missing'), 'missing')
+        with self.assertRaises(ValueError):
+            LRUCache(-1)
+
+
+class ParseCacheTest(unittest.TestCase):
+    def test_repeat_parses_hit_the_cache(self):
+        generator = ChordChartGenerator()
+        first = generator.parse_chord('Am7')
+        self.assertIs(generator.parse_chord('Am7'), first)
+        self.assertEqual(generator.parse_cache.stats()['hits'], 1)
+        generator.generate_svg('Am7')
+        generator.generate_svg('Am7')
+        self.assertEqual(generator.render_cache.stats()['hits'], 1)
+
+    def test_cached_shapes_cannot_be_mutated(self):
+        # An altered chord once appended its extra tone to the shared base shape, so every later chord on that
+        # shape (and every cached result) changed with it
+        generator = ChordChartGenerator()
+        shape = list(generator.chord_shapes['maj9'])
+        plain = generator.parse_chord('Cmaj9')
+        generator.parse_chord('Cmaj9#11')
+        generator.parse_chord('Dmaj9#11')
+        self.assertEqual(list(generator.chord_shapes['maj9']), shape)
+        self.assertEqual(ChordChartGenerator().parse_chord('Cmaj9'), plain)
+        positions = generator.parse_chord('Cmaj9')[2]
+        self.assertIsInstance(positions, tuple)
+        with self.assertRaises(AttributeError):
+            positions.append(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
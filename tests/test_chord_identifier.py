@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from py_chord_chart_generator import ChordChartGenerator, ChordIdentifier, ChordMatch
+
+
+class ChordIdentifierTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.generator = ChordChartGenerator()
+        cls.identifier = ChordIdentifier(cls.generator)
+
+    def assert_round_trips(self, match):
+        # Every name identify returns must parse back to the chord it reports
+        root, _, bass, base_quality, alterations = self.generator.parser.split(match.name)
+        self.assertEqual((root, self.generator.chord_shapes.canonical(base_quality), bass, alterations),
+                         (match.root, match.quality, match.bass, []), msg=match.name)
+        self.generator.parse_chord(match.name)
+
+    def test_open_chords(self):
+        self.assertEqual(self.identifier.identify('x32010', limit=2),
+                         [ChordMatch('C', 'C', 'major', None, 0, 0, True), ChordMatch('C5', 'C', '5', None, 0, 1, False)])
+        for frets, name in (('022000', 'Em'), ('x02210', 'Am'), ('320003', 'G'), ('xx0232', 'D'), ('x02020', 'A7')):
+            self.assertEqual(self.identifier.identify(frets)[0].name, name, msg=frets)
+
+    def test_slash_basses(self):
+        # A chord tone in the bass is an inversion; any other bass names the chord from the notes above it
+        self.assertEqual(self.identifier.identify([0, 3, 2, 0, 1, 0])[0].name, 'C/E')
+        self.assertEqual(self.identifier.identify('x 10 12 11 10 x')[0].name, 'D/G')
+
+    def test_bass_is_the_lowest_pitch(self):
+        # B2 on the low E string sounds above the open A string's A2
+        for match in self.identifier.identify([7, 0, None, None, None, None]):
+            self.assertEqual(match.bass or match.root, 'A', msg=match.name)
+        self.assertEqual(self.identifier.identify([7, 0, 2, 2, None, None])[0].bass, None)
+
+    def test_names_round_trip(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            frets = [rng.choice([None, None] + list(range(13))) for _ in range(6)]
+            for match in self.identifier.identify(frets, limit=ChordIdentifier.CACHED_RESULTS):
+                self.assert_round_trips(match)
+
+    def test_six_nine_voicings_round_trip(self):
+        # A6/9 and friends were once named in forms parse_chord rejects
+        for frets in ('x02222', '5x4420', 'x1x332', 'x4233x', '354355'):
+            for match in self.identifier.identify(frets, limit=ChordIdentifier.CACHED_RESULTS):
+                self.assert_round_trips(match)
+
+    def test_fret_formats(self):
+        expected = self.identifier.identify('x32010')
+        for frets in ([None, 3, 2, 0, 1, 0], [-1, 3, 2, 0, 1, 0], 'x 3 2 0 1 0', 'X-3-2-0-1-0'):
+            self.assertEqual(self.identifier.identify(frets), expected, msg=frets)
+        self.assertEqual(self.identifier.identify('xxxxxx'), [])
+        self.assertEqual(self.identifier.identify_many(['x32010', '022000']), [expected[:1], self.identifier.identify('022000', limit=1)])
+        with self.assertRaises(ValueError):
+            self.identifier.identify('x3201')
+        with self.assertRaises(ValueError):
+            ChordIdentifier(self.generator, tuning=(7, 0, 5, 10, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
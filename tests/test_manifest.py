@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+import contextlib
+
+import py_chord_chart_generator as charts
+from py_chord_chart_generator import ChordChartGenerator, OutputManifest
+
+
+class OutputManifestTest(unittest.TestCase):
+    def render(self, output_dir: str, items, **options) -> OutputManifest:
+        generator = ChordChartGenerator(font_mode='external', **options)
+        manifest = OutputManifest(output_dir)
+        results = list(generator.generate_batch(items, executor='serial', output_dir=output_dir, manifest=manifest))
+        self.assertFalse([result.error for result in results if result.error])
+        manifest.finish()
+        return manifest
+
+    def test_second_run_skips_everything(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            items = ['C', 'Am7', ('G7', 'neon')]
+            first = self.render(output_dir, items)
+            self.assertEqual((len(first.generated), len(first.skipped)), (6, 0))
+            manifest_mtime = os.stat(first.path).st_mtime_ns
+            second = self.render(output_dir, items)
+            self.assertEqual((second.generated, len(second.skipped), second.removed), ([], 6, []))
+            # A no-op run doesn't even rewrite the manifest
+            self.assertEqual(os.stat(second.path).st_mtime_ns, manifest_mtime)
+            # Other options are other inputs
+            third = self.render(output_dir, items, serializer='compact')
+            self.assertEqual(len(third.generated), 6)
+
+    def test_finish_removes_orphans_only(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            first = self.render(output_dir, ['C', 'Am7', 'G7'])
+            untracked = os.path.join(output_dir, 'notes.txt')
+            with open(untracked, 'w') as f:
+                f.write('mine')
+            second = self.render(output_dir, ['C', 'Am7'])
+            self.assertEqual(len(second.removed), 2)
+            for relative_path in second.removed:
+                self.assertIn(relative_path, first.generated)
+                self.assertFalse(os.path.exists(os.path.join(output_dir, relative_path)))
+            self.assertTrue(os.path.exists(untracked))
+            for relative_path in second.skipped:
+                self.assertTrue(os.path.exists(os.path.join(output_dir, relative_path)))
+
+    def test_batch_cli_rerun(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            chord_file = os.path.join(work_dir, 'chords.txt')
+            with open(chord_file, 'w') as f:
+                f.write('C\nAm7 neon\nG7\n')
+            output_dir = os.path.join(work_dir, 'out')
+            argv = ['batch', chord_file, '-o', output_dir, '--executor', 'serial', '--font-mode', 'external']
+            for expected in ('Generated 3 files, skipped 0 unchanged', 'Generated 0 files, skipped 3 unchanged'):
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    self.assertEqual(charts.main(argv), 0)
+                self.assertIn(expected, output.getvalue())
+
+    def test_batch_gallery_rerun(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            chord_file = os.path.join(work_dir, 'chords.txt')
+            output_dir = os.path.join(work_dir, 'out')
+            argv = ['batch', chord_file, '-o', output_dir, '--executor', 'serial', '--font-mode', 'external', '--gallery', '--gallery-page-size', '2']
+
+            def run(chords: str) -> str:
+                with open(chord_file, 'w') as f:
+                    f.write(chords)
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    self.assertEqual(charts.main(argv), 0)
+                return output.getvalue()
+
+            # Three diagrams, the index and two pages
+            self.assertIn('Generated 6 files, skipped 0 unchanged, removed 0 orphaned', run('C\nAm7 neon\nG7\n'))
+            index = os.path.join(output_dir, charts.GALLERY_FILENAME)
+            index_mtime = os.stat(index).st_mtime_ns
+            self.assertIn('Generated 0 files, skipped 6 unchanged, removed 0 orphaned', run('C\nAm7 neon\nG7\n'))
+            self.assertEqual(os.stat(index).st_mtime_ns, index_mtime)
+            # A shorter chord list rewrites the gallery and drops the last diagram and the page that showed it
+            self.assertIn('Generated 2 files, skipped 2 unchanged, removed 2 orphaned', run('C\nAm7 neon\n'))
+            self.assertFalse(os.path.exists(os.path.join(output_dir, charts.gallery_page_filename(2))))
+            self.assertTrue(os.path.exists(os.path.join(output_dir, charts.gallery_page_filename(1))))
+
+
+if __name__ == '__main__':
+    unittest.main()
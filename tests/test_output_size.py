@@ -0,0 +1,36 @@
+import unittest
+
+from py_chord_chart_generator import FONT_MODES, SERIALIZERS, ChordChartGenerator, chord_examples
+
+# Largest allowed (guitar, notation) SVG in bytes per font mode, a few percent above the largest chord_examples output.
+# Embedded fonts dominate the embed size; subset and external are what the font strategies exist to keep small.
+MAX_BYTES = {
+    'embed': (470_000, 467_000),
+    'subset': (16_000, 9_500),
+    'external': (5_500, 2_500),
+}
+
+
+class OutputSizeTest(unittest.TestCase):
+    def test_every_font_mode_and_serializer(self):
+        self.assertEqual(set(MAX_BYTES), set(FONT_MODES))
+        for font_mode in FONT_MODES:
+            sizes = {}
+            for serializer in SERIALIZERS:
+                generator = ChordChartGenerator(font_mode=font_mode, font_url='/fonts/', serializer=serializer)
+                for chord, color_scheme in chord_examples:
+                    guitar_svg, notation_svg = generator.generate_svg(chord, color_scheme)
+                    sizes[serializer, chord, color_scheme] = (len(guitar_svg.encode('utf-8')), len(notation_svg.encode('utf-8')))
+                    for kind, size, ceiling in zip(('guitar', 'notation'), sizes[serializer, chord, color_scheme], MAX_BYTES[font_mode]):
+                        with self.subTest(font_mode=font_mode, serializer=serializer, chord=chord, kind=kind):
+                            self.assertLessEqual(size, ceiling)
+            # The compact serializer never costs bytes
+            for chord, color_scheme in chord_examples:
+                with self.subTest(font_mode=font_mode, chord=chord):
+                    pretty, compact = sizes['pretty', chord, color_scheme], sizes['compact', chord, color_scheme]
+                    self.assertLess(compact[0], pretty[0])
+                    self.assertLess(compact[1], pretty[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import json
+import tempfile
+import unittest
+
+from py_chord_chart_generator import ChordChartGenerator, PackReader, build_pack, pack_chords
+
+
+class ChordPackTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.work_dir = tempfile.TemporaryDirectory()
+        cls.generator = ChordChartGenerator(font_mode='external', font_url='/fonts/', serializer='compact')
+        cls.path = os.path.join(cls.work_dir.name, 'chords.pack')
+        cls.stats = build_pack(cls.generator, cls.path, executor='serial')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.work_dir.cleanup()
+
+    def test_every_entry_round_trips(self):
+        self.assertEqual(self.stats.failed, 0)
+        with PackReader(self.path) as reader:
+            self.assertEqual(len(reader), self.stats.entries)
+            self.assertEqual(len(reader), 2 * len(pack_chords(self.generator)) * len(self.generator.color_schemes))
+            for chord, color_scheme, notation in reader.keys():
+                guitar_svg, notation_svg = self.generator.generate_svg(chord, color_scheme)
+                view = reader.get(chord, color_scheme, notation)
+                self.assertEqual(bytes(view), (notation_svg if notation else guitar_svg).encode('utf-8'), msg=(chord, color_scheme, notation))
+                view.release()
+
+    def test_names_the_pack_cannot_hold(self):
+        with PackReader(self.path) as reader:
+            # Aliases find the canonical entry; a slash chord's notation is its root chord's
+            for alias, canonical, notation in (('Cmaj', 'C', False), ('Cmin7', 'Cm7', False), ('G/B', 'G', True)):
+                self.assertEqual(reader.key(alias, notation=notation), reader.key(canonical, notation=notation), msg=alias)
+            for chord, color_scheme, notation in (('G/B', 'default', False), ('Cm7#11', 'default', False), ('H7', 'default', False), ('C', 'nope', False)):
+                self.assertIsNone(reader.get(chord, color_scheme, notation), msg=(chord, color_scheme))
+
+    def test_rejects_embedded_fonts(self):
+        path = os.path.join(self.work_dir.name, 'embedded.pack')
+        with self.assertRaisesRegex(ValueError, "can't embed fonts"):
+            build_pack(ChordChartGenerator(), path, executor='serial')
+        self.assertFalse(os.path.exists(path))
+
+    def test_same_inputs_give_the_same_file(self):
+        path = os.path.join(self.work_dir.name, 'threaded.pack')
+        build_pack(self.generator, path, executor='thread', workers=2)
+        with open(self.path, 'rb') as serial_file, open(path, 'rb') as threaded_file:
+            self.assertEqual(serial_file.read(), threaded_file.read())
+
+    def test_matches_only_the_same_settings(self):
+        shape_file = os.path.join(self.work_dir.name, 'shapes.json')
+        with open(shape_file, 'w', encoding='utf-8') as f:
+            json.dump({'shapes': {'major': [0, 4, 3, 2, 2, 0]}}, f)
+        with PackReader(self.path) as reader:
+            self.assertTrue(reader.matches(self.generator))
+            self.assertTrue(reader.matches(ChordChartGenerator(font_mode='external', font_url='/fonts/', serializer='compact')))
+            for options in ({'serializer': 'pretty'}, {'font_url': '/static/'}, {'color_mode': 'themable'}, {'shape_file': shape_file},
+                            {'color_schemes': {'neon': {**self.generator.color_schemes['neon'], 'background': '#000001'}}}):
+                with self.subTest(options=options):
+                    settings = {'font_mode': 'external', 'font_url': '/fonts/', 'serializer': 'compact', **options}
+                    self.assertFalse(reader.matches(ChordChartGenerator(**settings)))
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.work_dir.name, 'not.pack')
+        with open(path, 'wb') as f:
+            f.write(b'<svg/>' * 10)
+        with self.assertRaises(ValueError):
+            PackReader(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+
+from py_chord_chart_generator import ChordChartGenerator
+from py_chord_chart_server import ChordChartServer
+
+
+class ChordChartServerTest(unittest.TestCase):
+    def run_with_server(self, test, **options):
+        async def run():
+            server = ChordChartServer(executor='thread', workers=2, **options)
+            await server.start('127.0.0.1', 0)
+            try:
+                return await test(server)
+            finally:
+                await server.close()
+        return asyncio.run(run())
+
+    def test_revalidation_returns_not_modified(self):
+        async def test(server):
+            status, headers, body = await server.respond('GET', '/chord/Am7.svg?scheme=neon', {})
+            self.assertEqual(status, 200)
+            self.assertIn(b'<svg', body)
+            tag = headers['ETag']
+            status, headers, body = await server.respond('GET', '/chord/Am7.svg?scheme=neon', {'if-none-match': f'"stale", {tag}'})
+            self.assertEqual((status, headers['ETag'], body), (304, tag, b''))
+            status, _, _ = await server.respond('GET', '/chord/Am7.svg?scheme=neon', {'if-none-match': '"stale"'})
+            self.assertEqual(status, 200)
+            # Other options are other diagrams
+            _, headers, _ = await server.respond('GET', '/chord/Am7.svg?scheme=neon&notation=1', {})
+            self.assertNotEqual(headers['ETag'], tag)
+            self.assertEqual(server.renders, 2)
+        self.run_with_server(test)
+
+    def test_etag_follows_the_chord_shapes(self):
+        async def tag_of(server):
+            _, headers, _ = await server.respond('GET', '/chord/C.svg', {})
+            return headers['ETag']
+        settings = {'font_mode': 'external', 'font_url': '/fonts/', 'serializer': 'compact'}
+        with tempfile.TemporaryDirectory() as work_dir:
+            shape_file = os.path.join(work_dir, 'shapes.json')
+            with open(shape_file, 'w', encoding='utf-8') as f:
+                json.dump({'shapes': {'major': [0, 4, 3, 2, 2, 0]}}, f)
+            default_tag = self.run_with_server(tag_of)
+            self.assertEqual(self.run_with_server(tag_of, generator=ChordChartGenerator(**settings)), default_tag)
+            self.assertNotEqual(self.run_with_server(tag_of, generator=ChordChartGenerator(shape_file=shape_file, **settings)), default_tag)
+            self.assertNotEqual(self.run_with_server(tag_of, generator=ChordChartGenerator(**{**settings, 'serializer': 'pretty'})), default_tag)
+
+    def test_error_statuses(self):
+        async def test(server):
+            for method, target, expected in (('GET', '/chord/H7.svg', 400), ('GET', '/chord/Cxyz.svg', 400), ('GET', '/diagram/H7.json', 400),
+                                             ('GET', '/chord/C.svg?scheme=nope', 404), ('GET', '/nothing', 404),
+                                             ('GET', '/fonts/missing.ttf', 404), ('POST', '/chord/C.svg', 405)):
+                with self.subTest(method=method, target=target):
+                    status, _, _ = await server.respond(method, target, {})
+                    self.assertEqual(status, expected)
+            # A wildcard revalidation must not vouch for a symbol that was never valid
+            status, headers, _ = await server.respond('GET', '/chord/H7.svg', {'if-none-match': '*'})
+            self.assertEqual(status, 400)
+            self.assertNotIn('ETag', headers)
+            self.assertEqual(server.renders, 0)
+        self.run_with_server(test)
+
+    def test_concurrent_requests_share_one_render(self):
+        async def test(server):
+            responses = await asyncio.gather(*(server.respond('GET', '/chord/C%2FG.svg', {}) for _ in range(20)))
+            self.assertEqual({status for status, _, _ in responses}, {200})
+            self.assertEqual(len({body for _, _, body in responses}), 1)
+            self.assertEqual(server.renders, 1)
+        self.run_with_server(test)
+
+    def test_http_keep_alive(self):
+        async def test(server):
+            host, port = server.address
+            reader, writer = await asyncio.open_connection(host, port)
+            statuses = []
+            for target in ('/chord/C.svg', '/metrics'):
+                writer.write(f'GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode('latin-1'))
+                head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+                length = next(int(line.split(':')[1]) for line in head.split('\r\n') if line.lower().startswith('content-length'))
+                body = await reader.readexactly(length)
+                statuses.append(int(head.split(' ')[1]))
+            writer.close()
+            self.assertEqual(statuses, [200, 200])
+            self.assertIn(b'chord_server_requests_total{status="200"} 1', body)
+        self.run_with_server(test)
+
+
+if __name__ == '__main__':
+    unittest.main()
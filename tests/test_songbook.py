@@ -0,0 +1,43 @@
+import os
+import zipfile
+import tempfile
+import unittest
+
+from py_chord_chart_generator import ChordChartGenerator, SongbookStats, iter_song_chords, render_songbook
+
+SONG = """{title: A Bad Day}
+[Verse]
+C G Am F
+A Bad Day
+[Chorus]
+[C]Every [G/B]single [N.C.]day, [Am7]again
+Dm7  G7   Cmaj7
+A Dead Bee
+"""
+
+
+class SongbookTest(unittest.TestCase):
+    def setUp(self):
+        self.generator = ChordChartGenerator(font_mode='external')
+
+    def test_only_parsable_tokens_are_chords(self):
+        # Section labels match the ChordPro brackets, and lyrics made of A-G words look like chord lines
+        stats = SongbookStats()
+        chords = list(iter_song_chords(SONG.splitlines(), self.generator.parser, stats))
+        self.assertEqual(chords, ['C', 'G', 'Am', 'F', 'C', 'G/B', 'Am7', 'Dm7', 'G7', 'Cmaj7'])
+        self.assertEqual((stats.lines, stats.chord_tokens), (8, 10))
+
+    def test_render_songbook_has_no_failures(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            song_path = os.path.join(work_dir, 'song.cho')
+            with open(song_path, 'w', encoding='utf-8') as f:
+                f.write(SONG)
+            output = os.path.join(work_dir, 'songbook.zip')
+            stats = render_songbook(self.generator, [song_path, song_path], output)
+            self.assertEqual((stats.unique_chords, stats.rendered, stats.failed), (9, 9, 0))
+            with zipfile.ZipFile(output) as archive:
+                self.assertEqual(len([name for name in archive.namelist() if name.endswith('.svg')]), 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import re
+import unittest
+
+from py_chord_chart_generator import ChordChartGenerator, ChordSymbolParser
+
+ROOTS = ['A', 'A#', 'Bb', 'B', 'C', 'C#', 'Db', 'D', 'D#', 'Eb', 'E', 'F', 'F#', 'Gb', 'G', 'G#', 'Ab']
+
+
+def legacy_split(chord_shapes, chord_notation: str):
+    # The per-call regex selection and substring probing parse_chord used before ChordSymbolParser
+    if "/" in chord_notation:
+        if "m6/9" in chord_notation:
+            regex_pattern = r'^([A-G][b#]?)m6/9(?:/([A-G][b#]?))?$'
+        else:
+            regex_pattern = r'^([A-G][b#]?)([^\s/]+)?(?:/([A-G][b#]?))?$'
+    else:
+        regex_pattern = r'^([A-G][b#]?)([^\s/]*)?$'
+    match = re.match(regex_pattern, chord_notation)
+    root = match.group(1)
+    quality = match.group(2) or "major"
+    bass = match.group(3) if len(match.groups()) >= 3 else None
+    for length in range(len(quality), 0, -1):
+        if quality[:length] in chord_shapes:
+            return root, quality, bass, quality[:length], [quality[length:]] if length < len(quality) else []
+    raise ValueError(chord_notation)
+
+
+class ChordSymbolParserTest(unittest.TestCase):
+    # ChordSymbolParser must split every symbol exactly as the per-call regex and substring probing it replaced
+    SUFFIXES = ('', '#5', 'b9', '#11', 'add9')
+
+    def assert_same_split(self, parser: ChordSymbolParser, shapes, chord: str):
+        try:
+            expected = legacy_split(shapes, chord)
+        except (AttributeError, ValueError):
+            # The old code failed on a regex mismatch (None.group) or an unknown quality
+            with self.assertRaises(ValueError, msg=chord):
+                parser.split(chord)
+            return
+        self.assertEqual(parser.split(chord), expected, msg=chord)
+
+    def test_every_quality_root_and_bass(self):
+        shapes = ChordChartGenerator().chord_shapes
+        parser = ChordSymbolParser(shapes)
+        self.assertLess(len(shapes.qualities()), len(shapes))  # Aliases are keys too
+        for quality in shapes:
+            for suffix in self.SUFFIXES:
+                for root in ROOTS:
+                    for bass in [''] + ['/' + note for note in ROOTS]:
+                        self.assert_same_split(parser, shapes, root + quality + suffix + bass)
+
+    def test_six_nine_special_cases(self):
+        shapes = ChordChartGenerator().chord_shapes
+        parser = ChordSymbolParser(shapes)
+        for root in ROOTS:
+            for chord in (f'{root}m6/9', f'{root}m6/9/E', f'{root}min6/9', f'{root}6/9', f'{root}6/9/G', f'{root}m6/9b9'):
+                self.assert_same_split(parser, shapes, chord)
+        # The dedicated m6/9 pattern captures only root and bass, so its second group (the bass) lands in the quality
+        # slot: a bare m6/9 reads as major and one with a bass note fails. A 6/9 reads as 6 over a bass '9', which fails.
+        self.assertEqual(parser.split('Cm6/9'), ('C', 'major', None, 'major', []))
+        for chord in ('Cm6/9/E', 'C6/9'):
+            with self.assertRaises(ValueError, msg=chord):
+                parser.split(chord)
+
+    def test_unknown_input(self):
+        shapes = ChordChartGenerator().chord_shapes
+        parser = ChordSymbolParser(shapes)
+        for chord in ('H7', 'C#x', 'c', 'Cmaj7/H', ''):
+            self.assert_same_split(parser, shapes, chord)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from py_chord_chart_generator import COLOR_MODES, SERIALIZERS, ChordChartGenerator, chord_examples
+
+
+class TemplateRenderingTest(unittest.TestCase):
+    # Golden comparison: the template path must produce exactly the bytes of building the full ElementTree
+    def assert_same_renders(self, **options):
+        templated = ChordChartGenerator(use_templates=True, render_cache_size=0, **options)
+        full = ChordChartGenerator(use_templates=False, render_cache_size=0, **options)
+        for chord, _ in chord_examples:
+            for color_scheme in templated.color_schemes:
+                for show_notation in (True, False):
+                    with self.subTest(chord=chord, color_scheme=color_scheme, show_notation=show_notation):
+                        self.assertEqual(templated.generate_svg(chord, color_scheme, show_notation=show_notation),
+                                         full.generate_svg(chord, color_scheme, show_notation=show_notation))
+
+    def test_embedded_fonts(self):
+        for serializer in SERIALIZERS:
+            with self.subTest(serializer=serializer):
+                self.assert_same_renders(serializer=serializer)
+
+    def test_external_fonts(self):
+        for serializer in SERIALIZERS:
+            for color_mode in COLOR_MODES:
+                with self.subTest(serializer=serializer, color_mode=color_mode):
+                    self.assert_same_renders(font_mode='external', font_url='/fonts/', serializer=serializer, color_mode=color_mode)
+
+    def test_voicings_above_the_nut(self):
+        # Voicings further up the neck use templates with other fret numbers
+        templated = ChordChartGenerator(use_templates=True, render_cache_size=0)
+        full = ChordChartGenerator(use_templates=False, render_cache_size=0)
+        for chord, color_scheme in chord_examples:
+            for voicing in templated.voicings(chord, limit=3):
+                with self.subTest(chord=chord, frets=voicing.frets):
+                    self.assertEqual(templated.generate_svg(chord, color_scheme, show_notation=False, voicing=voicing),
+                                     full.generate_svg(chord, color_scheme, show_notation=False, voicing=voicing))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import random
+import threading
+import unittest
+import concurrent.futures
+
+from py_chord_chart_generator import COLOR_MODES, ChordChartGenerator, LRUCache, chord_examples
+
+# Tiny caches keep entries being evicted and re-rendered under contention
+OPTIONS = dict(font_mode='external', font_url='/fonts/', serializer='compact', parse_cache_size=16, render_cache_size=8)
+
+
+def shared_generator_jobs(generator: ChordChartGenerator):
+    # Everything one shared generator hands out, so the lazily built helpers and every memo dict are raced for too
+    jobs = []
+    for chord, _ in chord_examples:
+        for color_scheme in generator.color_schemes:
+            for color_mode in COLOR_MODES:
+                jobs.append((f"svg {chord} {color_scheme} {color_mode}", lambda chord=chord, color_scheme=color_scheme, color_mode=color_mode:
+                             generator.generate_svg(chord, color_scheme, color_mode=color_mode)))
+        jobs.append((f"diagram {chord}", lambda chord=chord: generator.diagram(chord).to_json()))
+        jobs.append((f"voicings {chord}", lambda chord=chord: generator.voicings(chord)))
+        if '/' not in chord and len(generator.parse_chord(chord)[2]) == generator.strings:
+            # Each new bass note grows the voicing table by a row
+            jobs.append((f"transpose {chord}", lambda chord=chord: [(name, positions.tolist()) for name, positions in
+                                                                        zip(*generator.transpose_many([chord, chord + '/E', chord + '/G'], 5))]))
+    jobs.append(("identify", lambda: [generator.identify(frets) for frets in ('x32010', '022100', 'x02210', '320003')]))
+    return jobs
+
+
+class ThreadSafetyTest(unittest.TestCase):
+    def setUp(self):
+        # Switch threads as often as possible, so check-then-act races get their chance even with the GIL on
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def test_32_threads_match_serial_output(self):
+        threads = 32
+        reference = {name: job() for name, job in shared_generator_jobs(ChordChartGenerator(**OPTIONS))}
+        jobs = shared_generator_jobs(ChordChartGenerator(**OPTIONS))
+        barrier = threading.Barrier(threads)
+
+        def run(worker: int):
+            order = list(jobs)
+            random.Random(worker).shuffle(order)
+            barrier.wait()  # Start together, so the cold caches and lazy helpers are raced for
+            failures = []
+            for name, job in order:
+                try:
+                    if job() != reference[name]:
+                        failures.append(f"{name}: output differs")
+                except Exception as e:
+                    failures.append(f"{name}: {type(e).__name__}: {e}")
+            return failures
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+            failures = [failure for worker_failures in pool.map(run, range(threads)) for failure in worker_failures]
+        self.assertEqual(failures, [])
+
+    def test_cache_counters_stay_consistent(self):
+        cache = LRUCache(8)
+
+        def hammer(worker: int):
+            for i in range(2000):
+                if cache.get((worker, i % 16)) is None:
+                    cache.put((worker, i % 16), i)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=32) as pool:
+            list(pool.map(hammer, range(32)))
+        stats = cache.stats()
+        self.assertEqual(stats['hits'] + stats['misses'], 32 * 2000)
+        self.assertLessEqual(stats['size'], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
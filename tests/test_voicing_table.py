@@ -0,0 +1,66 @@
+import unittest
+
+from py_chord_chart_generator import ROOT_ADJUSTMENT, ChordChartGenerator
+
+
+class VoicingTableTest(unittest.TestCase):
+    # The table must agree with parse_chord for every chord it can resolve
+    @classmethod
+    def setUpClass(cls):
+        cls.generator = ChordChartGenerator()
+        cls.table = cls.generator.voicing_table()
+
+    def parsed_positions(self, chord: str):
+        try:
+            positions = self.generator.parse_chord(chord)[2]
+        except (ValueError, KeyError):
+            return None
+        return positions if len(positions) == self.generator.strings else None
+
+    def test_table_matches_parse_chord(self):
+        differences = []
+        for root in ROOT_ADJUSTMENT:
+            for quality in self.generator.chord_shapes:
+                expected = self.parsed_positions(root + quality)
+                if expected is None:
+                    continue
+                if self.table.lookup(root, quality) != tuple(expected):
+                    differences.append(root + quality)
+        self.assertEqual(differences, [])
+
+    def test_resolve_many_matches_parse_chord(self):
+        chords = [root + quality + suffix for root in ROOT_ADJUSTMENT for quality in self.generator.chord_shapes
+                  for suffix in ('', '/E', '/Bb') if self.parsed_positions(root + quality + suffix) is not None]
+        resolved = self.table.resolve_many(chords)
+        self.assertEqual(resolved.shape, (len(chords), self.generator.strings))
+        for chord, row in zip(chords, resolved.tolist()):
+            self.assertEqual(tuple(row), tuple(self.parsed_positions(chord)), msg=chord)
+
+    def test_transpose_many_matches_parse_chord(self):
+        chords = ['C', 'Am7', 'F#m7b5', 'Bbmaj7/D', 'Eb7#9', 'G/B']
+        for semitones in (0, 1, 7, -5, [2, 11, 3, 5, 0, 12]):
+            names, positions = self.table.transpose_many(chords, semitones)
+            for name, row in zip(names, positions.tolist()):
+                self.assertEqual(tuple(row), tuple(self.generator.parse_chord(name)[2]), msg=(name, semitones))
+        names, _ = self.table.transpose_many(['C/E', 'Bb/D'], 2)
+        self.assertEqual(names, ['D/F#', 'C/E'])
+
+    def test_unresolvable_chords(self):
+        for chord in ('H7', 'Cxyz'):
+            with self.assertRaisesRegex(ValueError, 'is invalid', msg=chord):
+                self.table.resolve_many([chord])
+        # More finger positions than strings: named with the count rather than failing inside NumPy
+        for call in (lambda: self.table.resolve_many(['C', 'Cmaj9#11']), lambda: self.table.transpose_many(['Cmaj9#11', 'G'], 2)):
+            with self.assertRaisesRegex(ValueError, r"'Cmaj9#11' has 7 finger positions"):
+                call()
+
+    def test_transpose_many_shift_count(self):
+        for semitones in ([1, 2], [1, 2, 3, 4], []):
+            with self.assertRaisesRegex(ValueError, '🚫', msg=semitones):
+                self.table.transpose_many(['C', 'Am', 'F'], semitones)
+        names, _ = self.table.transpose_many(['C', 'Am', 'F'], iter([1, 2, 3]))
+        self.assertEqual(names, ['C#', 'Bm', 'G#'])
+
+
+if __name__ == '__main__':
+    unittest.main()